@@ -0,0 +1,468 @@
+# agente.py
+import asyncio
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import TypedDict
+
+from config import (
+    DAEMON_INTERVALO_MINUTOS, DAEMON_REINTENTO_MINUTOS, MAX_BUSQUEDAS_CONCURRENTES, MAX_EMPRESAS_CONCURRENTES,
+    INCREMENTAL_ACTIVADO, HISTORIAL_ACTIVADO, ARCHIVO_ACTIVADO, DEDUP_ACTIVADO, MODELO_LLM, TEMPERATURA_LLM,
+    PRESUPUESTO_ACTIVADO, PRESUPUESTO_TOKENS_ENTRADA, MAPREDUCE_ACTIVADO, MAPREDUCE_UMBRAL_TOKENS,
+    STREAMING_ACTIVADO, PERFILADO_ACTIVADO, EXTRACCION_ACTIVADO
+)
+from tools.buscador import tool_buscar_noticias_async, BusquedaFallida
+from tools.planificador import planificar, fusionar_por_bloque
+from tools.extractor import extraer_textos
+from utils.transporte import cerrar_transportes, imprimir_resumen_transportes
+from utils.cache import imprimir_resumen_caches
+from utils.llm import ainvocar_llm, ainvocar_estructurado
+from utils.indice_urls import IndiceUrls
+from utils.ventanas import MarcasAgua, HORAS_POR_DEFECTO, horas_a_buscar
+from utils.historial import HistorialMetricas
+from utils.archivo import ArchivoItems
+from utils.urls import canonicalizar_url
+from utils.deduplicador import colapsar_duplicados
+from utils.presupuesto import contar_tokens, ajustar_a_presupuesto
+from utils.mapreduce import resumir_bloques
+from utils.menciones import contar_menciones
+from utils.metricas import MetricasReporte, SentimientoEstructurado, prompt_sentimiento, armar_metricas, insertar_datos
+from utils.progresivo import EscritorProgresivo
+from utils.limitador import semaforo_global, imprimir_resumen_limitadores
+from utils.perfiles import PerfilEmpresa
+from utils.noticias import NoticiaItem, BLOQUE_SOCIAL, renderizar_noticias, renderizar_social
+from utils.exportador_html import exportar_reporte
+from utils.trazas import span, trazado, anotar, iniciar_traza
+from utils.cache import clave_hash
+from utils.cassette import ahora, reproduciendo, buscar_grabado, grabar, LLMReproducido
+
+def rango_fechas(horas: int = HORAS_POR_DEFECTO) -> str:
+    """Período del reporte. Con un cassette reproduciendo, la fecha es la de la grabación."""
+    fecha_hoy = ahora()
+    fecha_inicio = fecha_hoy - timedelta(hours=horas)
+    # Ventanas incrementales (modo daemon): si no son días justos, la hora importa
+    formato = "%d/%m/%Y" if horas % 24 == 0 else "%d/%m/%Y %H:%M"
+    return f"Del {fecha_inicio.strftime(formato)} al {fecha_hoy.strftime(formato)}"
+
+class AgentState(TypedDict):
+    perfil: PerfilEmpresa
+    horas: int  # Ventana de búsqueda
+    busquedas_fallidas: int  # Consultas que no cubrieron la ventana entera
+    items: list[NoticiaItem]
+    items_en_prompt: list[NoticiaItem]  # Las que llegaron al prompt final: son las que se dan por publicadas
+    source_count: int
+    menciones: dict
+    metricas: MetricasReporte
+    final_report: str
+
+_llm = None
+
+def obtener_llm():
+    """El cliente del LLM se crea recién cuando se usa (importar langchain_openai es lo más lento del arranque)."""
+    global _llm
+    if _llm is None and reproduciendo():
+        # Todas las respuestas salen del cassette: sólo hace falta modelo y temperatura para la clave
+        _llm = LLMReproducido(MODELO_LLM, TEMPERATURA_LLM)
+    if _llm is None:
+        from langchain_openai import ChatOpenAI
+        _llm = ChatOpenAI(model=MODELO_LLM, temperature=TEMPERATURA_LLM)
+    return _llm
+
+def configurar_llm(llm):
+    """Reemplaza el LLM del agente (modelos falsos en pruebas y benchmarks)."""
+    global _llm
+    _llm = llm
+
+def filtrar_y_acumular(items_nuevos: list, urls_vistas: set) -> list:
+    """Descarta los items cuya URL (canónica) ya apareció en un bloque de mayor prioridad."""
+    items_limpios = []
+    for item in items_nuevos:
+        if item.url_canonica in urls_vistas:
+            continue
+        urls_vistas.add(item.url_canonica)
+        items_limpios.append(item)
+    return items_limpios
+
+def descartar_publicadas(items: list, empresa: str) -> list:
+    """Quita los items que ya salieron en un newsletter anterior de la empresa."""
+    # El índice es estado externo: se graba en el cassette como Serper y el LLM
+    clave = clave_hash({"empresa": empresa, "urls": sorted(item.url_canonica for item in items)})
+    conocidas = buscar_grabado("indice_urls", clave)
+    if conocidas is None:
+        conocidas = IndiceUrls().conocidas(empresa, (item.url_canonica for item in items))
+        grabar("indice_urls", clave, sorted(conocidas))
+    conocidas = set(conocidas)
+    if conocidas:
+        print(f"   ♻️  {len(conocidas)} noticias ya publicadas en reportes anteriores (descartadas)")
+    return [item for item in items if item.url_canonica not in conocidas]
+
+def presentes_en(items: list, texto: str) -> list:
+    """Los items cuya URL (o la de alguna nota sindicada) aparece en `texto`."""
+    return [item for item in items
+            if item.url in texto or any(url in texto for _, url in item.enlaces_relacionados)]
+
+def registrar_publicadas(items: list, empresa: str):
+    """Tras exportar el reporte, marca sus URLs como publicadas para las próximas corridas."""
+    urls = [item.url_canonica for item in items]
+    urls += [canonicalizar_url(url) for item in items for _, url in item.enlaces_relacionados]
+    nuevas = IndiceUrls().registrar(empresa, urls)
+    print(f"   🗂️  {nuevas} URLs nuevas registradas en el índice de publicadas")
+
+async def _buscar_bloques(consultas: list, horas: int) -> tuple:
+    """
+    Lanza todas las consultas en paralelo (con tope de concurrencia global). Devuelve los
+    resultados en el mismo orden y cuántas consultas fallaron (de ésas queda lo que llegó).
+    """
+    semaforo = semaforo_global("serper", MAX_BUSQUEDAS_CONCURRENTES)
+    fallidas = 0
+
+    async def buscar(consulta):
+        nonlocal fallidas
+        async with semaforo:
+            print(f"   - {consulta.etiqueta}...")
+            with span("busqueda", bloque=consulta.bloque, query=consulta.query):
+                try:
+                    return await tool_buscar_noticias_async.ainvoke({"query": consulta.query, "horas": horas})
+                except BusquedaFallida as e:
+                    fallidas += 1
+                    anotar(fallida=str(e))
+                    return e.items
+
+    resultados = await asyncio.gather(*(buscar(consulta) for consulta in consultas))
+    return resultados, fallidas
+
+@trazado("investigador")
+async def investigador_node(state: AgentState):
+    perfil = state["perfil"]
+    empresa = perfil.empresa
+    print(f"🕵️  Iniciando investigación para {empresa}: {rango_fechas(state['horas'])}")
+    
+    urls_vistas_global = set()
+
+    # Todas las subsidiarias y términos del sector, en el mínimo de queries (tools/planificador.py).
+    # El orden de la lista es el orden de prioridad para la deduplicación
+    consultas = planificar(perfil)
+    resultados, fallidas = await _buscar_bloques(consultas, state["horas"])
+    anotar(consultas=len(consultas), horas=state["horas"], busquedas_fallidas=fallidas)
+    if fallidas:
+        print(f"   ⚠️  {fallidas}/{len(consultas)} búsquedas fallaron: el reporte puede quedar incompleto")
+
+    # La deduplicación se aplica en secuencia, respetando la prioridad de los bloques.
+    # Las redes sociales no se deduplican ni cuentan como fuentes de noticias.
+    items = []
+    candidatos = sum(len(items_bloque) for items_bloque in resultados)
+    for bloque, items_bloque in fusionar_por_bloque(consultas, resultados):
+        for item in items_bloque:
+            item.bloque = bloque
+        if bloque != BLOQUE_SOCIAL:
+            items_bloque = filtrar_y_acumular(items_bloque, urls_vistas_global)
+        items.extend(items_bloque)
+
+    descartes = {"descartadas_url_repetida": candidatos - len(items)}
+
+    if INCREMENTAL_ACTIVADO:
+        antes = len(items)
+        items = descartar_publicadas(items, empresa)
+        descartes["descartadas_ya_publicadas"] = antes - len(items)
+
+    if DEDUP_ACTIVADO:
+        antes = len(items)
+        noticias = colapsar_duplicados([item for item in items if item.bloque != BLOQUE_SOCIAL])
+        items = noticias + [item for item in items if item.bloque == BLOQUE_SOCIAL]
+        descartes["colapsadas_minhash"] = antes - len(items)
+    
+    count = sum(1 + len(item.enlaces_relacionados) for item in items if item.bloque != BLOQUE_SOCIAL)
+    # Conteo exacto por marca (una pasada sobre todas las notas)
+    menciones = contar_menciones(perfil, items)
+    anotar(empresa=empresa, candidatos=candidatos, items=len(items), fuentes=count, **descartes)
+    return {"items": items, "source_count": count, "menciones": menciones, "busquedas_fallidas": fallidas}
+
+@trazado("extractor")
+async def extractor_node(state: AgentState):
+    # Etapa opcional (EXTRACCION_ACTIVADO): el redactor ve el cuerpo de la nota y no sólo el snippet
+    print("📄 Extrayendo el texto completo de las notas...")
+    await extraer_textos(state["items"])
+    return {"items": state["items"]}
+
+def construir_prompt(perfil: PerfilEmpresa, news_data: str, social_data: str, count: int,
+                     horas: int = HORAS_POR_DEFECTO) -> str:
+    empresa, relacionadas = perfil.empresa, perfil.relacionadas
+    periodo = rango_fechas(horas)
+    # --- CONSTRUCCIÓN DINÁMICA DEL PROMPT ---
+    # Las cifras (sentimiento, menciones por marca, redes) no las escribe este prompt:
+    # salen de la salida estructurada y de los conteos en Python (utils/metricas.py)
+    
+    prompt = f"""
+    Eres un analista de inteligencia corporativa experto. Genera el reporte para la empresa: {empresa}.
+    
+    RANGO DE FECHAS VÁLIDO: {periodo}
+    
+    INPUT NOTICIAS:
+    {news_data}
+    
+    INPUT SOCIAL:
+    {social_data}
+    
+    INSTRUCCIONES OBLIGATORIAS:
+    1. **NO INVENTAR LINKS:** Usa solo los `URL_REAL` (y `OTRAS_FUENTES`) provistos.
+    2. **DEDUPLICACIÓN SEMÁNTICA (CRÍTICO):** 
+       - Las notas replicadas por varios medios ya vienen agrupadas: cita sus `OTRAS_FUENTES` junto al link principal.
+       - Si aun así encuentras múltiples noticias cubriendo el **MISMO HECHO**, AGRÚPALAS.
+       - Usa el título más descriptivo.
+    3. **CLASIFICACIÓN:**
+       - Noticias de **{empresa}** y sus marcas relacionadas ({', '.join(relacionadas)}) van primero.
+       - Noticias generales del sector van en su sección, salvo que mencionen explícitamente a {empresa}.
+    4. **SENTIMIENTO VISUAL:** Usa ÚNICAMENTE: 🙂, 😐, 😠.
+    5. **SIN CIFRAS:** No escribas listas de conteos (sentimiento, menciones, redes): se agregan automáticamente.
+    
+    ESTRUCTURA DE SALIDA (Markdown estricto):
+    
+    # Reporte de Sentimiento - {empresa}
+    **Período:** {periodo} | **Fuentes Únicas:** {count}
+    
+    ## 📈 Análisis General
+    [Resumen ejecutivo de 1 párrafo sobre la situación de la empresa y el sector]
+    
+    ## 📊 Reporte de Sentimiento
+    [1 o 2 oraciones sobre el tono general de la cobertura]
+    
+    ## 🇦🇷 Panorama Nacional
+    [Análisis coyuntura local]
+    
+    ## 🌍 Panorama Internacional
+    [Análisis mercado global/acciones]
+    
+    ## 💬 Resumen Conversación Digital
+    [Breve análisis redes]
+    
+    ## 📰 Detalle de Noticias
+    
+    ### 🇦🇷 {empresa} y Subsidiarias
+    [Lista noticias directas agrupadas por tema. Si no hay: "Sin novedades directas".]
+    
+    ### 🚜 Novedades del Sector (Competencia y Contexto)
+    [Lista noticias sectoriales.]
+
+    ### 🌐 Internacional
+    [Lista noticias internacionales.]
+    """
+    return prompt
+
+async def _resumir_en_presupuesto(perfil: PerfilEmpresa, items: list, count: int, horas: int):
+    """
+    Map-reduce sobre todas las notas. Devuelve (news_data, social_data) resumidos, o None
+    si ni así el prompt "reduce" entra en PRESUPUESTO_TOKENS_ENTRADA (queda el recorte).
+    """
+    news_data, social_data = await resumir_bloques(obtener_llm(), items, perfil.empresa)
+    tokens_reduce = contar_tokens(construir_prompt(perfil, news_data, social_data, count, horas))
+    print(f"   🧮 Prompt reduce: {tokens_reduce}/{PRESUPUESTO_TOKENS_ENTRADA} tokens")
+    anotar(modo="map-reduce", tokens_reduce=tokens_reduce)
+    if tokens_reduce > PRESUPUESTO_TOKENS_ENTRADA:
+        print("   ⚠️  Los resúmenes tampoco entran en el presupuesto: se usa el prompt recortado")
+        return None
+    return news_data, social_data
+
+@trazado("redactor")
+async def redactor_node(state: AgentState):
+    print("✍️  Redactor generando reporte con formato visual...")
+
+    perfil = state["perfil"]
+    items = state["items"]
+    count = state["source_count"]
+    menciones = state["menciones"]
+
+    # Único punto donde los registros se convierten a texto para el prompt
+    news_data, social_data = renderizar_noticias(items), renderizar_social(items)
+    horas = state["horas"]
+    tokens_prompt = contar_tokens(construir_prompt(perfil, news_data, social_data, count, horas))
+
+    anotar(empresa=perfil.empresa, tokens_prompt_estimados=tokens_prompt, modo="directo")
+
+    if PRESUPUESTO_ACTIVADO:
+        # Siempre pasa por el presupuesto: si entra no toca nada, pero queda el uso por bloque.
+        # El presupuesto para noticias es lo que queda después de las instrucciones fijas
+        tokens_fijos = contar_tokens(construir_prompt(perfil, "", "", count, horas))
+        ajustados = ajustar_a_presupuesto(items, PRESUPUESTO_TOKENS_ENTRADA - tokens_fijos)
+        resumido = None
+        if MAPREDUCE_ACTIVADO and len(ajustados) < len(items):
+            # Recortar no alcanzó y habría que descartar notas: mejor resumirlas todas por partes
+            print(f"   📚 Prompt de {tokens_prompt} tokens: el presupuesto descartaría "
+                  f"{len(items) - len(ajustados)} notas, modo map-reduce")
+            resumido = await _resumir_en_presupuesto(perfil, items, count, horas)
+        if resumido is not None:
+            news_data, social_data = resumido
+            # Sólo cuenta como publicada la nota que sobrevivió al resumen con su link
+            items = presentes_en(items, news_data + social_data)
+        elif tokens_prompt > PRESUPUESTO_TOKENS_ENTRADA:
+            items = ajustados
+            anotar(modo="presupuesto", items_en_prompt=len(items))
+            news_data, social_data = renderizar_noticias(items), renderizar_social(items)
+    elif not PRESUPUESTO_ACTIVADO and MAPREDUCE_ACTIVADO and tokens_prompt > MAPREDUCE_UMBRAL_TOKENS:
+        # Sin presupuesto, el umbral propio de map-reduce decide
+        print(f"   📚 Prompt de {tokens_prompt} tokens (> {MAPREDUCE_UMBRAL_TOKENS}): modo map-reduce")
+        anotar(modo="map-reduce")
+        news_data, social_data = await resumir_bloques(obtener_llm(), items, perfil.empresa)
+        items = presentes_en(items, news_data + social_data)
+
+    prompt = construir_prompt(perfil, news_data, social_data, count, horas)
+    # El clasificador ve las mismas notas que el redactor, pero sólo sus titulares
+    prompt_metricas = prompt_sentimiento(perfil.empresa, items)
+
+    async def clasificar():
+        # Las métricas van por salida estructurada, en paralelo con la redacción
+        try:
+            return await ainvocar_estructurado(obtener_llm(), prompt_metricas, SentimientoEstructurado)
+        except Exception as e:
+            print(f"   ⚠️  No se pudo obtener el sentimiento estructurado: {e}")
+            return None
+
+    async def redactar():
+        if not STREAMING_ACTIVADO:
+            return await ainvocar_llm(obtener_llm(), prompt)
+        escritor = EscritorProgresivo(perfil.empresa)
+        reporte = None
+        try:
+            reporte = await ainvocar_llm(obtener_llm(), prompt, al_recibir=escritor.agregar)
+            return reporte
+        finally:
+            escritor.cerrar(reporte)
+
+    reporte, sentimiento = await asyncio.gather(redactar(), clasificar())
+    metricas = armar_metricas(sentimiento, menciones, state["items"])
+    return {"final_report": insertar_datos(reporte, metricas), "metricas": metricas, "items_en_prompt": items}
+
+@lru_cache(maxsize=1)
+def obtener_app():
+    """Compila el grafo la primera vez que se necesita."""
+    from langgraph.graph import StateGraph, END
+
+    workflow = StateGraph(AgentState)
+    workflow.add_node("investigador", investigador_node)
+    workflow.add_node("redactor", redactor_node)
+
+    workflow.set_entry_point("investigador")
+    if EXTRACCION_ACTIVADO:
+        workflow.add_node("extractor", extractor_node)
+        workflow.add_edge("investigador", "extractor")
+        workflow.add_edge("extractor", "redactor")
+    else:
+        workflow.add_edge("investigador", "redactor")
+    workflow.add_edge("redactor", END)
+
+    return workflow.compile()
+
+async def ejecutar(perfil: PerfilEmpresa, horas: int = HORAS_POR_DEFECTO) -> dict:
+    """Corre el grafo completo para una empresa y devuelve el estado final."""
+    return await obtener_app().ainvoke({
+        "perfil": perfil,
+        "horas": horas,
+        "busquedas_fallidas": 0,
+        "items": [], 
+        "items_en_prompt": [],
+        "source_count": 0, 
+        "menciones": {},
+        "metricas": None,
+        "final_report": ""
+    })
+
+async def procesar_empresa(perfil: PerfilEmpresa, abrir_navegador: bool = True, ventana_incremental: bool = False):
+    """
+    Genera, exporta y registra el newsletter de una empresa. Con `ventana_incremental`
+    (modo daemon) busca sólo desde la marca de agua de la última corrida exitosa.
+    Devuelve False si alguna búsqueda falló: el reporte sale igual, pero la ventana
+    no se da por cubierta (ni se registran URLs) y la próxima corrida la repite.
+    """
+    with span("empresa", empresa=perfil.empresa):
+        # La marca se toma al empezar: lo que se publique mientras corre entra en la próxima
+        hasta = ahora()
+        marcas = MarcasAgua()
+        marca = marcas.ultima(perfil.empresa)
+        horas = horas_a_buscar(marca, hasta) if ventana_incremental else HORAS_POR_DEFECTO
+        res = await ejecutar(perfil, horas)
+        # Al historial antes de exportar: la tendencia del reporte ya incluye esta corrida
+        if HISTORIAL_ACTIVADO and not reproduciendo():
+            HistorialMetricas().registrar(perfil.empresa, hasta, res["metricas"])
+        # Las notas crudas también quedan (misma clave empresa/fecha que el historial)
+        if ARCHIVO_ACTIVADO and not reproduciendo():
+            with span("archivar", items=len(res["items"])):
+                nuevos = await asyncio.to_thread(ArchivoItems().archivar, perfil.empresa, hasta, res["items"])
+            print(f"   🗃️  {len(res['items'])} notas archivadas ({nuevos} contenidos nuevos)")
+        # La exportación escribe a disco: la sacamos del event loop para no frenar al resto
+        with span("exportar", bytes_markdown=len(res["final_report"].encode("utf-8"))):
+            await asyncio.to_thread(exportar_reporte, res["final_report"], perfil.empresa, abrir_navegador, res["metricas"])
+        completo = res["busquedas_fallidas"] == 0
+        if not completo:
+            print(f"   ⚠️  {perfil.empresa}: {res['busquedas_fallidas']} búsquedas fallidas. "
+                  f"No se registran URLs ni avanza la marca: la próxima corrida repite la ventana")
+        # Reproducir un cassette no cambia el estado: no se registran URLs. Las notas que
+        # el presupuesto o el resumen dejaron afuera no se publicaron: pueden salir la próxima
+        if completo and INCREMENTAL_ACTIVADO and not reproduciendo():
+            registrar_publicadas(res["items_en_prompt"], perfil.empresa)
+        # Una corrida suelta que no llegó hasta la marca anterior no la avanza: quedaría un hueco sin buscar
+        if completo and not reproduciendo() and (ventana_incremental or marca is None or hasta - timedelta(hours=horas) <= marca):
+            marcas.registrar(perfil.empresa, hasta)
+        return completo
+
+async def ejecutar_lote(perfiles: list, concurrencia: int = MAX_EMPRESAS_CONCURRENTES,
+                        perfilar: bool = PERFILADO_ACTIVADO, abrir_navegador: bool = None,
+                        ventana_incremental: bool = False) -> list:
+    """
+    Modo cartera: procesa varias empresas a la vez. Todas comparten el LLM, los
+    transportes HTTP, las caches y los topes globales de concurrencia.
+    Cada corrida deja su traza JSONL (ver utils/trazas.py). Por defecto el navegador
+    se abre sólo cuando hay una única empresa.
+    """
+    semaforo = asyncio.Semaphore(concurrencia)
+    if abrir_navegador is None:
+        abrir_navegador = len(perfiles) == 1
+
+    async def procesar(perfil):
+        async with semaforo:
+            try:
+                # Un reporte con búsquedas fallidas cuenta como fallo: el daemon reintenta antes
+                return await procesar_empresa(perfil, abrir_navegador, ventana_incremental)
+            except Exception as e:
+                print(f"❌ Error procesando {perfil.empresa}: {e}")
+                return False
+
+    with iniciar_traza(perfilar):
+        try:
+            resultados = await asyncio.gather(*(procesar(perfil) for perfil in perfiles))
+        finally:
+            imprimir_resumen_transportes()
+            imprimir_resumen_caches()
+            imprimir_resumen_limitadores()
+            await cerrar_transportes()
+    print(f"🏁 {sum(resultados)}/{len(perfiles)} reportes completos")
+    return resultados
+
+async def ejecutar_daemon(perfiles: list, intervalo_minutos: int = DAEMON_INTERVALO_MINUTOS,
+                          concurrencia: int = MAX_EMPRESAS_CONCURRENTES, perfilar: bool = PERFILADO_ACTIVADO,
+                          ciclos: int = None):
+    """
+    Modo daemon: corre el lote cada `intervalo_minutos`, cada empresa con la ventana
+    desde su última corrida exitosa. Si el proceso estuvo caído o una corrida falló,
+    la empresa sale en la próxima vuelta con la ventana estirada hasta ponerse al día.
+    `ciclos` limita la cantidad de vueltas (None = para siempre).
+    """
+    intervalo = timedelta(minutes=intervalo_minutos)
+    proxima = {}
+    marcas = MarcasAgua()
+    for perfil in perfiles:
+        marca = marcas.ultima(perfil.empresa)
+        proxima[perfil.empresa] = marca + intervalo if marca else datetime.now()
+
+    vuelta = 0
+    while ciclos is None or vuelta < ciclos:
+        siguiente = min(proxima.values())
+        espera = (siguiente - datetime.now()).total_seconds()
+        if espera > 0:
+            print(f"💤 Próxima corrida: {siguiente.strftime('%d/%m/%Y %H:%M')}")
+            await asyncio.sleep(espera)
+        inicio = datetime.now()
+        pendientes = [perfil for perfil in perfiles if proxima[perfil.empresa] <= inicio]
+        print(f"⏰ Corrida programada ({inicio.strftime('%d/%m/%Y %H:%M')}): {len(pendientes)} empresa(s)")
+        resultados = await ejecutar_lote(pendientes, concurrencia, perfilar, abrir_navegador=False,
+                                         ventana_incremental=True)
+        for perfil, ok in zip(pendientes, resultados):
+            proxima[perfil.empresa] = inicio + (intervalo if ok else timedelta(minutes=DAEMON_REINTENTO_MINUTOS))
+        vuelta += 1
@@ -0,0 +1,229 @@
+# benchmarks/correr.py
+"""
+Benchmark de punta a punta contra Serper y LLM locales (sin gastar cuota).
+
+    python -m benchmarks.correr                         # todos los escenarios, 3 repeticiones
+    python -m benchmarks.correr cartera tormenta_429 -r 5
+    python -m benchmarks.correr --json base.json        # guarda resultados
+    python -m benchmarks.correr --comparar base.json    # falla (exit 1) si algo empeoró más de --tolerancia
+
+Cada repetición corre en un proceso aparte con cache, índice de URLs y trazas en un
+directorio temporal, así ninguna corrida se beneficia de la anterior. Los tiempos por
+etapa salen de la traza JSONL de la corrida (utils/trazas.py).
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field, asdict
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ETAPAS = ("empresa", "investigador", "busqueda", "extractor", "redactor", "llm", "exportar")
+
+@dataclass
+class Escenario:
+    descripcion: str
+    empresas: int = 1
+    serper: dict = field(default_factory=dict)  # kwargs de ConfigSerper
+    articulos: dict = None  # kwargs de ConfigArticulos; si se pasa, corre la extracción de notas
+    latencia_llm: float = 0.8
+    tasa_error_llm: float = 0.0
+
+ESCENARIOS = {
+    "una_empresa": Escenario("1 empresa, 20 resultados por consulta"),
+    "cartera": Escenario("5 empresas en paralelo", empresas=5),
+    "volumen_150": Escenario("1 empresa, ~150 notas (5 consultas x 30)", serper={"resultados": 30}),
+    "tormenta_429": Escenario("2 empresas, 30% de respuestas 429", empresas=2, serper={"tasa_429": 0.3}),
+    "articulos": Escenario("1 empresa + texto completo de las notas (5% 404, 2% páginas de 5 MB; un solo host)",
+                           articulos={"tasa_error": 0.05, "tasa_gigantes": 0.02}),
+}
+
+def percentil(valores: list, p: float) -> float:
+    """Percentil por rango más cercano (suficiente para pocas muestras)."""
+    if not valores:
+        return 0.0
+    ordenados = sorted(valores)
+    indice = max(0, min(len(ordenados) - 1, round(p / 100 * len(ordenados) + 0.5) - 1))
+    return ordenados[indice]
+
+# --- Proceso hijo: una repetición ---
+def _perfiles(cantidad: int) -> list:
+    from utils.perfiles import PerfilEmpresa
+    return [PerfilEmpresa(f"Empresa{i}", relacionadas=(f"Subsidiaria {i}A S.A.", f"Subsidiaria {i}B S.A.", f"Marca {i}"),
+                          terminos_sector=("precio soja", "exportación arroz", "tambo leche")) for i in range(cantidad)]
+
+def _pico_memoria_mb() -> float:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)  # Linux: KB
+
+def correr_repeticion(nombre: str, usar_tracemalloc: bool) -> dict:
+    import asyncio
+    import glob
+    import tracemalloc
+    from benchmarks.fakes import ModeloFalso
+    import agente
+    from config import TRAZAS_DIR
+
+    escenario = ESCENARIOS[nombre]
+    agente.configurar_llm(ModeloFalso(latencia=escenario.latencia_llm, tasa_error=escenario.tasa_error_llm))
+    perfiles = _perfiles(escenario.empresas)
+
+    if usar_tracemalloc:
+        tracemalloc.start()
+    inicio = time.perf_counter()
+    resultados = asyncio.run(agente.ejecutar_lote(perfiles, abrir_navegador=False))
+    duracion = time.perf_counter() - inicio
+    pico = (round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1) if usar_tracemalloc
+            else _pico_memoria_mb())
+
+    etapas, resumen = {}, {}
+    for ruta in glob.glob(os.path.join(TRAZAS_DIR, "*.jsonl")):
+        with open(ruta, encoding="utf-8") as f:
+            for linea in f:
+                registro = json.loads(linea)
+                if registro["tipo"] == "span" and registro["span"] in ETAPAS:
+                    etapas.setdefault(registro["span"], []).append(registro["duracion_s"])
+                elif registro["tipo"] == "resumen":
+                    resumen = registro
+    return {"duracion_s": duracion, "empresas": len(perfiles), "empresas_ok": sum(resultados),
+            "pico_mb": pico, "etapas": etapas, "llamadas_llm": resumen.get("llamadas_llm", 0),
+            "tokens": resumen.get("tokens_entrada", 0) + resumen.get("tokens_salida", 0)}
+
+# --- Proceso padre: servidor falso, repeticiones y resumen ---
+def correr_escenario(nombre: str, repeticiones: int, usar_tracemalloc: bool) -> dict:
+    from benchmarks.fakes import ConfigSerper, ServidorSerperFalso, ConfigArticulos, ServidorArticulosFalso
+
+    escenario = ESCENARIOS[nombre]
+    sitio = None
+    config_serper = ConfigSerper(**escenario.serper)
+    if escenario.articulos is not None:
+        sitio = ServidorArticulosFalso(ConfigArticulos(**escenario.articulos)).iniciar()
+        config_serper.url_articulos = sitio.url
+    servidor = ServidorSerperFalso(config_serper).iniciar()
+    print(f"\n🏁 {nombre}: {escenario.descripcion} ({repeticiones} repeticiones)")
+    corridas = []
+    try:
+        for i in range(repeticiones):
+            directorio = tempfile.mkdtemp(prefix="bench_newsletter_")
+            env = dict(os.environ,
+                       PYTHONPATH=RAIZ + os.pathsep + os.environ.get("PYTHONPATH", ""),
+                       SERPER_URL=servidor.url, SERPER_API_KEY="benchmark", OPENAI_API_KEY="benchmark",
+                       NEWSLETTER_CACHE_DIR=os.path.join(directorio, "cache"),
+                       NEWSLETTER_ESTADO_DIR=os.path.join(directorio, "estado"),
+                       NEWSLETTER_REPORTE_OFFLINE="0", NEWSLETTER_SIN_CACHE_LLM="1",
+                       NEWSLETTER_EXTRAER_ARTICULOS="1" if sitio else "0")
+            comando = [sys.executable, "-m", "benchmarks.correr", "--interno", nombre]
+            if usar_tracemalloc:
+                comando.append("--tracemalloc")
+            try:
+                proceso = subprocess.run(comando, cwd=directorio, env=env, capture_output=True, text=True)
+            finally:
+                shutil.rmtree(directorio, ignore_errors=True)
+            lineas = [l for l in proceso.stdout.splitlines() if l.startswith("RESULTADO ")]
+            if proceso.returncode != 0 or not lineas:
+                print(f"   ❌ Repetición {i + 1} falló:\n{proceso.stderr[-2000:]}")
+                continue
+            corrida = json.loads(lineas[-1][len("RESULTADO "):])
+            corridas.append(corrida)
+            print(f"   - repetición {i + 1}: {corrida['duracion_s']:.2f}s, "
+                  f"{corrida['empresas_ok']}/{corrida['empresas']} empresas OK")
+    finally:
+        servidor.detener()
+        if sitio is not None:
+            sitio.detener()
+
+    etapas = {}
+    for corrida in corridas:
+        for etapa, duraciones in corrida["etapas"].items():
+            etapas.setdefault(etapa, []).extend(duraciones)
+    duracion_total = sum(c["duracion_s"] for c in corridas)
+    picos = [c["pico_mb"] for c in corridas if c["pico_mb"] is not None]
+    return {
+        "escenario": asdict(escenario),
+        "repeticiones": len(corridas),
+        "corrida": {f"p{p}": round(percentil([c["duracion_s"] for c in corridas], p), 3) for p in (50, 90, 99)},
+        "etapas": {etapa: {"n": len(d), **{f"p{p}": round(percentil(d, p), 3) for p in (50, 90, 99)}}
+                   for etapa, d in etapas.items()},
+        "throughput_empresas_s": round(sum(c["empresas_ok"] for c in corridas) / duracion_total, 3) if duracion_total else 0,
+        "empresas_fallidas": sum(c["empresas"] - c["empresas_ok"] for c in corridas),
+        "pico_mb": max(picos) if picos else None,
+        "llamadas_llm": sum(c["llamadas_llm"] for c in corridas),
+        "serper": dict(servidor.stats),
+        **({"articulos": dict(sitio.stats)} if sitio else {}),
+    }
+
+def imprimir_resumen(resultados: dict):
+    print("\n📊 RESULTADOS (segundos)")
+    print("=" * 78)
+    for nombre, r in resultados.items():
+        memoria = f"{r['pico_mb']} MB" if r["pico_mb"] is not None else "n/d"
+        print(f"{nombre}: corrida p50 {r['corrida']['p50']} | p90 {r['corrida']['p90']} | "
+              f"{r['throughput_empresas_s']} empresas/s | pico {memoria} | "
+              f"{r['empresas_fallidas']} empresas fallidas | Serper {r['serper']}"
+              + (f" | Artículos {r['articulos']}" if "articulos" in r else ""))
+        for etapa in ETAPAS:
+            if etapa in r["etapas"]:
+                e = r["etapas"][etapa]
+                print(f"   {etapa:<13} n={e['n']:<4} p50 {e['p50']:<7} p90 {e['p90']:<7} p99 {e['p99']}")
+
+def comparar(resultados: dict, base: dict, tolerancia: float) -> list:
+    """Lista de regresiones: etapas más lentas (p50) o menos throughput que la base, más allá de la tolerancia."""
+    regresiones = []
+    for nombre, r in resultados.items():
+        if nombre not in base:
+            continue
+        b = base[nombre]
+        for etapa, e in r["etapas"].items():
+            anterior = b["etapas"].get(etapa, {}).get("p50")
+            if anterior and e["p50"] > anterior * (1 + tolerancia):
+                regresiones.append(f"{nombre}/{etapa}: p50 {anterior}s -> {e['p50']}s")
+        if b["throughput_empresas_s"] and r["throughput_empresas_s"] < b["throughput_empresas_s"] * (1 - tolerancia):
+            regresiones.append(f"{nombre}: throughput {b['throughput_empresas_s']} -> {r['throughput_empresas_s']} empresas/s")
+        if b.get("pico_mb") and r["pico_mb"] and r["pico_mb"] > b["pico_mb"] * (1 + tolerancia):
+            regresiones.append(f"{nombre}: memoria {b['pico_mb']} -> {r['pico_mb']} MB")
+    return regresiones
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.correr", description="Benchmark del pipeline con dobles locales.")
+    parser.add_argument("escenarios", nargs="*", help=f"Por defecto, todos: {', '.join(ESCENARIOS)}")
+    parser.add_argument("-r", "--repeticiones", type=int, default=3)
+    parser.add_argument("--tracemalloc", action="store_true", help="Pico de memoria del heap de Python (más preciso, más lento)")
+    parser.add_argument("--json", help="Guarda los resultados en este archivo")
+    parser.add_argument("--comparar", help="JSON de una corrida anterior contra la cual detectar regresiones")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Margen antes de marcar regresión (0.2 = 20%%)")
+    parser.add_argument("--interno", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    desconocidos = [e for e in args.escenarios + [args.interno or ""] if e and e not in ESCENARIOS]
+    if desconocidos:
+        parser.error(f"escenarios desconocidos: {', '.join(desconocidos)}")
+
+    if args.interno:
+        print("RESULTADO " + json.dumps(correr_repeticion(args.interno, args.tracemalloc)))
+        return 0
+
+    resultados = {nombre: correr_escenario(nombre, args.repeticiones, args.tracemalloc)
+                  for nombre in (args.escenarios or ESCENARIOS)}
+    imprimir_resumen(resultados)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(resultados, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados guardados en {args.json}")
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regresiones = comparar(resultados, json.load(f), args.tolerancia)
+        for regresion in regresiones:
+            print(f"   📉 Regresión: {regresion}")
+        if regresiones:
+            return 1
+        print("✅ Sin regresiones respecto de la base")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
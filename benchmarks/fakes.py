@@ -0,0 +1,252 @@
+# benchmarks/fakes.py
+# Dobles locales de Serper y del LLM para medir el pipeline sin gastar cuota.
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+
+VOCABULARIO = (
+    "adecoagro pilagá arroz leche soja trigo maíz girasol campo precio mercado dólar exportación "
+    "cosecha lluvia sequía planta empleo inversión bolsa acciones molinos sancor gremio productores "
+    "retenciones puerto rosario siembra hectáreas tambo etanol azúcar biogás energía balance "
+    "trimestre ganancias deuda bonos ministerio provincia corrientes entre ríos santa fe córdoba "
+    "clima helada granizo remate feria ganadería frigorífico cuota hilton china brasil uruguay"
+).split()
+MEDIOS = ["clarin.com", "lanacion.com.ar", "infobae.com", "ambito.com", "cronista.com",
+          "perfil.com", "pagina12.com.ar", "agrofy.com.ar", "lavoz.com.ar", "lacapital.com.ar"]
+
+@dataclass
+class ConfigSerper:
+    latencia: float = 0.3          # segundos por respuesta
+    resultados: int = 20           # resultados disponibles por consulta (repartidos en páginas)
+    tasa_error: float = 0.0        # fracción de respuestas 500
+    tasa_429: float = 0.0          # fracción de respuestas 429 (rate limit)
+    tasa_duplicados: float = 0.2   # fracción de notas "sindicadas" (mismo texto, otro medio)
+    url_articulos: str = None      # Si se pasa, los links apuntan a un ServidorArticulosFalso
+
+class ServidorSerperFalso:
+    """Endpoint HTTP compatible con /search de Serper, con latencia y errores configurables."""
+
+    def __init__(self, config: ConfigSerper = None, puerto: int = 0):
+        self.config = config or ConfigSerper()
+        self.stats = {"peticiones": 0, "respuestas_429": 0, "respuestas_500": 0}
+        self._lock = threading.Lock()
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                cuerpo = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                estado, datos = servidor.responder(cuerpo)
+                salida = json.dumps(datos).encode("utf-8")
+                self.send_response(estado)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(salida)))
+                self.end_headers()
+                self.wfile.write(salida)
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", puerto), Manejador)
+        self._http.daemon_threads = True
+        self._hilo = threading.Thread(target=self._http.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._http.server_address[1]}/search"
+
+    def iniciar(self) -> "ServidorSerperFalso":
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+    def responder(self, cuerpo: dict) -> tuple:
+        cfg = self.config
+        time.sleep(cfg.latencia)
+        azar = random.random()
+        with self._lock:
+            self.stats["peticiones"] += 1
+            if azar < cfg.tasa_429:
+                self.stats["respuestas_429"] += 1
+                return 429, {"message": "Too many requests"}
+            if azar < cfg.tasa_429 + cfg.tasa_error:
+                self.stats["respuestas_500"] += 1
+                return 500, {"message": "Internal error"}
+
+        query, pagina = cuerpo.get("q", ""), int(cuerpo.get("page", 1))
+        por_pagina = int(cuerpo.get("num", 10))
+        desde = (pagina - 1) * por_pagina
+        noticias = []
+        for i in range(desde, min(pagina * por_pagina, cfg.resultados)):
+            # Semilla determinista por (query, posición): la misma consulta trae las mismas notas
+            rng = random.Random(f"{query}|{i}")
+            original = i
+            if noticias and rng.random() < cfg.tasa_duplicados:
+                original = rng.randrange(desde, i)  # copia el texto de una nota anterior
+            texto = random.Random(f"{query}|{original}")
+            medio, ruta = rng.choice(MEDIOS), f"nota/{zlib.crc32(query.encode()) % 10000}-{i}?utm_source=serper"
+            noticias.append({
+                "title": " ".join(texto.choice(VOCABULARIO) for _ in range(9)).capitalize(),
+                "link": f"{cfg.url_articulos}/{medio}/{ruta}" if cfg.url_articulos else f"https://www.{medio}/{ruta}",
+                "snippet": " ".join(texto.choice(VOCABULARIO) for _ in range(40)),
+                "source": "Medio",
+                "date": "hace 1 día",
+            })
+        return 200, {"news": noticias}
+
+@dataclass
+class ConfigArticulos:
+    latencia: float = 0.2          # segundos hasta el primer byte
+    parrafos: int = 12             # párrafos de la nota (más menú, scripts y pie alrededor)
+    tasa_error: float = 0.0        # fracción de respuestas 404
+    tasa_gigantes: float = 0.0     # fracción de páginas de ~5 MB (para probar el tope de bytes)
+
+class ServidorArticulosFalso:
+    """
+    Sitio de noticias local: cualquier GET devuelve una nota HTML determinista según la
+    ruta, envuelta en el ruido de una página real (nav, scripts, publicidad, pie).
+    """
+
+    def __init__(self, config: ConfigArticulos = None, puerto: int = 0):
+        self.config = config or ConfigArticulos()
+        self.stats = {"peticiones": 0, "respuestas_404": 0, "paginas_gigantes": 0}
+        self._lock = threading.Lock()
+        servidor = self
+
+        class Manejador(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                estado, trozos, largo = servidor.responder(self.path)
+                self.send_response(estado)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(largo))
+                self.end_headers()
+                try:
+                    for trozo in trozos:
+                        self.wfile.write(trozo)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # El cliente cortó al llegar a su tope: es lo esperado
+
+            def log_message(self, *args):
+                pass
+
+        self._http = ThreadingHTTPServer(("127.0.0.1", puerto), Manejador)
+        self._http.daemon_threads = True
+        self._hilo = threading.Thread(target=self._http.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._http.server_address[1]}"
+
+    def iniciar(self) -> "ServidorArticulosFalso":
+        self._hilo.start()
+        return self
+
+    def detener(self):
+        self._http.shutdown()
+        self._http.server_close()
+
+    def pagina(self, ruta: str) -> str:
+        texto = random.Random(ruta)
+        parrafos = "\n".join(
+            f"<p>{' '.join(texto.choice(VOCABULARIO) for _ in range(texto.randint(25, 60))).capitalize()}.</p>"
+            for _ in range(self.config.parrafos))
+        return (
+            "<!DOCTYPE html><html><head><title>Nota</title><script>var ads = {slots: 4};</script>"
+            "<style>p { margin: 0 }</style></head><body>"
+            "<header><nav><a href='/'>Inicio</a><p>Menú principal con secciones y suscripción al diario</p></nav></header>"
+            f"<article><h1>{ruta}</h1><p>Por Redacción</p>{parrafos}</article>"
+            "<aside><p>Leé también: otras notas relacionadas que no forman parte del cuerpo</p></aside>"
+            "<footer><p>Todos los derechos reservados. Prohibida su reproducción total o parcial.</p></footer>"
+            "</body></html>")
+
+    def responder(self, ruta: str) -> tuple:
+        cfg = self.config
+        time.sleep(cfg.latencia)
+        azar = random.Random(f"{ruta}|azar").random()  # Determinista: la misma nota falla siempre
+        with self._lock:
+            self.stats["peticiones"] += 1
+            if azar < cfg.tasa_error:
+                self.stats["respuestas_404"] += 1
+                return 404, [b"Not found"], 9
+            gigante = azar < cfg.tasa_error + cfg.tasa_gigantes
+            if gigante:
+                self.stats["paginas_gigantes"] += 1
+        cuerpo = self.pagina(ruta).encode("utf-8")
+        if not gigante:
+            return 200, [cuerpo], len(cuerpo)
+        # Relleno sin párrafos antes de la nota: sólo el tope de bytes corta la descarga
+        relleno = b"<div>" + b"x" * 65536 + b"</div>"
+        repeticiones = 5 * 1024 * 1024 // len(relleno)
+        return 200, ([relleno] * repeticiones + [cuerpo]), len(relleno) * repeticiones + len(cuerpo)
+
+class ModeloFalso(BaseChatModel):
+    """
+    Chat model local: espera `latencia` segundos y devuelve un reporte con la estructura
+    esperada (citando los URL_REAL del prompt). Reporta usage_metadata como OpenAI y
+    soporta with_structured_output.
+    """
+    latencia: float = 0.8
+    tasa_error: float = 0.0
+    tokens_salida: int = 900
+    model_name: str = "gpt-4o-mini"  # Mismo modelo/temperatura que config: claves de cache y cassette iguales
+    temperature: float = 0.3
+
+    @property
+    def _llm_type(self) -> str:
+        return "modelo-falso"
+
+    def _respuesta(self, prompt: str) -> AIMessage:
+        if random.random() < self.tasa_error:
+            raise RuntimeError("Error simulado del LLM")
+        urls = re.findall(r"URL_REAL:\s*(\S+)", prompt)[:12]
+        detalle = "\n".join(f"* 😐 Nota [{n}]({url})" for n, url in enumerate(urls, 1)) or "Sin novedades directas"
+        contenido = (
+            "# Reporte de Sentimiento\n\n## 📈 Análisis General\nResumen.\n\n"
+            "## 📊 Reporte de Sentimiento\nTono neutro.\n\n## 🇦🇷 Panorama Nacional\nSin cambios.\n\n"
+            "## 🌍 Panorama Internacional\nEstable.\n\n## 💬 Resumen Conversación Digital\nPoca actividad.\n\n"
+            f"## 📰 Detalle de Noticias\n\n### 🇦🇷 Empresa y Subsidiarias\n{detalle}\n"
+        )
+        tokens_entrada = len(prompt) // 4
+        return AIMessage(content=contenido, usage_metadata={
+            "input_tokens": tokens_entrada, "output_tokens": self.tokens_salida,
+            "total_tokens": tokens_entrada + self.tokens_salida})
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latencia)
+        return ChatResult(generations=[ChatGeneration(message=self._respuesta(messages[-1].content))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latencia)
+        return ChatResult(generations=[ChatGeneration(message=self._respuesta(messages[-1].content))])
+
+    def with_structured_output(self, esquema, include_raw: bool = False, **kwargs):
+        async def clasificar(mensajes):
+            await asyncio.sleep(self.latencia / 2)
+            if random.random() < self.tasa_error:
+                raise RuntimeError("Error simulado del LLM")
+            # Sólo enteros en el esquema de sentimiento: repartimos algo plausible
+            parseado = esquema(**{campo: random.randint(0, 5) for campo in esquema.model_fields})
+            if not include_raw:
+                return parseado
+            tokens_entrada = len(mensajes[-1].content) // 4
+            crudo = AIMessage(content="", usage_metadata={
+                "input_tokens": tokens_entrada, "output_tokens": 40, "total_tokens": tokens_entrada + 40})
+            return {"raw": crudo, "parsed": parseado, "parsing_error": None}
+
+        return RunnableLambda(lambda mensajes: asyncio.run(clasificar(mensajes)), afunc=clasificar)
@@ -9,21 +9,137 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
-# Si no encuentra la variable en el .env, usa "Empresa Genérica" por defecto
-EMPRESA = os.getenv("TARGET_COMPANY", "AdecoAgro") 
-
-# Lista de subsidiarias o marcas relacionadas
-EMPRESAS_RELACIONADAS = ["Pilagá", "Molinos Ala", "La Lácteo"] 
+# Empresa por defecto (se puede pisar con TARGET_COMPANY en el .env).
+# Para varias empresas en una corrida ver utils/perfiles.py
+EMPRESA = os.getenv("TARGET_COMPANY", "Adecoagro")
 
 # Activa el diagnóstico de dependencias (True/False)
 DIAGNOSTICO_ACTIVADO = False
 
 # Parámetros de búsqueda
 DIAS_BUSQUEDA = 2
-EMPRESA = "Adecoagro"
 MIN_NOTICIAS = 5
 MAX_NOTICIAS = 30
 
+# Modelo del redactor
+MODELO_LLM = "gpt-4o-mini"
+TEMPERATURA_LLM = 0.3
+# Precio en USD por millón de tokens (entrada, salida) para estimar el costo en las trazas
+PRECIOS_LLM = {
+    "gpt-4o-mini": {"entrada": 0.15, "salida": 0.60},
+    "gpt-4o": {"entrada": 2.50, "salida": 10.00},
+}
+
+# Presupuesto de tokens del prompt (utils/presupuesto.py)
+PRESUPUESTO_ACTIVADO = True
+PRESUPUESTO_TOKENS_ENTRADA = 16000  # Máximo de tokens de entrada del prompt completo
+PRESUPUESTO_MAX_CHARS_RESUMEN = 220  # Largo al que se recortan los snippets si un bloque no entra
+# Reparto del presupuesto por bloque (en orden de aparición en el prompt)
+PRESUPUESTO_PESOS_BLOQUES = {
+    "internacional": 0.15,
+    "nacional": 0.30,
+    "subsidiarias": 0.20,
+    "sector": 0.20,
+    "social": 0.15,
+}
+
+# Clasificador de sentimiento (utils/metricas.py): ve sólo título y fuente de cada nota del prompt
+SENTIMIENTO_MAX_TOKENS = 3000  # Tope de los titulares que se le mandan (se reparte entre noticias y redes)
+
+# Streaming del redactor: escribe el .md a medida que llega y refresca una vista previa HTML
+STREAMING_ACTIVADO = False
+
+# Modo map-reduce del redactor para días con mucho volumen
+MAPREDUCE_ACTIVADO = True
+# Con presupuesto activo se resume por partes cuando el presupuesto tendría que descartar notas
+# (y el prompt "reduce" igual se controla contra el presupuesto). Sin presupuesto decide este umbral:
+MAPREDUCE_UMBRAL_TOKENS = 12000
+MAPREDUCE_TOKENS_POR_CHUNK = 3000   # Tamaño de cada parte que resume una llamada "map"
+MAPREDUCE_CONCURRENCIA = 4          # Llamadas "map" simultáneas
+
+# Búsquedas en paralelo (Serper)
+SERPER_URL = os.getenv("SERPER_URL", "https://google.serper.dev/search")
+SERPER_RESULTADOS_POR_PAGINA = 10  # Hasta 10 resultados Serper cobra 1 crédito; consultas angostas no pagan de más
+SERPER_MAX_PAGINAS = 5             # Tope de páginas por consulta (se piden sólo mientras traen links nuevos)
+QUERY_MAX_PALABRAS = 32  # Google ignora lo que pasa de 32 palabras (los OR cuentan)
+QUERY_MAX_OR = 8         # Máximo de OR por query: más alternativas diluyen el ranking
+MAX_BUSQUEDAS_CONCURRENTES = 5  # Tope de consultas simultáneas a Serper (global al proceso)
+MAX_EMPRESAS_CONCURRENTES = 3   # Modo lote: empresas procesadas a la vez
+MAX_LLM_CONCURRENTES = 4        # Tope de llamadas simultáneas al LLM (global al proceso)
+
+# Rate limits por proveedor (utils/limitador.py), compartidos por todo el proceso.
+# rps = peticiones por segundo, tpm = tokens por minuto (sólo LLM). Ajustar al plan contratado.
+LIMITES_PROVEEDORES = {
+    "serper": {"rps": 5},
+    "openai": {"rps": 8, "tpm": 200000},
+}
+LIMITE_MAX_ESPERA = 120          # Segundos: si hay que esperar más, se corta con LimiteExcedido
+LLM_TOKENS_SALIDA_ESTIMADOS = 2500  # Se suman al prompt al reservar tokens por minuto
+
+# Transporte HTTP compartido (utils/transporte.py)
+HTTP_TIMEOUT_CONEXION = 5     # segundos
+HTTP_TIMEOUT_LECTURA = 30     # segundos
+HTTP_MAX_CONEXIONES = 20
+HTTP_MAX_KEEPALIVE = 10
+HTTP_MAX_REINTENTOS = 3       # Reintentos ante 429/5xx o errores de red
+HTTP_BACKOFF_BASE = 0.5       # segundos (se duplica en cada intento, con jitter)
+HTTP_BACKOFF_MAX = 10         # segundos
+CIRCUITO_UMBRAL_FALLOS = 5    # Fallos seguidos que abren el circuito
+CIRCUITO_SEGUNDOS_ABIERTO = 60
+
+# Texto completo de las notas (tools/extractor.py): suma tiempo y tokens, por eso va apagado por defecto
+EXTRACCION_ACTIVADO = os.getenv("NEWSLETTER_EXTRAER_ARTICULOS") == "1"
+EXTRACCION_MAX_CONCURRENTES = 10    # Descargas simultáneas en total...
+EXTRACCION_MAX_POR_HOST = 2         # ...y por sitio, para no martillar a un mismo medio
+EXTRACCION_TIMEOUT = 10             # Segundos por nota (conexión + descarga)
+EXTRACCION_MAX_BYTES = 1_500_000    # Se deja de leer la página pasado este tamaño
+EXTRACCION_MAX_CHARS = 1500         # Texto que se guarda (y llega al prompt) por nota
+EXTRACCION_CACHE_TTL_DIAS = 7
+
+# Cache en disco (utils/cache.py)
+CACHE_DIR = os.getenv("NEWSLETTER_CACHE_DIR", ".cache")
+CACHE_MAX_ENTRADAS = 5000
+CACHE_MAX_MB = 200
+CACHE_SERPER_ACTIVADO = True
+CACHE_SERPER_FRACCION_VENTANA = 0.125  # TTL = 1/8 de la ventana qdr (d2 -> 6 horas)
+CACHE_LLM_ACTIVADO = True  # Bypass puntual: NEWSLETTER_SIN_CACHE_LLM=1
+CACHE_LLM_TTL_DIAS = 7
+
+# Estado persistente entre corridas (índice de URLs publicadas, etc.)
+ESTADO_DIR = os.getenv("NEWSLETTER_ESTADO_DIR", ".estado")
+# Descarta noticias que ya salieron en un reporte anterior. Bypass: NEWSLETTER_INCREMENTAL=0 (o `--no-incremental`)
+INCREMENTAL_ACTIVADO = os.getenv("NEWSLETTER_INCREMENTAL", "1") == "1"
+
+# Modo daemon (`main.py daemon`): cada corrida busca desde la marca de agua de la anterior (utils/ventanas.py)
+DAEMON_INTERVALO_MINUTOS = 60
+DAEMON_REINTENTO_MINUTOS = 10   # Espera antes de reintentar una empresa cuyo reporte falló
+VENTANA_MIN_HORAS = 1
+VENTANA_MAX_HORAS = 7 * 24      # Tope del catch-up después de muchas corridas perdidas
+VENTANA_SOLAPAMIENTO_HORAS = 1  # Margen por la demora con que Google indexa las notas
+
+# Detección de notas sindicadas (utils/deduplicador.py)
+DEDUP_ACTIVADO = True
+DEDUP_UMBRAL = 0.5          # Similitud de Jaccard estimada para considerar "misma historia"
+DEDUP_PERMUTACIONES = 64    # Largo de la firma MinHash
+DEDUP_BANDAS = 16           # Bandas LSH (4 filas c/u)
+
+# Reporte HTML autocontenido (utils/assets.py)
+REPORTE_OFFLINE = os.getenv("NEWSLETTER_REPORTE_OFFLINE", "1") == "1"  # Inlinea JS, fuentes y bandera
+ASSETS_DIR = os.path.join(CACHE_DIR, "assets")  # Se descargan una vez y se reusan en cada export
+
+# Archivo de las notas de cada corrida (utils/archivo.py): permite rehacer análisis sin volver a Serper
+ARCHIVO_ACTIVADO = True
+ARCHIVO_DIR = os.path.join(ESTADO_DIR, "archivo")
+
+# Historial de métricas por empresa (utils/historial.py): gráficos de tendencia en el reporte
+HISTORIAL_ACTIVADO = True
+HISTORIAL_PERIODOS = 30  # Reportes anteriores que se muestran en las tendencias
+
+# Trazas de ejecución (utils/trazas.py): un JSONL por corrida con tiempos, bytes, tokens y costo
+TRAZAS_ACTIVADO = True
+TRAZAS_DIR = os.path.join(ESTADO_DIR, "trazas")
+PERFILADO_ACTIVADO = os.getenv("NEWSLETTER_PERFILAR") == "1"  # cProfile + tracemalloc (o `run --perfilar`)
+
 # Empresas relacionadas/subsidiarias de Adecoagro (Nombres para búsqueda)
 EMPRESAS_RELACIONADAS = [
     "Adeco Agropecuaria S.A.",
@@ -56,6 +172,16 @@ TERMINOS_SECTOR = [
     "Sector agropecuario sequía"
 ]
 
+# Redes sociales que se miden: nombre -> (dominios, color en el treemap)
+REDES_SOCIALES = {
+    "Facebook": (("facebook.com", "fb.com"), "#1877F2"),
+    "Instagram": (("instagram.com",), "#C13584"),
+    "X (Twitter)": (("twitter.com", "x.com"), "#000000"),
+    "LinkedIn": (("linkedin.com",), "#0A66C2"),
+    "TikTok": (("tiktok.com",), "#00F2EA"),
+    "YouTube": (("youtube.com", "youtu.be"), "#FF0000"),
+}
+
 # Colores de la marca Adecoagro
 COLOR_PRINCIPAL = "#2E7D32"  # Verde oscuro
 COLOR_SECUNDARIO = "#FFC107"  # Amarillo trigo
@@ -1,222 +1,152 @@
-import sys
+# main.py
+# Punto de entrada (CLI). Las dependencias pesadas (langchain, langgraph, el agente)
+# se importan dentro de cada subcomando: `--help` y `check` arrancan al instante.
+import argparse
+import os
 import re
-from datetime import datetime, timedelta
-from dotenv import load_dotenv
-from typing import TypedDict
-
-from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage
-from langgraph.graph import StateGraph, END
-
-# Asegúrate de importar EMPRESAS_RELACIONADAS aquí
-from config import EMPRESA, DIAS_BUSQUEDA, EMPRESAS_RELACIONADAS, TERMINOS_SECTOR
-from utils.verificador import verificar_claves
-from tools.buscador import tool_buscar_noticias
-from utils.exportador_html import exportar_reporte
-
-load_dotenv()
-
-if not verificar_claves():
-    sys.exit(1)
-
-FECHA_HOY = datetime.now()
-FECHA_INICIO = FECHA_HOY - timedelta(days=DIAS_BUSQUEDA)
-RANGO_FECHAS_STR = f"Del {FECHA_INICIO.strftime('%d/%m/%Y')} al {FECHA_HOY.strftime('%d/%m/%Y')}"
-
-class AgentState(TypedDict):
-    raw_content: str
-    social_content: str
-    source_count: int
-    final_report: str
-
-llm = ChatOpenAI(model="gpt-4o-mini", temperature=0.3)
-
-def filtrar_y_acumular(texto_nuevo: str, urls_vistas: set) -> str:
-    if not texto_nuevo or "ITEM_" not in texto_nuevo:
-        return texto_nuevo
-    bloques = texto_nuevo.split("ITEM_")
-    texto_limpio = []
-    patron_url = re.compile(r"URL_REAL:\s*(.+)")
-
-    for bloque in bloques:
-        if not bloque.strip(): continue
-        bloque_full = f"ITEM_{bloque}"
-        match = patron_url.search(bloque_full)
-        if match:
-            url = match.group(1).strip()
-            if url in urls_vistas:
-                continue
-            urls_vistas.add(url)
-            texto_limpio.append(bloque_full)
-        else:
-            texto_limpio.append(bloque_full)
-    return "".join(texto_limpio)
-
-def investigador_node(state: AgentState):
-    print(f"🕵️  Iniciando investigación para {EMPRESA}: {RANGO_FECHAS_STR}")
-    
-    urls_vistas_global = set()
-
-    # 1. INTERNACIONAL
-    print(f"   - Internacional...")
-    raw_global = tool_buscar_noticias.invoke({
-        "query": f"{EMPRESA} stock earnings agriculture finance", 
-        "dias": DIAS_BUSQUEDA
-    })
-    res_global = filtrar_y_acumular(raw_global, urls_vistas_global)
-    
-    # 2. NACIONAL (Marca Principal)
-    # MODIFICADO: Usa la variable EMPRESA
-    print(f"   - Nacional ({EMPRESA})...")
-    raw_nac_main = tool_buscar_noticias.invoke({
-        "query": f'"{EMPRESA}" Argentina', 
-        "dias": DIAS_BUSQUEDA
-    })
-    res_nac_main = filtrar_y_acumular(raw_nac_main, urls_vistas_global)
-    
-    # 3. NACIONAL (Subsidiarias)
-    print(f"   - Subsidiarias...")
-    # MODIFICADO: Usa la lista importada dinámicamente
-    subs_clean = " OR ".join([f'"{e}"' for e in EMPRESAS_RELACIONADAS[:4]])
-    raw_nac_sub = tool_buscar_noticias.invoke({
-        "query": f"({subs_clean}) Argentina", 
-        "dias": DIAS_BUSQUEDA
-    })
-    res_nac_sub = filtrar_y_acumular(raw_nac_sub, urls_vistas_global)
-
-    # 4. SECTOR Y COMPETENCIA
-    print(f"   - Sector y Competencia...")
-    query_sector = " OR ".join(TERMINOS_SECTOR)
-    raw_sector = tool_buscar_noticias.invoke({
-        "query": f"({query_sector}) Argentina",
-        "dias": DIAS_BUSQUEDA
-    })
-    res_sector = filtrar_y_acumular(raw_sector, urls_vistas_global)
-    
-    # 5. REDES SOCIALES
-    print(f"   - Redes Sociales...")
-    res_social = tool_buscar_noticias.invoke({
-        "query": f'"{EMPRESA}" (site:twitter.com OR site:facebook.com OR site:instagram.com OR site:linkedin.com OR site:youtube.com)', 
-        "dias": DIAS_BUSQUEDA
-    })
-    
-    full_text = (
-        f"=== BLOQUE INTERNACIONAL ===\n{res_global}\n\n"
-        f"=== BLOQUE NACIONAL (MARCA PRINCIPAL) ===\n{res_nac_main}\n\n"
-        f"=== BLOQUE NACIONAL (SUBSIDIARIAS) ===\n{res_nac_sub}\n\n"
-        f"=== BLOQUE SECTOR/COMPETENCIA ===\n{res_sector}"
-    )
-    
-    count = len(urls_vistas_global)
-    return {"raw_content": full_text, "social_content": res_social, "source_count": count}
-
-def redactor_node(state: AgentState):
-    print("✍️  Redactor generando reporte con formato visual...")
-    
-    news_data = state["raw_content"]
-    social_data = state["social_content"]
-    count = state["source_count"]
-    
-    # --- CONSTRUCCIÓN DINÁMICA DEL PROMPT ---
-    # Creamos la lista de subsidiarias formateada para que el LLM sepa qué buscar
-    # Ejemplo resultado: "* Menciones Pilagá: [Número]\n    * Menciones Molinos Ala: [Número]"
-    lista_subsidiarias_prompt = "\n    ".join([f"* Menciones {sub}: [Número]" for sub in EMPRESAS_RELACIONADAS])
-    
-    prompt = f"""
-    Eres un analista de inteligencia corporativa experto. Genera el reporte para la empresa: {EMPRESA}.
-    
-    RANGO DE FECHAS VÁLIDO: {RANGO_FECHAS_STR}
-    
-    INPUT NOTICIAS:
-    {news_data}
-    
-    INPUT SOCIAL:
-    {social_data}
-    
-    INSTRUCCIONES OBLIGATORIAS:
-    1. **NO INVENTAR LINKS:** Usa solo los `URL_REAL` provistos.
-    2. **DEDUPLICACIÓN SEMÁNTICA (CRÍTICO):** 
-       - Si encuentras múltiples noticias cubriendo el **MISMO HECHO**, AGRÚPALAS.
-       - Usa el título más descriptivo.
-    3. **CLASIFICACIÓN:**
-       - Noticias de **{EMPRESA}** y sus marcas relacionadas ({', '.join(EMPRESAS_RELACIONADAS)}) van primero.
-       - Noticias generales del sector van en su sección, salvo que mencionen explícitamente a {EMPRESA}.
-    4. **SENTIMIENTO VISUAL:** Usa ÚNICAMENTE: 🙂, 😐, 😠.
-    
-    ESTRUCTURA DE SALIDA (Markdown estricto):
-    
-    # Reporte de Sentimiento - {EMPRESA}
-    **Período:** {RANGO_FECHAS_STR} | **Fuentes Únicas:** {count}
-    
-    ## 📈 Análisis General
-    [Resumen ejecutivo de 1 párrafo sobre la situación de la empresa y el sector]
-    
-    ## 📊 Reporte de Sentimiento
-    
-    ### Datos Sentimiento
-    * Positivo: [Número]
-    * Neutro: [Número]
-    * Negativo: [Número]
-    
-    ### Datos Volumen por Marca
-    * Menciones {EMPRESA}: [Número]
-    {lista_subsidiarias_prompt}
-    
-    ## 🇦🇷 Panorama Nacional
-    [Análisis coyuntura local]
-    
-    ## 🌍 Panorama Internacional
-    [Análisis mercado global/acciones]
-    
-    ## 💬 Resumen Conversación Digital
-    
- ### Data Social
-    * Total Menciones: [Suma]
-    [LISTA DINÁMICA: SOLO REDES CON MENCIONES > 0]
-    * [Nombre Red]: [N]
-    ...
-    * Social Positivo: [N]
-    * Social Neutro: [N]
-    * Social Negativo: [N]
-    
-    [Breve análisis redes]
-    
-    ## 📰 Detalle de Noticias
-    
-    ### 🇦🇷 {EMPRESA} y Subsidiarias
-    [Lista noticias directas agrupadas por tema. Si no hay: "Sin novedades directas".]
-    
-    ### 🚜 Novedades del Sector (Competencia y Contexto)
-    [Lista noticias sectoriales.]
-
-    ### 🌐 Internacional
-    [Lista noticias internacionales.]
-    """
-    
-    response = llm.invoke([HumanMessage(content=prompt)])
-    return {"final_report": response.content}
-
-workflow = StateGraph(AgentState)
-workflow.add_node("investigador", investigador_node)
-workflow.add_node("redactor", redactor_node)
-
-workflow.set_entry_point("investigador")
-workflow.add_edge("investigador", "redactor")
-workflow.add_edge("redactor", END)
-
-app = workflow.compile()
+import sys
 
-if __name__ == "__main__":
-    print(f"🚀 Sistema v10.2 (Agnóstico | Fecha: {RANGO_FECHAS_STR})")
+VERSION = "10.2"
+SUBCOMANDOS = {"run", "daemon", "export-only", "check"}
+
+def _aplicar_no_incremental(args):
+    # config.py lee la variable al importarse: hay que fijarla antes de cualquier import del proyecto
+    if args.no_incremental:
+        os.environ["NEWSLETTER_INCREMENTAL"] = "0"
+
+def cmd_run(args) -> int:
+    _aplicar_no_incremental(args)
+    from utils.verificador import verificar_claves
+    # Reproduciendo no se usa la red: no hacen falta las API keys
+    if not args.reproducir and not verificar_claves():
+        return 1
+
+    import asyncio
+    from utils.cassette import activar_cassette, cerrar_cassette
+    if args.grabar or args.reproducir:
+        activar_cassette(args.grabar or args.reproducir, "grabar" if args.grabar else "reproducir")
+    from agente import ejecutar_lote, rango_fechas
+    from utils.perfiles import perfil_por_defecto, cargar_perfiles
+
+    print(f"🚀 Sistema v{VERSION} (Agnóstico | Fecha: {rango_fechas()})")
+    # Sin archivo de perfiles: la empresa de config.py
+    perfiles = cargar_perfiles(args.perfiles) if args.perfiles else [perfil_por_defecto()]
+    kwargs = {"concurrencia": args.concurrencia} if args.concurrencia else {}
+    if args.perfilar:
+        kwargs["perfilar"] = True
+    if args.no_abrir:
+        kwargs["abrir_navegador"] = False
+    try:
+        resultados = asyncio.run(ejecutar_lote(perfiles, **kwargs))
+    finally:
+        cerrar_cassette()
+    return 0 if all(resultados) else 1
+
+def cmd_daemon(args) -> int:
+    _aplicar_no_incremental(args)
+    from utils.verificador import verificar_claves
+    if not verificar_claves():
+        return 1
+
+    import asyncio
+    from agente import ejecutar_daemon
+    from utils.perfiles import perfil_por_defecto, cargar_perfiles
+
+    perfiles = cargar_perfiles(args.perfiles) if args.perfiles else [perfil_por_defecto()]
+    kwargs = {"concurrencia": args.concurrencia} if args.concurrencia else {}
+    if args.cada:
+        kwargs["intervalo_minutos"] = args.cada
+    if args.perfilar:
+        kwargs["perfilar"] = True
+    print(f"🚀 Sistema v{VERSION} en modo daemon ({len(perfiles)} empresa(s), Ctrl+C para salir)")
     try:
-        res = app.invoke({
-            "raw_content": "", 
-            "social_content": "", 
-            "source_count": 0, 
-            "final_report": ""
-        })
-        exportar_reporte(res["final_report"], EMPRESA)
+        asyncio.run(ejecutar_daemon(perfiles, ciclos=args.ciclos, **kwargs))
+    except KeyboardInterrupt:
+        print("🛑 Daemon detenido")
+    return 0
+
+def cmd_export_only(args) -> int:
+    import json
+    from datetime import datetime
+    from config import EMPRESA
+    from utils.exportador_html import exportar_reporte
+    from utils.metricas import MetricasReporte
+
+    with open(args.markdown, encoding="utf-8") as f:
+        contenido = f.read()
+    base = os.path.splitext(args.markdown)[0]
+    # reporte_<empresa>_<AAAAMMDD>_<HHMMSS>.md
+    match = re.fullmatch(r"reporte_(.+)_(\d{8}_\d{6})", os.path.basename(base))
+    empresa = args.empresa or (match.group(1) if match else EMPRESA)
+    # Las tendencias muestran el historial hasta la fecha del reporte, no hasta hoy
+    fecha = datetime.strptime(match.group(2), "%Y%m%d_%H%M%S") if match else None
+
+    metricas = None
+    ruta_metricas = f"{base}_metricas.json"
+    if os.path.exists(ruta_metricas):
+        with open(ruta_metricas, encoding="utf-8") as f:
+            metricas = MetricasReporte.desde_dict(json.load(f))
+    exportar_reporte(contenido, empresa, not args.no_abrir, metricas, fecha)
+    return 0
+
+def cmd_check(args) -> int:
+    from utils.verificador import verificar_claves
+    from utils.diagnostico import verificar_dependencias
+    claves_ok = verificar_claves()
+    print()
+    dependencias_ok = verificar_dependencias()
+    return 0 if claves_ok and dependencias_ok else 1
+
+def crear_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="main.py", description="Newsletter de inteligencia corporativa.")
+    parser.add_argument("--version", action="version", version=f"%(prog)s {VERSION}")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_run = sub.add_parser("run", help="Investiga y genera el reporte (comando por defecto)")
+    p_run.add_argument("perfiles", nargs="?", help="JSON con la lista de empresas (modo cartera)")
+    p_run.add_argument("--concurrencia", type=int, help="Empresas en paralelo (default: MAX_EMPRESAS_CONCURRENTES)")
+    p_run.add_argument("--perfilar", action="store_true", help="Agrega cProfile y tracemalloc a la traza de la corrida")
+    p_run.add_argument("--no-abrir", action="store_true", help="No abrir el navegador")
+    p_run.add_argument("--no-incremental", action="store_true",
+                       help="No descartar ni registrar noticias ya publicadas (NEWSLETTER_INCREMENTAL=0)")
+    cassette = p_run.add_mutually_exclusive_group()
+    cassette.add_argument("--grabar", metavar="CASSETTE", help="Graba Serper, LLM e índice de URLs en este archivo (.json.gz)")
+    cassette.add_argument("--reproducir", metavar="CASSETTE", help="Repite una corrida grabada, sin red y con su misma fecha")
+    p_run.set_defaults(func=cmd_run)
+
+    p_daemon = sub.add_parser("daemon", help="Corre periódicamente buscando sólo desde la corrida anterior")
+    p_daemon.add_argument("perfiles", nargs="?", help="JSON con la lista de empresas (modo cartera)")
+    p_daemon.add_argument("--cada", type=int, metavar="MINUTOS", help="Intervalo entre corridas (default: DAEMON_INTERVALO_MINUTOS)")
+    p_daemon.add_argument("--concurrencia", type=int, help="Empresas en paralelo (default: MAX_EMPRESAS_CONCURRENTES)")
+    p_daemon.add_argument("--perfilar", action="store_true", help="Agrega cProfile y tracemalloc a la traza de cada corrida")
+    p_daemon.add_argument("--ciclos", type=int, help="Corta después de N corridas (por defecto sigue indefinidamente)")
+    p_daemon.add_argument("--no-incremental", action="store_true",
+                          help="No descartar ni registrar noticias ya publicadas (NEWSLETTER_INCREMENTAL=0)")
+    p_daemon.set_defaults(func=cmd_daemon)
+
+    p_exp = sub.add_parser("export-only", help="Regenera el HTML desde un reporte Markdown ya generado")
+    p_exp.add_argument("markdown", help="Archivo reporte_<empresa>_<fecha>.md")
+    p_exp.add_argument("--empresa", help="Nombre de la empresa (por defecto se toma del nombre del archivo)")
+    p_exp.add_argument("--no-abrir", action="store_true", help="No abrir el navegador")
+    p_exp.set_defaults(func=cmd_export_only)
+
+    p_check = sub.add_parser("check", help="Verifica API keys y versiones de dependencias")
+    p_check.set_defaults(func=cmd_check)
+    return parser
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # Compatibilidad: `python main.py` y `python main.py perfiles.json` siguen siendo `run`
+    if not argv or (argv[0] not in SUBCOMANDOS and not argv[0].startswith("-")):
+        argv = ["run"] + argv
+    args = crear_parser().parse_args(argv)
+    try:
+        return args.func(args)
     except Exception as e:
         print(f"❌ Error en la ejecución: {e}")
         import traceback
         traceback.print_exc()
+        return 1
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,13 @@
+# tests/conftest.py
+# config.py lee el entorno al importarse: cache y estado van a un directorio temporal
+# antes de que cualquier test importe módulos del proyecto.
+import os
+import sys
+import tempfile
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+_directorio = tempfile.mkdtemp(prefix="tests_newsletter_")
+os.environ["NEWSLETTER_CACHE_DIR"] = os.path.join(_directorio, "cache")
+os.environ["NEWSLETTER_ESTADO_DIR"] = os.path.join(_directorio, "estado")
@@ -0,0 +1,63 @@
+# tests/test_buscador.py
+import pytest
+from config import MAX_NOTICIAS, SERPER_MAX_PAGINAS
+from tools.buscador import Paginador
+
+def _pagina(cantidad: int, desde: int = 0) -> dict:
+    return {"organic": [{"title": f"Nota {i}", "link": f"https://medio.com/nota-{i}", "snippet": "..."}
+                        for i in range(desde, desde + cantidad)]}
+
+def test_una_pagina_corta_no_detiene_la_paginacion():
+    paginador = Paginador("q")
+    # Google devuelve 9 orgánicos aunque haya más páginas
+    siguientes = paginador.procesar([1], [_pagina(9)])
+    assert siguientes == [2, 3, 4]
+    assert paginador.procesar(siguientes, [_pagina(9, 9 * (p - 1)) for p in siguientes]) == []
+    assert len(paginador.items) == MAX_NOTICIAS
+
+def test_pagina_sin_links_nuevos_corta_despues_de_sumar_el_lote():
+    paginador = Paginador("q")
+    siguientes = paginador.procesar([1], [_pagina(10)])
+    assert siguientes == [2, 3]
+    # La 2 repite la 1, pero la 3 (ya pagada) trae notas nuevas: se suman igual
+    assert paginador.procesar([2, 3], [_pagina(10), _pagina(10, 10)]) == []
+    assert len(paginador.items) == 20
+    assert paginador.motivo == "página 2 sin links nuevos"
+    assert paginador.paginas == 3
+
+def test_pagina_vacia_corta():
+    paginador = Paginador("q")
+    paginador.procesar([1], [_pagina(10)])
+    assert paginador.procesar([2, 3], [_pagina(4, 10), _pagina(0)]) == []
+    assert len(paginador.items) == 14
+    assert paginador.motivo == "página 3 vacía"
+
+def test_tope_de_noticias():
+    paginador = Paginador("q")
+    paginador.procesar([1], [_pagina(10)])
+    # El lote trae más de lo que entra: se corta en el tope y el motivo es el tope
+    assert paginador.procesar([2, 3], [_pagina(10, 10), _pagina(10, 20)]) == []
+    assert len(paginador.items) == MAX_NOTICIAS
+    assert paginador.motivo == f"tope de {MAX_NOTICIAS}"
+
+def test_maximo_de_paginas(monkeypatch):
+    import tools.buscador as buscador
+    monkeypatch.setattr(buscador, "MAX_NOTICIAS", 1000)
+    paginador = Paginador("q")
+    paginas, pedidas = [1], 0
+    while paginas:
+        pedidas += len(paginas)
+        paginas = paginador.procesar(paginas, [_pagina(10, 10 * (p - 1)) for p in paginas])
+    assert pedidas == SERPER_MAX_PAGINAS
+    assert paginador.motivo == f"máximo de {SERPER_MAX_PAGINAS} páginas"
+
+def test_error_en_pagina_extra_conserva_lo_demas():
+    paginador = Paginador("q")
+    paginador.procesar([1], [_pagina(10)])
+    assert paginador.procesar([2, 3], [RuntimeError("503"), _pagina(10, 10)]) == []
+    assert len(paginador.items) == 20
+    assert paginador.error is not None
+
+def test_error_en_la_primera_pagina_se_propaga():
+    with pytest.raises(RuntimeError):
+        Paginador("q").procesar([1], [RuntimeError("401")])
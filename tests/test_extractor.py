@@ -0,0 +1,120 @@
+# tests/test_extractor.py
+import asyncio
+import threading
+import time
+import pytest
+from benchmarks.fakes import ConfigArticulos, ServidorArticulosFalso
+from config import EXTRACCION_MAX_BYTES, EXTRACCION_MAX_POR_HOST
+from tools.extractor import ExtractorTexto, extraer_textos
+from utils.noticias import NoticiaItem
+from utils.transporte import obtener_transporte, cerrar_transportes
+
+@pytest.fixture
+def sitio():
+    def iniciar(**config):
+        servidor = ServidorArticulosFalso(ConfigArticulos(**config)).iniciar()
+        servidores.append(servidor)
+        return servidor
+    servidores = []
+    yield iniciar
+    for servidor in servidores:
+        servidor.detener()
+
+def _extraer(items: list) -> int:
+    async def correr():
+        try:
+            return await extraer_textos(items)
+        finally:
+            await cerrar_transportes()
+    return asyncio.run(correr())
+
+def test_conserva_el_cuerpo_y_descarta_el_ruido():
+    html = ServidorArticulosFalso(ConfigArticulos(parrafos=3)).pagina("/nota-1")
+    extractor = ExtractorTexto(max_chars=100_000)
+    # Por partes, como llega en streaming (cortando etiquetas a la mitad)
+    for i in range(0, len(html), 97):
+        extractor.feed(html[i:i + 97])
+    extractor.close()
+    texto = extractor.texto()
+
+    assert len(extractor.parrafos) == 3
+    assert all(parrafo in texto for parrafo in extractor.parrafos)
+    for ruido in ("Menú principal", "Leé también", "derechos reservados", "var ads", "Por Redacción"):
+        assert ruido not in texto
+
+def test_recorta_en_max_chars():
+    html = ServidorArticulosFalso(ConfigArticulos(parrafos=20)).pagina("/larga")
+    extractor = ExtractorTexto(max_chars=300)
+    extractor.feed(html)
+    extractor.close()
+    assert len(extractor.texto()) <= 301  # + "…"
+    assert extractor.texto().endswith("…")
+
+def test_descarga_y_respeta_el_tope_por_sitio(sitio):
+    servidor = sitio(latencia=0.1)
+    en_curso, maximo, lock = 0, 0, threading.Lock()
+    responder = servidor.responder
+
+    def contar(ruta):
+        nonlocal en_curso, maximo
+        with lock:
+            en_curso += 1
+            maximo = max(maximo, en_curso)
+        try:
+            return responder(ruta)
+        finally:
+            with lock:
+                en_curso -= 1
+
+    servidor.responder = contar
+    items = [NoticiaItem(f"Nota {i}", f"{servidor.url}/nota-{i}", bloque="nacional") for i in range(8)]
+    items.append(NoticiaItem("Post", f"{servidor.url}/post", bloque="social"))
+
+    assert _extraer(items) == 8
+    assert all(item.texto for item in items[:8])
+    assert items[-1].texto == ""  # Las de redes no se bajan
+    assert servidor.stats["peticiones"] == 8
+    assert 1 < maximo <= EXTRACCION_MAX_POR_HOST
+
+def test_la_segunda_vez_sale_de_cache(sitio):
+    servidor = sitio(latencia=0)
+    items = [NoticiaItem("Nota", f"{servidor.url}/cacheada?utm_source=x", bloque="sector")]
+    _extraer(items)
+    # Otra URL con el mismo canónico: no vuelve a pedirse
+    repetida = [NoticiaItem("Nota", f"{servidor.url}/cacheada", bloque="sector")]
+    assert _extraer(repetida) == 1
+    assert repetida[0].texto == items[0].texto
+    assert servidor.stats["peticiones"] == 1
+
+def test_corta_la_descarga_en_max_bytes(sitio):
+    servidor = sitio(latencia=0, tasa_gigantes=1.0)
+    transporte = obtener_transporte("articulos")
+    antes = transporte.stats["bytes_recibidos"]
+
+    items = [NoticiaItem("Gigante", f"{servidor.url}/gigante", bloque="nacional")]
+    assert _extraer(items) == 0
+    # La nota está después de ~5 MB de relleno: nunca se llega a leer
+    assert items[0].texto == ""
+    leidos = transporte.stats["bytes_recibidos"] - antes
+    assert EXTRACCION_MAX_BYTES < leidos < EXTRACCION_MAX_BYTES + 256 * 1024
+
+def test_un_sitio_lento_no_frena_a_los_demas(sitio):
+    # Muchas notas de un sitio y dos de otro: las del segundo no esperan detrás de la cola del primero
+    lento, rapido = sitio(latencia=0.3), sitio(latencia=0.3)
+    terminadas = {}
+    responder = rapido.responder
+
+    def registrar(ruta):
+        respuesta = responder(ruta)
+        terminadas[ruta] = time.monotonic()
+        return respuesta
+
+    rapido.responder = registrar
+    items = [NoticiaItem(f"Nota {i}", f"{lento.url}/lenta-{i}", bloque="nacional") for i in range(20)]
+    # Otro nombre para el mismo 127.0.0.1: para el extractor es otro sitio
+    otro_host = rapido.url.replace("127.0.0.1", "localhost")
+    items += [NoticiaItem(f"Otra {i}", f"{otro_host}/rapida-{i}", bloque="sector") for i in range(2)]
+    inicio = time.monotonic()
+    assert _extraer(items) == 22
+    assert len(terminadas) == 2
+    assert max(terminadas.values()) - inicio < 1.5  # Con el orden invertido: ~3s
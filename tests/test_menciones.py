@@ -0,0 +1,39 @@
+# tests/test_menciones.py
+from utils.menciones import AhoCorasick, alias_de, contar_menciones
+from utils.noticias import NoticiaItem
+from utils.perfiles import PerfilEmpresa
+
+def _nota(texto: str) -> NoticiaItem:
+    return NoticiaItem(texto, "https://medio.com/nota")
+
+def test_patrones_superpuestos():
+    matcher = AhoCorasick({"he": "he", "she": "she", "his": "his", "hers": "hers"})
+    assert matcher.buscar("ushers") == {"she", "he", "hers"}
+    assert matcher.buscar("ahishers") == {"his", "she", "he", "hers"}
+    assert matcher.buscar("xyz") == set()
+
+def test_marcas_que_comparten_palabras():
+    perfil = PerfilEmpresa("Banco Galicia", relacionadas=("Galicia Seguros", "Galicia"))
+    conteo = contar_menciones(perfil, [
+        _nota("Banco Galicia Seguros lanzó un plan"),  # Las tres, superpuestas
+        _nota("Resultados de Galicia Seguros"),
+        _nota("Galiciano no es Galicia"),  # Sólo palabras completas
+        _nota("Galicianos en Buenos Aires"),
+    ])
+    assert conteo == {"Banco Galicia": 1, "Galicia Seguros": 2, "Galicia": 3}
+
+def test_sin_tildes_ni_mayusculas_ni_sufijo_societario():
+    assert alias_de("Pilagá S.A.") == {"pilaga s a", "pilaga"}
+    perfil = PerfilEmpresa("Adecoagro", relacionadas=("Pilagá S.A.", "La Lácteo"))
+    conteo = contar_menciones(perfil, [
+        _nota("PILAGA invierte en arroz"),
+        NoticiaItem("Cosecha récord", "https://medio.com/2", resumen="Según Pilagá S.A., la campaña..."),
+        _nota("la lacteo y ADECOAGRO firman acuerdo"),
+        _nota("Adecoagros"),
+    ])
+    assert conteo == {"Adecoagro": 1, "Pilagá S.A.": 2, "La Lácteo": 1}
+
+def test_cada_nota_cuenta_una_vez_por_marca():
+    perfil = PerfilEmpresa("Cresud")
+    conteo = contar_menciones(perfil, [_nota("Cresud, Cresud y más Cresud"), _nota("Sin menciones")])
+    assert conteo == {"Cresud": 1}
@@ -0,0 +1,65 @@
+# tests/test_planificador.py
+import re
+from config import QUERY_MAX_PALABRAS, QUERY_MAX_OR
+from tools.planificador import empaquetar, planificar, fusionar_por_bloque, _palabras
+from utils.noticias import BLOQUE_SOCIAL
+from utils.perfiles import PerfilEmpresa
+
+SUBSIDIARIAS = tuple(
+    [f"Subsidiaria {i} S.A." for i in range(14)]
+    + ["Pilagá", "La Lácteo", "Compañía Agroindustrial del Litoral Argentino S.A.", "Molinos Ala", "Angelita"])
+TERMINOS = ("precio soja", "exportación arroz", "tambo leche", "retenciones", "biodiesel cupo",
+            "etanol maíz", "feedlot", "cosecha gruesa", "bolsa de cereales rosario", "dólar agro")
+
+def _consultas_de(consultas, bloque):
+    return [c.query for c in consultas if c.bloque == bloque]
+
+def test_cada_query_respeta_los_limites():
+    consultas = planificar(PerfilEmpresa("Adecoagro", SUBSIDIARIAS, TERMINOS))
+    for query in _consultas_de(consultas, "subsidiarias") + _consultas_de(consultas, "sector"):
+        assert _palabras(query) <= QUERY_MAX_PALABRAS, query
+        assert query.count(" OR ") <= QUERY_MAX_OR, query
+
+def test_incluye_todas_las_subsidiarias_una_vez():
+    consultas = planificar(PerfilEmpresa("Adecoagro", SUBSIDIARIAS, TERMINOS))
+    queries = _consultas_de(consultas, "subsidiarias")
+    nombres = [nombre for query in queries for nombre in re.findall(r'"([^"]+)"', query)]
+    assert sorted(nombres) == sorted(SUBSIDIARIAS)
+    # Menos queries que subsidiarias: el empaquetado agrupa
+    assert len(queries) < len(SUBSIDIARIAS)
+
+def test_incluye_todos_los_terminos_del_sector():
+    consultas = planificar(PerfilEmpresa("Adecoagro", SUBSIDIARIAS, TERMINOS))
+    queries = " ".join(_consultas_de(consultas, "sector"))
+    for termino in TERMINOS:
+        assert termino in queries
+
+def test_orden_de_bloques():
+    consultas = planificar(PerfilEmpresa("Adecoagro", ("Pilagá",), ("feedlot",)))
+    assert [c.bloque for c in consultas] == ["internacional", "nacional", "subsidiarias", "sector", BLOQUE_SOCIAL]
+
+def test_sin_relacionadas_no_hay_queries_vacias():
+    consultas = planificar(PerfilEmpresa("Adecoagro"))
+    assert not _consultas_de(consultas, "subsidiarias")
+    assert not _consultas_de(consultas, "sector")
+
+def test_empaquetar_con_limites_chicos():
+    terminos = [f'"marca {i}"' for i in range(10)]
+    queries = empaquetar(terminos, "Argentina", max_palabras=12, max_or=2)
+    for query in queries:
+        assert _palabras(query) <= 12
+        assert query.count(" OR ") <= 2
+    assert sorted(t for q in queries for t in re.findall(r'"[^"]+"', q)) == sorted(terminos)
+
+def test_un_termino_que_no_entra_igual_se_busca():
+    largo = '"' + " ".join(["palabra"] * 40) + '"'
+    queries = empaquetar(['"corta"', largo], "Argentina")
+    assert any(largo in query for query in queries)
+    assert any('"corta"' in query for query in queries)
+
+def test_fusionar_por_bloque_respeta_el_orden():
+    consultas = planificar(PerfilEmpresa("Adecoagro", SUBSIDIARIAS, TERMINOS))
+    resultados = [[c.query] for c in consultas]
+    fusionados = fusionar_por_bloque(consultas, resultados)
+    assert [bloque for bloque, _ in fusionados] == ["internacional", "nacional", "subsidiarias", "sector", BLOQUE_SOCIAL]
+    assert sum(len(items) for _, items in fusionados) == len(consultas)
@@ -0,0 +1,170 @@
+# tests/test_transporte.py
+import asyncio
+import httpx
+import pytest
+import utils.transporte as transporte
+from utils.transporte import Circuito, CircuitoAbierto, Transporte
+
+class Reloj:
+    """time.monotonic controlable."""
+
+    def __init__(self):
+        self.ahora = 1000.0
+
+    def __call__(self):
+        return self.ahora
+
+@pytest.fixture
+def reloj(monkeypatch):
+    reloj = Reloj()
+    monkeypatch.setattr(transporte.time, "monotonic", reloj)
+    return reloj
+
+@pytest.fixture
+def esperas(monkeypatch):
+    esperas = []
+    monkeypatch.setattr(transporte.time, "sleep", esperas.append)
+    return esperas
+
+def _abierto(circuito: Circuito) -> bool:
+    try:
+        circuito.verificar()
+        return False
+    except CircuitoAbierto:
+        return True
+
+def _semiabierto(reloj) -> Circuito:
+    circuito = Circuito("prueba", umbral_fallos=3, segundos_abierto=60)
+    for _ in range(3):
+        circuito.registrar_fallo()
+    reloj.ahora += 61
+    return circuito
+
+def test_abre_tras_n_fallos_seguidos(reloj):
+    circuito = Circuito("prueba", umbral_fallos=3, segundos_abierto=60)
+    circuito.registrar_fallo()
+    circuito.registrar_fallo()
+    assert not _abierto(circuito)
+    circuito.registrar_exito()  # Un éxito reinicia la cuenta
+    circuito.registrar_fallo()
+    circuito.registrar_fallo()
+    assert not _abierto(circuito)
+    circuito.registrar_fallo()
+    assert _abierto(circuito)
+    reloj.ahora += 59
+    assert _abierto(circuito)
+
+def test_semiabierto_deja_pasar_una_sola_prueba(reloj):
+    circuito = _semiabierto(reloj)
+    assert not _abierto(circuito)  # La prueba
+    assert all(_abierto(circuito) for _ in range(5))  # El resto espera su resultado
+
+def test_prueba_exitosa_cierra(reloj):
+    circuito = _semiabierto(reloj)
+    circuito.verificar()
+    circuito.registrar_exito()
+    assert not any(_abierto(circuito) for _ in range(5))
+
+def test_prueba_fallida_reabre(reloj):
+    circuito = _semiabierto(reloj)
+    circuito.verificar()
+    circuito.registrar_fallo()
+    assert _abierto(circuito)
+    reloj.ahora += 59
+    assert _abierto(circuito)  # Otro período completo
+    reloj.ahora += 2
+    assert not _abierto(circuito)
+
+def test_prueba_que_nunca_informa_vence(reloj):
+    circuito = _semiabierto(reloj)
+    circuito.verificar()  # La prueba se pierde (cancelada) sin registrar resultado
+    reloj.ahora += 30
+    assert _abierto(circuito)
+    reloj.ahora += 31
+    assert not _abierto(circuito)
+
+def test_429_libera_la_prueba_sin_cerrar_ni_reabrir(reloj):
+    circuito = _semiabierto(reloj)
+    circuito.verificar()
+    circuito.registrar_neutro()
+    assert not _abierto(circuito)  # Sale otra prueba
+    assert _abierto(circuito)
+
+class LimitadorFalso:
+    def __init__(self):
+        self.frenadas = []
+
+    def adquirir_sync(self, tokens: int = 0):
+        pass
+
+    def frenar(self, segundos: float):
+        self.frenadas.append(segundos)
+
+def _transporte(respuestas: list, limitador=None) -> tuple:
+    """Transporte con un servidor simulado que devuelve `respuestas` en orden (la última se repite)."""
+    pedidos = []
+
+    def manejar(pedido):
+        pedidos.append(pedido)
+        return respuestas[min(len(pedidos), len(respuestas)) - 1]
+
+    t = Transporte("prueba", limitador)
+    t.circuito = Circuito("prueba", umbral_fallos=2, segundos_abierto=60)
+    t._cliente = httpx.Client(transport=httpx.MockTransport(manejar))
+    return t, pedidos
+
+def test_429_no_abre_el_circuito(esperas):
+    t, pedidos = _transporte([httpx.Response(429)] * 3 + [httpx.Response(200)])
+    assert t.request("GET", "http://serper.test/").status_code == 200
+    assert len(pedidos) == 4
+    assert t.circuito.abierto_desde is None
+    assert t.stats["rate_limits"] == 3
+    # Y se sigue pudiendo llamar
+    assert t.request("GET", "http://serper.test/").status_code == 200
+
+def test_5xx_si_abre_el_circuito(esperas):
+    t, pedidos = _transporte([httpx.Response(503)])
+    with pytest.raises(CircuitoAbierto):
+        t.request("GET", "http://serper.test/")
+    assert len(pedidos) == 2  # Al segundo fallo se corta sin más reintentos
+    with pytest.raises(CircuitoAbierto):
+        t.request("GET", "http://serper.test/")
+    assert len(pedidos) == 2
+
+def test_respeta_retry_after_y_frena_el_limitador(esperas):
+    limitador = LimitadorFalso()
+    t, pedidos = _transporte([httpx.Response(429, headers={"Retry-After": "2"}), httpx.Response(200)], limitador)
+    assert t.request("GET", "http://serper.test/").status_code == 200
+    assert esperas == [2.0]
+    assert limitador.frenadas == [2.0]
+
+def test_retry_after_como_fecha_http(monkeypatch):
+    monkeypatch.setattr(transporte.time, "time", lambda: 1_700_000_000)
+    respuesta = httpx.Response(429, headers={"Retry-After": "Tue, 14 Nov 2023 22:13:25 GMT"})  # +5s
+    assert transporte._retry_after(respuesta) == pytest.approx(5)
+    assert transporte._retry_after(httpx.Response(429)) is None
+
+def test_semiabierto_una_sola_peticion_llega_al_servidor():
+    pedidos = []
+
+    async def manejar(pedido):
+        pedidos.append(pedido)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200)
+
+    async def correr():
+        t = Transporte("prueba")
+        # Sin reloj falso: el event loop también usa time.monotonic
+        t.circuito = Circuito("prueba", umbral_fallos=3, segundos_abierto=60)
+        t.circuito.fallos_seguidos = 3
+        t.circuito.abierto_desde = transporte.time.monotonic() - 61
+        t._clientes_async[asyncio.get_running_loop()] = httpx.AsyncClient(transport=httpx.MockTransport(manejar))
+        resultados = await asyncio.gather(*(t.arequest("GET", "http://serper.test/") for _ in range(5)),
+                                          return_exceptions=True)
+        await t.acerrar()
+        return resultados
+
+    resultados = asyncio.run(correr())
+    assert len(pedidos) == 1
+    assert sum(isinstance(r, httpx.Response) for r in resultados) == 1
+    assert sum(isinstance(r, CircuitoAbierto) for r in resultados) == 4
@@ -1,96 +1,265 @@
 # tools/buscador.py
-import requests
-import json
+import asyncio
+import math
 import os
+import re
 from langchain_core.tools import tool
-from config import MAX_NOTICIAS
+from config import (
+    MAX_NOTICIAS, SERPER_URL, SERPER_RESULTADOS_POR_PAGINA, SERPER_MAX_PAGINAS,
+    CACHE_SERPER_ACTIVADO, CACHE_SERPER_FRACCION_VENTANA
+)
+from utils.transporte import obtener_transporte
+from utils.cache import obtener_cache, clave_hash
+from utils.noticias import NoticiaItem
+from utils.trazas import anotar, sumar
+from utils.cassette import buscar_grabado, grabar, reproduciendo, CassetteIncompleto
 
-@tool
-def tool_buscar_noticias(query: str, dias: int = 2) -> str:
+class BusquedaFallida(Exception):
     """
-    Busca en Google usando Serper.dev con filtro de tiempo nativo.
-    NO filtra en Python para evitar falsos negativos.
+    La consulta no se pudo completar (Serper caído, circuito abierto, 401, una página
+    que falló...). `items` trae lo que sí llegó: el reporte lo usa, pero quien llama
+    sabe que la ventana no quedó cubierta entera.
     """
-    api_key = os.getenv("SERPER_API_KEY")
-    if not api_key:
-        return "ERROR CRÍTICO: Falta SERPER_API_KEY en .env"
-
-    # Limpieza de query para Google (quitamos operadores complejos que a veces rompen la API)
-    # Dejamos lo básico.
-    print(f"   🔎 Googleando (Serper): '{query[:60]}...' [Últimos {dias} días]")
-    
-    url = "https://google.serper.dev/search"
-    
+
+    def __init__(self, mensaje: str, items: list = None):
+        super().__init__(mensaje)
+        self.items = items or []
+
+SEGUNDOS_POR_UNIDAD = {"h": 3600, "d": 86400, "w": 7 * 86400, "m": 30 * 86400, "y": 365 * 86400}
+
+def _tbs(horas: int) -> str:
+    """Filtro de tiempo de Google más angosto que cubre `horas`: qdr:dN si son días justos, qdr:hN si no."""
+    return f"qdr:d{horas // 24}" if horas % 24 == 0 else f"qdr:h{horas}"
+
+def _describir_ventana(horas: int) -> str:
+    return f"Últimos {horas // 24} días" if horas % 24 == 0 else f"Últimas {horas} horas"
+
+def _armar_payload(query: str, horas: int, pagina: int = 1) -> dict:
     # Parametro de tiempo de Google: qdr:d (días) o qdr:h (horas)
-    # Si dias=1 (ayer), pedimos 24h (d1). Si dias=2, pedimos d2.
-    tbs_param = f"qdr:d{dias}"
-    
-    payload = json.dumps({
+    # 48 horas -> d2; el modo daemon pide ventanas en horas (h5) desde la última corrida
+    tbs_param = _tbs(horas)
+
+    payload = {
         "q": query,
         "gl": "ar",      # Geolocalización Argentina
         "hl": "es",      # Idioma Español
-        "num": 20,       # Pedimos 20 por bloque
+        "num": SERPER_RESULTADOS_POR_PAGINA,
         "tbs": tbs_param # FILTRO DE TIEMPO DEL MOTOR
-    })
-    
+    }
+    if pagina > 1:
+        payload["page"] = pagina
+    return payload
+
+def _clave_cache(payload: dict) -> str:
+    """Normaliza el payload (espacios y mayúsculas de la query no cambian el resultado) y lo hashea."""
+    normalizado = dict(payload)
+    normalizado["q"] = " ".join(payload["q"].split()).casefold()
+    normalizado["gl"] = payload["gl"].lower()
+    normalizado["hl"] = payload["hl"].lower()
+    normalizado["num"] = int(payload["num"])
+    return clave_hash(normalizado)
+
+def _ttl_cache(tbs: str) -> float:
+    """El TTL es proporcional a la ventana pedida: 'qdr:d2' -> 2 días * fracción."""
+    match = re.fullmatch(r"qdr:([hdwmy])(\d*)", tbs)
+    if not match:
+        return 3600
+    unidad, cantidad = match.group(1), int(match.group(2) or 1)
+    return SEGUNDOS_POR_UNIDAD[unidad] * cantidad * CACHE_SERPER_FRACCION_VENTANA
+
+def _desde_cache(payload: dict):
+    if not CACHE_SERPER_ACTIVADO:
+        return None
+    data = obtener_cache("serper").obtener(_clave_cache(payload))
+    if data is not None:
+        print(f"      ⚡ Cache hit Serper")
+        anotar(cache=True)
+    return data
+
+def _a_cache(payload: dict, data: dict):
+    if CACHE_SERPER_ACTIVADO:
+        obtener_cache("serper").guardar(_clave_cache(payload), data, _ttl_cache(payload["tbs"]))
+
+async def _aconsultar_serper(payload: dict, headers: dict) -> dict:
+    clave = _clave_cache(payload)
+    data = buscar_grabado("serper", clave)
+    if data is not None:
+        return data
+    data = _desde_cache(payload)
+    if data is None:
+        response = await obtener_transporte("serper").arequest("POST", SERPER_URL, headers=headers, json=payload)
+        anotar(http_status=response.status_code)
+        sumar(bytes_recibidos=len(response.content))
+        response.raise_for_status()
+        data = response.json()
+        _a_cache(payload, data)
+    grabar("serper", clave, data)
+    return data
+
+def _resultados_crudos(data: dict) -> list:
+    """Resultados de Noticias y Orgánicos de una respuesta cruda de Serper."""
+    resultados = []
+
+    # 1. Bloque "news" (Si aparece)
+    if "news" in data:
+        resultados.extend(data["news"])
+
+    # 2. Bloque "organic" (Web normal)
+    if "organic" in data:
+        resultados.extend(data["organic"])
+
+    return resultados
+
+def _agregar_items(resultados: list, items: list, links_vistos: set) -> int:
+    """Suma a `items` los resultados con links nuevos (hasta MAX_NOTICIAS) y devuelve cuántos sumó."""
+    nuevos = 0
+    for r in resultados:
+        if len(items) >= MAX_NOTICIAS: break
+
+        link = r.get('link')
+        if not link or link in links_vistos: continue
+
+        # FILTRO: Solo descartamos si es explícitamente YouTube (opcional, ya que lo pides en social)
+        # Pero para noticias generales, dejamos pasar todo lo que Google mandó.
+
+        links_vistos.add(link)
+        items.append(NoticiaItem(
+            titulo=r.get('title', 'Sin título'),
+            url=link,
+            resumen=r.get('snippet', ''),
+            fuente=r.get('source', 'Web'),
+            fecha=r.get('date', 'Fecha no provista por API')
+        ))
+        nuevos += 1
+    return nuevos
+
+class Paginador:
+    """
+    Paginación adaptativa de una consulta. Se pide la página 1; si trajo links nuevos, se
+    piden en paralelo las páginas que harían falta para llegar a MAX_NOTICIAS. Se corta
+    cuando se llega al tope, cuando una página viene vacía o no suma nada nuevo, o al
+    llegar a SERPER_MAX_PAGINAS; con un lote en paralelo, la decisión se toma después de
+    sumar todas sus páginas. Una página con menos de SERPER_RESULTADOS_POR_PAGINA no corta:
+    Google suele devolver 8 o 9 orgánicos aunque haya más páginas.
+    """
+
+    def __init__(self, query: str):
+        self.query = query
+        self.items = []
+        self.links_vistos = set()
+        self.paginas = 0
+        self.motivo = ""
+        self.error = None  # Error de una página extra (lo anterior se conserva)
+
+    def procesar(self, paginas: list, respuestas: list) -> list:
+        """
+        Incorpora las respuestas (en orden de página) y devuelve las próximas páginas a pedir.
+        Las pedidas en paralelo ya se pagaron: se suman todas antes de decidir si se sigue.
+        """
+        self.paginas += len(paginas)
+        cortes = []
+        for pagina, data in zip(paginas, respuestas):
+            if isinstance(data, Exception):
+                if pagina == 1:
+                    raise data
+                # Una página extra que falla no invalida las demás, pero la consulta queda incompleta
+                cortes.append(f"error en página {pagina}: {data}")
+                self.error = data
+                continue
+            resultados = _resultados_crudos(data)
+            if pagina == 1 and not resultados:
+                # DEBUG: Si sale 0, imprimimos qué pasó
+                print(f"      ⚠️  Google devolvió 0 resultados. Respuesta cruda: {str(data)[:200]}...")
+                cortes.append("sin resultados")
+                continue
+            if not resultados:
+                cortes.append(f"página {pagina} vacía")
+            elif _agregar_items(resultados, self.items, self.links_vistos) == 0 and len(self.items) < MAX_NOTICIAS:
+                cortes.append(f"página {pagina} sin links nuevos")
+        if len(self.items) >= MAX_NOTICIAS:
+            # El tope manda: las páginas que ya no sumaron es porque no había lugar
+            cortes.insert(0, f"tope de {MAX_NOTICIAS}")
+        if cortes:
+            self.motivo = cortes[0]
+            return []
+        ultima = paginas[-1]
+        if ultima >= SERPER_MAX_PAGINAS:
+            self.motivo = f"máximo de {SERPER_MAX_PAGINAS} páginas"
+            return []
+        faltan = math.ceil((MAX_NOTICIAS - len(self.items)) / SERPER_RESULTADOS_POR_PAGINA)
+        return list(range(ultima + 1, min(ultima + faltan, SERPER_MAX_PAGINAS) + 1))
+
+    def resumen(self) -> list:
+        print(f"      📄 {self.paginas} página(s) pedida(s), {len(self.items)} links únicos ({self.motivo}): '{self.query[:40]}'")
+        anotar(paginas=self.paginas, corte=self.motivo, resultados=len(self.items))
+        return self.items
+
+async def _abuscar_paginado(query: str, horas: int, headers: dict) -> list:
+    paginador, paginas = Paginador(query), [1]
+    while paginas:
+        respuestas = await asyncio.gather(
+            *(_aconsultar_serper(_armar_payload(query, horas, pagina), headers) for pagina in paginas),
+            return_exceptions=True)
+        paginas = paginador.procesar(paginas, respuestas)
+    return _resultado(paginador)
+
+def _resultado(paginador: Paginador) -> list:
+    items = paginador.resumen()
+    if paginador.error is not None:
+        raise BusquedaFallida(paginador.motivo, items)
+    return items
+
+def _fallar(error: Exception):
+    # Un cassette incompleto no es un error de Serper: se propaga tal cual
+    if isinstance(error, (BusquedaFallida, CassetteIncompleto)):
+        raise error
+    print(f"      ❌ Error Serper: {error}")
+    anotar(error=str(error))
+    raise BusquedaFallida(str(error)) from error
+
+@tool
+async def tool_buscar_noticias_async(query: str, dias: int = 2, horas: int = None) -> list:
+    """
+    Busca en Google usando Serper.dev con filtro de tiempo nativo (usar con ainvoke).
+    NO filtra en Python para evitar falsos negativos.
+    `horas`, si se pasa, reemplaza a `dias` (ventanas incrementales del modo daemon).
+    Devuelve una lista de NoticiaItem. Si la consulta no se pudo completar lanza
+    BusquedaFallida (con los items que sí llegaron).
+    """
+    horas = horas or dias * 24
+    api_key = os.getenv("SERPER_API_KEY", "")
+    if not api_key and not reproduciendo():  # Reproduciendo un cassette no se sale a la red
+        print("   ❌ ERROR CRÍTICO: Falta SERPER_API_KEY en .env")
+        raise BusquedaFallida("Falta SERPER_API_KEY")
+
+    print(f"   🔎 Googleando (Serper): '{query[:60]}...' [{_describir_ventana(horas)}]")
+
     headers = {
         'X-API-KEY': api_key,
         'Content-Type': 'application/json'
     }
 
     try:
-        response = requests.request("POST", url, headers=headers, data=payload)
-        data = response.json()
-        
-        # Recopilar resultados de Noticias y Orgánicos
-        resultados = []
-        
-        # 1. Bloque "news" (Si aparece)
-        if "news" in data:
-            resultados.extend(data["news"])
-            
-        # 2. Bloque "organic" (Web normal)
-        if "organic" in data:
-            resultados.extend(data["organic"])
-            
-        if not resultados:
-            # DEBUG: Si sale 0, imprimimos qué pasó
-            print(f"      ⚠️  Google devolvió 0 resultados. Respuesta cruda: {str(data)[:200]}...")
-            return "Google no encontró noticias recientes."
-
-        formatted_output = ""
-        contador = 0
-        links_vistos = set()
-        
-        print(f"      ✅ Google trajo {len(resultados)} candidatos raw...")
-
-        for r in resultados:
-            if contador >= MAX_NOTICIAS: break
-            
-            link = r.get('link')
-            if not link or link in links_vistos: continue
-            
-            title = r.get('title', 'Sin título')
-            snippet = r.get('snippet', '')
-            date_str = r.get('date', 'Fecha no provista por API')
-            source = r.get('source', 'Web')
-            
-            # FILTRO: Solo descartamos si es explícitamente YouTube (opcional, ya que lo pides en social)
-            # Pero para noticias generales, dejamos pasar todo lo que Google mandó.
-            
-            links_vistos.add(link)
-            
-            formatted_output += f"ITEM_{contador + 1}\n"
-            formatted_output += f"FECHA_GOOGLE: {date_str}\n"
-            formatted_output += f"FUENTE: {source}\n"
-            formatted_output += f"TITULO: {title}\n"
-            formatted_output += f"URL_REAL: {link}\n"
-            formatted_output += f"RESUMEN: {snippet}\n"
-            formatted_output += "-" * 40 + "\n"
-            
-            contador += 1
-            
-        return formatted_output
+        return await _abuscar_paginado(query, horas, headers)
 
     except Exception as e:
-        return f"Error Serper: {e}"
\ No newline at end of file
+        # No mandamos el error al prompt; quien llama decide qué hacer con una ventana sin cubrir
+        _fallar(e)
+
+@tool
+def tool_buscar_noticias(query: str, dias: int = 2, horas: int = None) -> list:
+    """
+    Versión síncrona de tool_buscar_noticias_async, para usar fuera de un event loop
+    (scripts, consola). Corre la misma búsqueda: mismo cache, paginación y errores.
+    """
+    async def buscar():
+        try:
+            argumentos = {"query": query, "dias": dias}
+            if horas is not None:
+                argumentos["horas"] = horas
+            return await tool_buscar_noticias_async.ainvoke(argumentos)
+        finally:
+            # El cliente async queda atado a este loop, que se cierra al volver
+            await obtener_transporte("serper").acerrar()
+
+    return asyncio.run(buscar())
@@ -0,0 +1,142 @@
+# tools/extractor.py
+import asyncio
+from html.parser import HTMLParser
+from urllib.parse import urlsplit
+from config import (
+    EXTRACCION_MAX_CONCURRENTES, EXTRACCION_MAX_POR_HOST, EXTRACCION_TIMEOUT,
+    EXTRACCION_MAX_BYTES, EXTRACCION_MAX_CHARS, EXTRACCION_CACHE_TTL_DIAS
+)
+from utils.transporte import obtener_transporte
+from utils.cache import obtener_cache, clave_hash
+from utils.limitador import semaforo_global
+from utils.noticias import BLOQUE_SOCIAL
+from utils.trazas import anotar
+from utils.cassette import buscar_grabado, grabar
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; NewsletterResearcher/10.2)",
+    "Accept": "text/html,application/xhtml+xml",
+}
+# Lo que nunca es cuerpo de la nota (menúes, scripts, pies, formularios...)
+ETIQUETAS_IGNORADAS = {"script", "style", "noscript", "template", "svg", "nav", "header", "footer",
+                       "aside", "form", "iframe", "figure", "button"}
+MIN_CHARS_PARRAFO = 40  # Los <p> más cortos suelen ser firmas, epígrafes o "Leé también"
+
+class ExtractorTexto(HTMLParser):
+    """
+    Parser incremental: recibe el HTML por partes (feed) y sólo guarda el texto de los
+    <p> que están fuera de ETIQUETAS_IGNORADAS, hasta `max_chars`. Nunca arma el
+    documento, así la memoria no depende del tamaño de la página.
+    """
+
+    def __init__(self, max_chars: int = EXTRACCION_MAX_CHARS):
+        super().__init__(convert_charrefs=True)
+        self.max_chars = max_chars
+        self.parrafos = []
+        self.largo = 0
+        self._ignoradas = 0
+        self._en_parrafo = False
+        self._actual = []
+
+    @property
+    def completo(self) -> bool:
+        return self.largo >= self.max_chars
+
+    def _cerrar_parrafo(self):
+        if self._en_parrafo:
+            texto = " ".join("".join(self._actual).split())
+            if len(texto) >= MIN_CHARS_PARRAFO and not self.completo:
+                self.parrafos.append(texto)
+                self.largo += len(texto) + 1
+        self._en_parrafo = False
+        self._actual = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ETIQUETAS_IGNORADAS:
+            self._ignoradas += 1
+        elif tag == "p":
+            self._cerrar_parrafo()  # Un <p> sin cerrar termina donde empieza el siguiente
+            self._en_parrafo = self._ignoradas == 0
+
+    def handle_endtag(self, tag):
+        if tag in ETIQUETAS_IGNORADAS:
+            self._ignoradas = max(0, self._ignoradas - 1)
+        elif tag == "p":
+            self._cerrar_parrafo()
+
+    def handle_data(self, data):
+        if self._en_parrafo and not self._ignoradas:
+            self._actual.append(data)
+
+    def close(self):
+        super().close()
+        self._cerrar_parrafo()
+
+    def texto(self) -> str:
+        texto = "\n".join(self.parrafos)
+        if len(texto) <= self.max_chars:
+            return texto
+        return texto[:self.max_chars].rsplit(" ", 1)[0] + "…"
+
+async def _leer_articulo(url: str) -> str:
+    """Descarga la página en streaming y corta apenas hay texto suficiente o se pasa de EXTRACCION_MAX_BYTES."""
+    extractor = ExtractorTexto()
+    async with obtener_transporte("articulos").astream("GET", url, headers=HEADERS, follow_redirects=True) as respuesta:
+        if respuesta.status_code != 200:
+            raise ValueError(f"HTTP {respuesta.status_code}")
+        if "html" not in respuesta.headers.get("content-type", "html"):
+            raise ValueError(f"no es HTML ({respuesta.headers['content-type']})")
+        async for trozo in respuesta.aiter_text():
+            extractor.feed(trozo)
+            if extractor.completo or respuesta.num_bytes_downloaded > EXTRACCION_MAX_BYTES:
+                break
+    extractor.close()
+    return extractor.texto()
+
+async def _descargar(url: str) -> str:
+    host = urlsplit(url).hostname or ""
+    # Tope por sitio y tope global (semáforos del loop, compartidos por todas las empresas).
+    # El del sitio va afuera: quien espera a un sitio ocupado no retiene un lugar global
+    async with semaforo_global(f"articulos:{host}", EXTRACCION_MAX_POR_HOST), \
+            semaforo_global("articulos", EXTRACCION_MAX_CONCURRENTES):
+        return await asyncio.wait_for(_leer_articulo(url), EXTRACCION_TIMEOUT)
+
+async def _texto_articulo(item, stats: dict) -> str:
+    # Clave por URL canónica: la misma nota con otro tracking o versión AMP no se baja dos veces
+    clave = clave_hash({"url": item.url_canonica})
+    texto = buscar_grabado("articulos", clave)
+    if texto is None:
+        texto = obtener_cache("articulos").obtener(clave)
+        if texto is not None:
+            stats["cache"] += 1
+    if texto is None:
+        try:
+            texto = await _descargar(item.url)
+            obtener_cache("articulos").guardar(clave, texto, EXTRACCION_CACHE_TTL_DIAS * 86400)
+        except Exception as e:
+            stats["fallidas"] += 1
+            print(f"      ⚠️  Sin texto de {item.url[:70]}: {type(e).__name__} {e}")
+            texto = ""  # Se graba igual: al reproducir, la nota vuelve a quedar sin texto
+    grabar("articulos", clave, texto)
+    return texto
+
+async def extraer_textos(items: list) -> int:
+    """
+    Completa `item.texto` con el cuerpo de cada nota (las de redes no se bajan).
+    Las descargas van en paralelo; una nota que falla queda con su snippet.
+    Devuelve cuántas notas quedaron con texto.
+    """
+    candidatos = [item for item in items if item.bloque != BLOQUE_SOCIAL]
+    por_url = {}
+    for item in candidatos:
+        por_url.setdefault(item.url_canonica, []).append(item)
+    stats = {"cache": 0, "fallidas": 0}
+    textos = await asyncio.gather(*(_texto_articulo(grupo[0], stats) for grupo in por_url.values()))
+    for grupo, texto in zip(por_url.values(), textos):
+        for item in grupo:
+            item.texto = texto
+    con_texto = sum(1 for item in candidatos if item.texto)
+    print(f"   📄 {con_texto}/{len(candidatos)} notas con texto completo "
+          f"({stats['cache']} desde cache, {stats['fallidas']} fallidas)")
+    anotar(notas=len(candidatos), con_texto=con_texto, **stats)
+    return con_texto
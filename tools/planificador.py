@@ -0,0 +1,89 @@
+# tools/planificador.py
+from dataclasses import dataclass
+from itertools import zip_longest
+from config import QUERY_MAX_PALABRAS, QUERY_MAX_OR
+from utils.noticias import BLOQUE_SOCIAL
+
+REDES_BUSCADAS = ("twitter.com", "facebook.com", "instagram.com", "linkedin.com", "youtube.com")
+
+@dataclass(frozen=True, slots=True)
+class Consulta:
+    bloque: str
+    etiqueta: str
+    query: str
+
+def _palabras(texto: str) -> int:
+    # Google cuenta palabras, no caracteres; los operadores OR también ocupan lugar
+    return len(texto.replace("(", " ").replace(")", " ").split())
+
+def _termino(texto: str, frase_exacta: bool) -> str:
+    """Un término listo para combinar con OR: entre comillas (nombres) o agrupado (varias palabras sueltas)."""
+    if frase_exacta:
+        return f'"{texto}"'
+    return f"({texto})" if " " in texto.strip() else texto
+
+def empaquetar(terminos: list, sufijo: str = "", max_palabras: int = QUERY_MAX_PALABRAS,
+               max_or: int = QUERY_MAX_OR) -> list:
+    """
+    Reparte los términos en la menor cantidad de grupos "(a OR b OR ...) sufijo" que
+    respeten los límites de palabras y de operadores OR (first-fit decreasing: ordena
+    de más largo a más corto y pone cada término en el primer grupo donde entra).
+    Devuelve las queries armadas, con los términos en su orden original dentro de cada grupo.
+    """
+    disponible = max_palabras - _palabras(sufijo)
+    grupos = []  # [palabras_usadas, [índices]]
+    for i in sorted(range(len(terminos)), key=lambda i: _palabras(terminos[i]), reverse=True):
+        costo = _palabras(terminos[i])
+        for grupo in grupos:
+            # Sumar un término agrega también un "OR"
+            if grupo[0] + 1 + costo <= disponible and len(grupo[1]) <= max_or:
+                grupo[0] += 1 + costo
+                grupo[1].append(i)
+                break
+        else:
+            # Un término que no entra ni solo va igual en su propia query (Google lo recortará)
+            grupos.append([costo, [i]])
+    queries = []
+    for _, indices in sorted(grupos, key=lambda g: min(g[1])):
+        cuerpo = " OR ".join(terminos[i] for i in sorted(indices))
+        if len(indices) > 1:
+            cuerpo = f"({cuerpo})"
+        queries.append(f"{cuerpo} {sufijo}".strip())
+    return queries
+
+def planificar(perfil) -> list:
+    """
+    Consultas de un perfil, en orden de prioridad de bloque. Subsidiarias y términos del
+    sector se cubren completos, empaquetados en el mínimo de queries que entran en los límites.
+    """
+    empresa = perfil.empresa
+    consultas = [
+        # 1. INTERNACIONAL
+        Consulta("internacional", "Internacional", f"{empresa} stock earnings agriculture finance"),
+        # 2. NACIONAL (Marca Principal)
+        Consulta("nacional", f"Nacional ({empresa})", f'"{empresa}" Argentina'),
+    ]
+    # 3. NACIONAL (Subsidiarias)
+    subsidiarias = empaquetar([_termino(e, True) for e in perfil.relacionadas], "Argentina")
+    consultas += [Consulta("subsidiarias", f"Subsidiarias {i}/{len(subsidiarias)}", q)
+                  for i, q in enumerate(subsidiarias, 1)]
+    # 4. SECTOR Y COMPETENCIA
+    sector = empaquetar([_termino(t, False) for t in perfil.terminos_sector], "Argentina")
+    consultas += [Consulta("sector", f"Sector y Competencia {i}/{len(sector)}", q)
+                  for i, q in enumerate(sector, 1)]
+    # 5. REDES SOCIALES
+    redes = " OR ".join(f"site:{red}" for red in REDES_BUSCADAS)
+    consultas.append(Consulta(BLOQUE_SOCIAL, "Redes Sociales", f'"{empresa}" ({redes})'))
+    return consultas
+
+def fusionar_por_bloque(consultas: list, resultados: list) -> list:
+    """
+    Junta los resultados de las queries de un mismo bloque intercalándolos (1° de cada
+    query, 2° de cada query...), así ningún grupo de términos queda al final de la lista
+    cuando después se recorta. Devuelve [(bloque, items)] en el orden de prioridad.
+    """
+    por_bloque = {}
+    for consulta, items in zip(consultas, resultados):
+        por_bloque.setdefault(consulta.bloque, []).append(items)
+    return [(bloque, [item for fila in zip_longest(*listas) for item in fila if item is not None])
+            for bloque, listas in por_bloque.items()]
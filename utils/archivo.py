@@ -0,0 +1,164 @@
+# utils/archivo.py
+import hashlib
+import json
+import mmap
+import os
+import sqlite3
+import threading
+import zlib
+from dataclasses import asdict
+from datetime import datetime
+from config import ARCHIVO_DIR
+from utils.noticias import NoticiaItem
+
+# Campos que cambian entre corridas sin que cambie la nota: van en el índice, no en el contenido
+CAMPOS_DE_CORRIDA = ("bloque", "fecha")
+
+class ArchivoItems:
+    """
+    Archivo de las noticias de cada corrida, direccionado por contenido. Cada nota se
+    guarda una sola vez (comprimida) en un paquete append-only, identificada por el
+    sha256 de su contenido; un índice SQLite dice qué notas trajo cada corrida
+    (empresa, fecha) y dónde está cada contenido (offset, largo). La lectura usa mmap:
+    abrir una nota es un slice del archivo, sin leer el paquete entero.
+    """
+
+    def __init__(self, carpeta: str = ARCHIVO_DIR):
+        os.makedirs(carpeta, exist_ok=True)
+        self.ruta_paquete = os.path.join(carpeta, "paquete.bin")
+        self.con = sqlite3.connect(os.path.join(carpeta, "indice.sqlite"), timeout=30,
+                                   isolation_level=None, check_same_thread=False)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.executescript("""
+            CREATE TABLE IF NOT EXISTS contenidos (
+                sha TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                largo INTEGER NOT NULL
+            ) WITHOUT ROWID;
+            CREATE TABLE IF NOT EXISTS items (
+                empresa TEXT NOT NULL,
+                fecha TEXT NOT NULL,
+                posicion INTEGER NOT NULL,
+                url TEXT NOT NULL,
+                bloque TEXT NOT NULL,
+                fecha_google TEXT NOT NULL,
+                sha TEXT NOT NULL,
+                PRIMARY KEY (empresa, fecha, posicion)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_items_url ON items(url, fecha);
+            CREATE INDEX IF NOT EXISTS idx_items_fecha ON items(fecha);
+        """)
+        self._lock = threading.Lock()
+        self._mapa = None
+
+    # --- Escritura ---
+    def archivar(self, empresa: str, fecha: datetime, items: list) -> int:
+        """Guarda las notas de una corrida. Devuelve cuántos contenidos nuevos se agregaron al paquete."""
+        corrida = (empresa, fecha.isoformat(timespec="seconds"))
+        filas, contenidos = [], {}
+        for posicion, item in enumerate(items):
+            datos = {k: v for k, v in asdict(item).items() if k not in CAMPOS_DE_CORRIDA}
+            crudo = json.dumps(datos, sort_keys=True, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            sha = hashlib.sha256(crudo).hexdigest()
+            contenidos[sha] = crudo
+            filas.append((*corrida, posicion, item.url_canonica, item.bloque, item.fecha, sha))
+
+        # El lock de escritura de SQLite también ordena los appends al paquete entre procesos
+        with self._lock:
+            self.con.execute("BEGIN IMMEDIATE")
+            try:
+                existentes = self._existentes(list(contenidos))
+                nuevos = [(sha, crudo) for sha, crudo in contenidos.items() if sha not in existentes]
+                with open(self.ruta_paquete, "ab") as f:
+                    offset = f.seek(0, os.SEEK_END)
+                    for sha, crudo in nuevos:
+                        comprimido = zlib.compress(crudo, 9)
+                        f.write(comprimido)
+                        self.con.execute("INSERT INTO contenidos VALUES (?, ?, ?)", (sha, offset, len(comprimido)))
+                        offset += len(comprimido)
+                    f.flush()
+                    os.fsync(f.fileno())
+                # Volver a archivar la misma corrida la reemplaza
+                self.con.execute("DELETE FROM items WHERE empresa = ? AND fecha = ?", corrida)
+                self.con.executemany("INSERT INTO items VALUES (?, ?, ?, ?, ?, ?, ?)", filas)
+                self.con.execute("COMMIT")
+            except Exception:
+                self.con.execute("ROLLBACK")
+                raise
+        return len(nuevos)
+
+    def _existentes(self, shas: list) -> set:
+        encontrados = set()
+        # SQLite limita la cantidad de parámetros por consulta: vamos en tandas
+        for i in range(0, len(shas), 500):
+            tanda = shas[i:i + 500]
+            filas = self.con.execute(f"SELECT sha FROM contenidos WHERE sha IN ({','.join('?' * len(tanda))})", tanda)
+            encontrados.update(fila[0] for fila in filas)
+        return encontrados
+
+    # --- Lectura ---
+    def _leer(self, offset: int, largo: int) -> dict:
+        with self._lock:
+            # El paquete sólo crece: se vuelve a mapear si lo pedido quedó fuera del mapa actual
+            if self._mapa is None or offset + largo > len(self._mapa):
+                if self._mapa is not None:
+                    self._mapa.close()
+                with open(self.ruta_paquete, "rb") as f:
+                    self._mapa = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            comprimido = self._mapa[offset:offset + largo]
+        return json.loads(zlib.decompress(comprimido))
+
+    def _items(self, filas) -> list:
+        resultado = []
+        for empresa, fecha, bloque, fecha_google, offset, largo in filas:
+            datos = self._leer(offset, largo)
+            # JSON no tiene tuplas: los (fuente, url) vuelven como listas
+            datos["enlaces_relacionados"] = [tuple(enlace) for enlace in datos["enlaces_relacionados"]]
+            resultado.append((empresa, datetime.fromisoformat(fecha),
+                              NoticiaItem(**datos, bloque=bloque, fecha=fecha_google)))
+        return resultado
+
+    _SELECT = """
+        SELECT i.empresa, i.fecha, i.bloque, i.fecha_google, c.offset, c.largo
+        FROM items i JOIN contenidos c ON c.sha = i.sha"""
+
+    def corridas(self, empresa: str = None) -> list:
+        """[(empresa, fecha, cantidad de notas)] de las corridas archivadas, de la más vieja a la más nueva."""
+        filtro, params = ("WHERE empresa = ?", (empresa,)) if empresa else ("", ())
+        filas = self.con.execute(
+            f"SELECT empresa, fecha, COUNT(*) FROM items {filtro} GROUP BY empresa, fecha ORDER BY fecha", params)
+        return [(e, datetime.fromisoformat(f), n) for e, f, n in filas]
+
+    def corrida(self, empresa: str, fecha: datetime) -> list:
+        """Las notas de una corrida, en el orden en que llegaron al redactor."""
+        filas = self.con.execute(f"{self._SELECT} WHERE i.empresa = ? AND i.fecha = ? ORDER BY i.posicion",
+                                 (empresa, fecha.isoformat(timespec="seconds")))
+        return [item for _, _, item in self._items(filas)]
+
+    def por_url(self, url_canonica: str) -> list:
+        """[(empresa, fecha, NoticiaItem)] de todas las corridas en que apareció la nota."""
+        filas = self.con.execute(f"{self._SELECT} WHERE i.url = ? ORDER BY i.fecha", (url_canonica,))
+        return self._items(filas)
+
+    def entre(self, desde: datetime, hasta: datetime, empresa: str = None) -> list:
+        """[(empresa, fecha, NoticiaItem)] de las corridas entre dos fechas (inclusive)."""
+        filtro, params = ("AND i.empresa = ?", (empresa,)) if empresa else ("", ())
+        filas = self.con.execute(
+            f"{self._SELECT} WHERE i.fecha BETWEEN ? AND ? {filtro} ORDER BY i.fecha, i.empresa, i.posicion",
+            (desde.isoformat(timespec="seconds"), hasta.isoformat(timespec="seconds"), *params))
+        return self._items(filas)
+
+    def resumen(self) -> str:
+        contenidos, comprimido = self.con.execute("SELECT COUNT(*), COALESCE(SUM(largo), 0) FROM contenidos").fetchone()
+        referencias, corridas = self.con.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT empresa || fecha) FROM items").fetchone()
+        return (f"🗃️  Archivo: {corridas} corridas, {referencias} notas ({contenidos} contenidos únicos), "
+                f"{comprimido / 1024:.1f} KB comprimidos")
+
+if __name__ == "__main__":
+    # python -m utils.archivo [empresa]: corridas archivadas
+    import sys
+    archivo = ArchivoItems()
+    print(archivo.resumen())
+    for empresa, fecha, cantidad in archivo.corridas(sys.argv[1] if len(sys.argv) > 1 else None):
+        print(f"   {fecha.strftime('%d/%m/%Y %H:%M')}  {empresa}: {cantidad} notas")
@@ -0,0 +1,93 @@
+# utils/assets.py
+import base64
+import os
+import re
+from functools import lru_cache
+from config import ASSETS_DIR, REPORTE_OFFLINE
+from utils.transporte import obtener_transporte
+
+# Recursos que usa el reporte HTML. La versión va en el nombre del archivo local:
+# si se sube una versión, se descarga de nuevo sin pisar la anterior.
+SCRIPTS = {
+    "chart.js@4.4.1.js": "https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js",
+    "chartjs-plugin-datalabels@2.2.0.js": "https://cdn.jsdelivr.net/npm/chartjs-plugin-datalabels@2.2.0",
+    "chartjs-chart-treemap@2.3.0.js": "https://cdn.jsdelivr.net/npm/chartjs-chart-treemap@2.3.0/dist/chartjs-chart-treemap.min.js",
+}
+FUENTES_CSS = ("roboto-400-500-700.css", "https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap")
+BANDERA_AR = ("flag-ar-h24.png", "https://flagcdn.com/h24/ar.png")
+
+# Google Fonts devuelve woff2 (el formato más chico) sólo a navegadores modernos
+USER_AGENT_NAVEGADOR = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+PATRON_URL_CSS = re.compile(r"url\((https://[^)]+)\)")
+TIPOS_MIME = {".woff2": "font/woff2", ".woff": "font/woff", ".ttf": "font/ttf", ".png": "image/png"}
+
+def _ruta(nombre: str) -> str:
+    return os.path.join(ASSETS_DIR, nombre)
+
+def _descargar(url: str, ruta: str, user_agent: str = None) -> bytes:
+    headers = {"User-Agent": user_agent} if user_agent else {}
+    respuesta = obtener_transporte("assets").request("GET", url, headers=headers, follow_redirects=True)
+    respuesta.raise_for_status()
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "wb") as f:
+        f.write(respuesta.content)
+    os.replace(temporal, ruta)
+    return respuesta.content
+
+def _obtener(nombre: str, url: str, user_agent: str = None) -> bytes:
+    """Lee el recurso de la cache local; si no está, lo baja una sola vez."""
+    ruta = _ruta(nombre)
+    if os.path.exists(ruta):
+        with open(ruta, "rb") as f:
+            return f.read()
+    print(f"   📦 Descargando asset {nombre}...")
+    return _descargar(url, ruta, user_agent)
+
+def _data_uri(contenido: bytes, extension: str) -> str:
+    return f"data:{TIPOS_MIME[extension]};base64,{base64.b64encode(contenido).decode('ascii')}"
+
+def _css_fuentes_inline() -> str:
+    """CSS de Google Fonts con cada archivo de fuente embebido como data URI."""
+    nombre_css, url_css = FUENTES_CSS
+    css = _obtener(nombre_css, url_css, USER_AGENT_NAVEGADOR).decode("utf-8")
+
+    def embeber(match):
+        url = match.group(1)
+        extension = os.path.splitext(url.split("?")[0])[1] or ".woff2"
+        nombre = f"fuente-{os.path.basename(url.split('?')[0])}"
+        return f"url({_data_uri(_obtener(nombre, url), extension)})"
+
+    return PATRON_URL_CSS.sub(embeber, css)
+
+@lru_cache(maxsize=1)
+def recursos_reporte() -> dict:
+    """
+    Fragmentos HTML para los recursos externos del reporte: {'scripts', 'fuentes_css', 'bandera'}.
+    Con REPORTE_OFFLINE van embebidos (el HTML abre sin ninguna petición de red);
+    si no, o si algún recurso no se pudo conseguir, se referencian por URL como siempre.
+    """
+    remotos = {
+        "scripts": "\n".join(f'<script src="{url}"></script>' for url in SCRIPTS.values()),
+        "fuentes_css": f"@import url('{FUENTES_CSS[1]}');",
+        "bandera": BANDERA_AR[1],
+    }
+    if not REPORTE_OFFLINE:
+        return remotos
+    try:
+        # "</script" dentro del JS cerraría la etiqueta antes de tiempo
+        scripts = [_obtener(nombre, url).decode("utf-8").replace("</script", "<\\/script")
+                   for nombre, url in SCRIPTS.items()]
+        return {
+            "scripts": "\n".join(f"<script>{js}</script>" for js in scripts),
+            "fuentes_css": _css_fuentes_inline(),
+            "bandera": _data_uri(_obtener(*BANDERA_AR), ".png"),
+        }
+    except Exception as e:
+        print(f"   ⚠️  No se pudieron preparar los assets offline ({e}). El reporte usará los CDN.")
+        return remotos
+
+if __name__ == "__main__":
+    # Precarga la cache de assets (p. ej. desde una máquina con salida a internet)
+    recursos_reporte()
+    print(f"✅ Assets listos en {os.path.abspath(ASSETS_DIR)}")
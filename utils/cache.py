@@ -0,0 +1,115 @@
+# utils/cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from config import CACHE_DIR, CACHE_MAX_ENTRADAS, CACHE_MAX_MB
+
+def clave_hash(datos) -> str:
+    """Hash estable (sha256) de cualquier estructura serializable a JSON."""
+    texto = json.dumps(datos, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+class CacheDisco:
+    """
+    Cache clave/valor persistente sobre SQLite (modo WAL, seguro entre procesos).
+    Cada entrada tiene su propio TTL y se desalojan las menos usadas (LRU) cuando
+    se supera el máximo de entradas o de bytes.
+    """
+
+    def __init__(self, nombre: str, max_entradas: int = CACHE_MAX_ENTRADAS, max_mb: float = CACHE_MAX_MB):
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        self.nombre = nombre
+        self.ruta = os.path.join(CACHE_DIR, f"{nombre}.sqlite")
+        self.max_entradas = max_entradas
+        self.max_bytes = int(max_mb * 1024 * 1024)
+        self.stats = {"hits": 0, "misses": 0, "escrituras": 0, "desalojos": 0}
+        self._local = threading.local()
+        with self._conexion() as con:
+            con.execute("""
+                CREATE TABLE IF NOT EXISTS entradas (
+                    clave TEXT PRIMARY KEY,
+                    valor BLOB NOT NULL,
+                    tamano INTEGER NOT NULL,
+                    expira REAL NOT NULL,
+                    ultimo_acceso REAL NOT NULL
+                )""")
+            con.execute("CREATE INDEX IF NOT EXISTS idx_acceso ON entradas(ultimo_acceso)")
+
+    def _conexion(self) -> sqlite3.Connection:
+        # sqlite3 no comparte conexiones entre hilos: una por hilo
+        con = getattr(self._local, "con", None)
+        if con is None:
+            con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None)
+            con.execute("PRAGMA journal_mode=WAL")
+            con.execute("PRAGMA synchronous=NORMAL")
+            self._local.con = con
+        return con
+
+    def obtener(self, clave: str):
+        """Devuelve el valor guardado o None si no existe o expiró."""
+        ahora = time.time()
+        con = self._conexion()
+        fila = con.execute("SELECT valor FROM entradas WHERE clave = ? AND expira > ?", (clave, ahora)).fetchone()
+        if fila is None:
+            self.stats["misses"] += 1
+            return None
+        con.execute("UPDATE entradas SET ultimo_acceso = ? WHERE clave = ?", (ahora, clave))
+        self.stats["hits"] += 1
+        return json.loads(zlib.decompress(fila[0]))
+
+    def guardar(self, clave: str, valor, ttl_segundos: float):
+        ahora = time.time()
+        blob = zlib.compress(json.dumps(valor, ensure_ascii=False).encode("utf-8"))
+        con = self._conexion()
+        con.execute("BEGIN IMMEDIATE")
+        try:
+            con.execute("INSERT OR REPLACE INTO entradas VALUES (?, ?, ?, ?, ?)",
+                        (clave, blob, len(blob), ahora + ttl_segundos, ahora))
+            self._desalojar(con, ahora)
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        self.stats["escrituras"] += 1
+
+    def _desalojar(self, con: sqlite3.Connection, ahora: float):
+        con.execute("DELETE FROM entradas WHERE expira <= ?", (ahora,))
+        total, bytes_usados = con.execute("SELECT COUNT(*), COALESCE(SUM(tamano), 0) FROM entradas").fetchone()
+        if total <= self.max_entradas and bytes_usados <= self.max_bytes:
+            return
+        # Recorremos de la menos usada a la más usada hasta volver a entrar en los límites
+        borrar = []
+        for clave, tamano in con.execute("SELECT clave, tamano FROM entradas ORDER BY ultimo_acceso"):
+            if total <= self.max_entradas and bytes_usados <= self.max_bytes:
+                break
+            borrar.append((clave,))
+            total -= 1
+            bytes_usados -= tamano
+        con.executemany("DELETE FROM entradas WHERE clave = ?", borrar)
+        self.stats["desalojos"] += len(borrar)
+
+    def limpiar(self):
+        self._conexion().execute("DELETE FROM entradas")
+
+    def resumen(self) -> str:
+        s = self.stats
+        return f"🗄️  Cache {self.nombre}: {s['hits']} hits, {s['misses']} misses, {s['escrituras']} escrituras, {s['desalojos']} desalojos"
+
+_caches = {}
+_lock_registro = threading.Lock()
+
+def obtener_cache(nombre: str) -> CacheDisco:
+    """Devuelve la cache compartida `nombre` (se abre la primera vez)."""
+    with _lock_registro:
+        if nombre not in _caches:
+            _caches[nombre] = CacheDisco(nombre)
+        return _caches[nombre]
+
+def imprimir_resumen_caches():
+    for cache in _caches.values():
+        if cache.stats["hits"] or cache.stats["misses"]:
+            print(cache.resumen())
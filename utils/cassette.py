@@ -0,0 +1,102 @@
+# utils/cassette.py
+import gzip
+import json
+import os
+import threading
+from datetime import datetime
+
+class CassetteIncompleto(Exception):
+    """En modo reproducción se pidió algo que no quedó grabado (la corrida no es la misma)."""
+
+class Cassette:
+    """
+    Grabación de todo lo que entra de afuera en una corrida: respuestas de Serper,
+    del LLM y consultas al índice de URLs publicadas, indexadas por el hash del pedido.
+    Se guarda como JSON comprimido (gzip). Al reproducir, la corrida se repite sin red
+    y con la misma fecha de referencia, así el prompt (y por lo tanto el reporte) es idéntico.
+    """
+
+    def __init__(self, ruta: str, modo: str):
+        if modo not in ("grabar", "reproducir"):
+            raise ValueError(f"Modo de cassette inválido: {modo}")
+        self.ruta = ruta
+        self.modo = modo
+        self._lock = threading.Lock()
+        if modo == "reproducir":
+            with gzip.open(ruta, "rt", encoding="utf-8") as f:
+                datos = json.load(f)
+            self.fecha = datetime.fromisoformat(datos["fecha"])
+            self.interacciones = datos["interacciones"]
+        else:
+            self.fecha = datetime.now()
+            self.interacciones = {}
+
+    def buscar(self, servicio: str, clave: str):
+        """Respuesta grabada (sólo al reproducir; grabando siempre devuelve None)."""
+        if self.modo != "reproducir":
+            return None
+        try:
+            return self.interacciones[f"{servicio}:{clave}"]
+        except KeyError:
+            raise CassetteIncompleto(f"{servicio}: pedido {clave[:12]} no está en {self.ruta}") from None
+
+    def grabar(self, servicio: str, clave: str, valor):
+        if self.modo == "grabar":
+            with self._lock:
+                self.interacciones[f"{servicio}:{clave}"] = valor
+
+    def guardar(self):
+        if self.modo != "grabar":
+            return
+        carpeta = os.path.dirname(self.ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        temporal = f"{self.ruta}.tmp"
+        with self._lock, gzip.open(temporal, "wt", encoding="utf-8") as f:
+            json.dump({"version": 1, "fecha": self.fecha.isoformat(), "interacciones": self.interacciones},
+                      f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(temporal, self.ruta)
+        print(f"📼 Cassette grabado: {self.ruta} ({len(self.interacciones)} interacciones, "
+              f"{os.path.getsize(self.ruta) / 1024:.1f} KB)")
+
+class LLMReproducido:
+    """
+    Reemplazo del cliente del LLM al reproducir: sólo aporta modelo y temperatura
+    (forman parte de la clave) y evita importar/instanciar ChatOpenAI. Nunca llega a
+    invocarse: si un prompt no está grabado, el cassette corta antes.
+    """
+
+    def __init__(self, model_name: str, temperature: float):
+        self.model_name = model_name
+        self.temperature = temperature
+
+_activo = None
+
+def activar_cassette(ruta: str, modo: str) -> Cassette:
+    global _activo
+    _activo = Cassette(ruta, modo)
+    print(f"📼 Cassette en modo {modo}: {ruta}")
+    return _activo
+
+def cassette_activo():
+    return _activo
+
+def reproduciendo() -> bool:
+    return _activo is not None and _activo.modo == "reproducir"
+
+def cerrar_cassette():
+    global _activo
+    if _activo is not None:
+        _activo.guardar()
+        _activo = None
+
+def ahora() -> datetime:
+    """Fecha de referencia de la corrida: la del cassette al reproducir, la actual si no."""
+    return _activo.fecha if _activo is not None else datetime.now()
+
+def buscar_grabado(servicio: str, clave: str):
+    return _activo.buscar(servicio, clave) if _activo is not None else None
+
+def grabar(servicio: str, clave: str, valor):
+    if _activo is not None:
+        _activo.grabar(servicio, clave, valor)
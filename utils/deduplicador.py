@@ -0,0 +1,90 @@
+# utils/deduplicador.py
+import random
+import re
+import unicodedata
+import zlib
+from collections import defaultdict
+from config import DEDUP_UMBRAL, DEDUP_PERMUTACIONES, DEDUP_BANDAS
+
+# MinHash: h_i(x) = (a_i * x + b_i) mod p, con p primo de Mersenne 2^61 - 1
+_PRIMO = (1 << 61) - 1
+_rng = random.Random(20240101)  # Semilla fija: firmas reproducibles entre corridas
+_PERMUTACIONES = [(_rng.randrange(1, _PRIMO), _rng.randrange(0, _PRIMO)) for _ in range(DEDUP_PERMUTACIONES)]
+_FILAS_POR_BANDA = DEDUP_PERMUTACIONES // DEDUP_BANDAS
+_NO_PALABRA = re.compile(r"[^\w]+")
+
+def normalizar_texto(texto: str) -> str:
+    """Minúsculas, sin tildes y sin puntuación."""
+    texto = unicodedata.normalize("NFKD", texto.casefold())
+    texto = "".join(c for c in texto if not unicodedata.combining(c))
+    return _NO_PALABRA.sub(" ", texto).strip()
+
+def shingles(texto: str) -> set:
+    """Bigramas de palabras (o las palabras sueltas si el texto es muy corto)."""
+    palabras = normalizar_texto(texto).split()
+    if len(palabras) < 2:
+        return set(palabras)
+    return {f"{a} {b}" for a, b in zip(palabras, palabras[1:])}
+
+def firma_minhash(conjunto: set) -> tuple:
+    if not conjunto:
+        return ()
+    # crc32 y no hash(): el hash de str cambia en cada proceso (PYTHONHASHSEED)
+    hashes = [zlib.crc32(s.encode("utf-8")) for s in conjunto]
+    return tuple(min((a * h + b) % _PRIMO for h in hashes) for a, b in _PERMUTACIONES)
+
+def similitud(firma_a: tuple, firma_b: tuple) -> float:
+    """Estimación de Jaccard: fracción de posiciones iguales entre dos firmas."""
+    return sum(x == y for x, y in zip(firma_a, firma_b)) / len(firma_a)
+
+def agrupar_similares(textos: list) -> list:
+    """
+    Devuelve, para cada texto, el índice del representante de su grupo (el primero
+    en aparecer). Los candidatos salen de un índice LSH por bandas y se confirman
+    con la similitud estimada, así que el costo es casi lineal en cantidad de textos.
+    """
+    firmas = [firma_minhash(shingles(t)) for t in textos]
+    padre = list(range(len(textos)))
+
+    def raiz(i):
+        while padre[i] != i:
+            padre[i] = padre[padre[i]]
+            i = padre[i]
+        return i
+
+    for banda in range(DEDUP_BANDAS):
+        cubetas = defaultdict(list)
+        desde = banda * _FILAS_POR_BANDA
+        for i, firma in enumerate(firmas):
+            if firma:
+                cubetas[firma[desde:desde + _FILAS_POR_BANDA]].append(i)
+        for candidatos in cubetas.values():
+            primero = candidatos[0]
+            for otro in candidatos[1:]:
+                ra, rb = raiz(primero), raiz(otro)
+                if ra != rb and similitud(firmas[primero], firmas[otro]) >= DEDUP_UMBRAL:
+                    # El de menor índice (mayor prioridad) queda como representante
+                    padre[max(ra, rb)] = min(ra, rb)
+
+    return [raiz(i) for i in range(len(textos))]
+
+def colapsar_duplicados(items: list) -> list:
+    """
+    Junta las notas sindicadas (misma historia, distinto medio) en un solo NoticiaItem.
+    Se conserva el primero según el orden de prioridad y los demás quedan en
+    `enlaces_relacionados` como (fuente, url).
+    """
+    if len(items) < 2:
+        return items
+    representantes = agrupar_similares([f"{item.titulo} {item.resumen}" for item in items])
+    resultado = []
+    for i, (item, rep) in enumerate(zip(items, representantes)):
+        if rep == i:
+            resultado.append(item)
+        else:
+            principal = items[rep]
+            principal.enlaces_relacionados.append((item.fuente, item.url))
+            principal.enlaces_relacionados.extend(item.enlaces_relacionados)
+    if len(resultado) < len(items):
+        print(f"   🧬 Deduplicación: {len(items)} noticias agrupadas en {len(resultado)} historias")
+    return resultado
@@ -1,6 +1,5 @@
 # utils/diagnostico.py
-import sys
-import subprocess
+from importlib import metadata
 
 def verificar_dependencias():
     """Verifica versiones y ofrece solución automática"""
@@ -8,25 +7,19 @@ def verificar_dependencias():
     print("=" * 60)
 
     def get_version(pkg):
+        # Lee la metadata instalada (sin lanzar un `pip show` por paquete)
         try:
-            result = subprocess.run(
-                [sys.executable, "-m", "pip", "show", pkg],
-                capture_output=True, text=True
-            )
-            for line in result.stdout.splitlines():
-                if line.startswith("Version:"):
-                    return line.split(":")[1].strip()
-        except:
+            return metadata.version(pkg)
+        except metadata.PackageNotFoundError:
             return None
-        return None
 
     packages = {
-        "langchain": None,
         "langchain-core": None,
         "langchain-openai": None,
+        "langgraph": None,
         "pydantic": None,
-        "tavily-python": None,
-        "deepagents": None,
+        "httpx": None,
+        "markdown": None,
         "python-dotenv": None
     }
 
@@ -37,6 +30,12 @@ def verificar_dependencias():
         print(f"📦 {pkg}: {status}")
 
     print("\n📊 ANÁLISIS DE COMPATIBILIDAD:")
+    faltantes = [pkg for pkg, version in packages.items() if version is None]
+    if faltantes:
+        print(f"❌ Faltan paquetes: {', '.join(faltantes)}")
+        print("💡 SOLUCIÓN: pip install -r requirements.txt")
+        return False
+
     core_ver = packages.get("langchain-core")
     openai_ver = packages.get("langchain-openai")
 
@@ -52,6 +51,6 @@ def verificar_dependencias():
                 return False
         except:
             pass
-        
+
     print("✅ Versiones compatibles")
-    return True
\ No newline at end of file
+    return True
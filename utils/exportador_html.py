@@ -1,47 +1,89 @@
 # utils/exportador_html.py
 import os
 import re
+import json
 import webbrowser
 import markdown
 from datetime import datetime
-from config import COLOR_PRINCIPAL, COLOR_SECUNDARIO
-
-def extract_metrics(md_text):
-    def get_val(pattern, text):
-        match = re.search(pattern, text, re.IGNORECASE)
-        return int(match.group(1)) if match else 0
+from config import COLOR_PRINCIPAL, COLOR_SECUNDARIO, REDES_SOCIALES, HISTORIAL_ACTIVADO, HISTORIAL_PERIODOS
+from utils.metricas import MetricasReporte, metricas_desde_markdown
+from utils.assets import recursos_reporte
+from utils.historial import HistorialMetricas
 
+def series_tendencia(puntos: list, max_marcas: int = 5) -> dict:
+    """
+    Series para los gráficos de tendencia a partir de [(fecha, MetricasReporte)]:
+    sentimiento por tono, menciones de las `max_marcas` marcas con más volumen en el
+    período y total de publicaciones en redes.
+    """
+    fechas = [fecha for fecha, _ in puntos]
+    # Con más de un reporte por día (modo daemon) la hora distingue los puntos
+    formato = "%d/%m" if len({f.date() for f in fechas}) == len(fechas) else "%d/%m %H:%M"
+    totales = {}
+    for _, metricas in puntos:
+        for marca, n in metricas.volumen_marcas.items():
+            totales[marca] = totales.get(marca, 0) + n
+    marcas = [m for m in sorted(totales, key=totales.get, reverse=True) if totales[m] > 0][:max_marcas]
     return {
-        "gen": [
-            get_val(r'\*\s*Positivo:\s*(\d+)', md_text),
-            get_val(r'\*\s*Neutro:\s*(\d+)', md_text),
-            get_val(r'\*\s*Negativo:\s*(\d+)', md_text)
-        ],
-        "brands": [
-            get_val(r'\*\s*Menciones Adecoagro:\s*(\d+)', md_text),
-            get_val(r'\*\s*Menciones Pilagá:\s*(\d+)', md_text),
-            get_val(r'\*\s*Menciones Molinos Ala:\s*(\d+)', md_text),
-            get_val(r'\*\s*Menciones La Lácteo:\s*(\d+)', md_text)
-        ],
-        "soc_vol": [
-            get_val(r'\*\s*Facebook:\s*(\d+)', md_text),
-            get_val(r'\*\s*Instagram:\s*(\d+)', md_text),
-            get_val(r'\*\s*X \(Twitter\):\s*(\d+)', md_text),
-            get_val(r'\*\s*TikTok:\s*(\d+)', md_text),
-            get_val(r'\*\s*YouTube:\s*(\d+)', md_text)
-        ],
-        "soc_sent": [
-            get_val(r'\*\s*Social Positivo:\s*(\d+)', md_text),
-            get_val(r'\*\s*Social Neutro:\s*(\d+)', md_text),
-            get_val(r'\*\s*Social Negativo:\s*(\d+)', md_text)
-        ]
+        "etiquetas": [f.strftime(formato) for f in fechas],
+        "sentimiento": {tono: [m.sentimiento.get(tono, 0) for _, m in puntos] for tono in ("Positivo", "Neutro", "Negativo")},
+        "marcas": {marca: [m.volumen_marcas.get(marca, 0) for _, m in puntos] for marca in marcas},
+        "social": [sum(m.volumen_social.values()) for _, m in puntos],
     }
 
-def exportar_reporte(contenido_markdown: str, empresa: str):
-    metrics = extract_metrics(contenido_markdown)
+def renderizar_vista_previa(contenido_markdown: str, empresa: str, ruta: str, completo: bool = False):
+    """
+    Vista previa liviana (sin gráficos) del reporte que se está generando. Mientras
+    no está completo se recarga sola cada 2 segundos.
+    """
+    html_content = markdown.markdown(contenido_markdown, extensions=['extra', 'nl2br'])
+    refresco = "" if completo else '<meta http-equiv="refresh" content="2">'
+    estado = "Reporte completo" if completo else "⏳ Generando reporte... (se actualiza sola)"
+    template = f"""<!DOCTYPE html>
+    <html lang="es">
+    <head>
+        <meta charset="UTF-8">
+        {refresco}
+        <title>Vista previa {empresa}</title>
+        <style>
+            body {{ font-family: sans-serif; background: #f0f2f5; color: #333; margin: 0; padding: 20px; }}
+            .container {{ max-width: 950px; margin: 0 auto; background: white; border-radius: 12px; padding: 40px; }}
+            .estado {{ color: #777; font-size: 0.9em; text-align: center; }}
+            h1, h2 {{ color: {COLOR_PRINCIPAL}; }}
+        </style>
+    </head>
+    <body>
+        <div class="container">
+            <div class="estado">{estado}</div>
+            {html_content}
+        </div>
+    </body>
+    </html>
+    """
+    # Escritura atómica: el navegador nunca ve un archivo a medio escribir
+    temporal = f"{ruta}.tmp"
+    with open(temporal, "w", encoding="utf-8") as f:
+        f.write(template)
+    os.replace(temporal, ruta)
+
+def exportar_reporte(contenido_markdown: str, empresa: str, abrir_navegador: bool = True,
+                     metricas: MetricasReporte = None, fecha: datetime = None) -> str:
+    """
+    Genera el HTML del reporte (más un JSON con las métricas al lado) y devuelve
+    la ruta del HTML. Los gráficos salen de `metricas`; si no se pasan (reportes
+    viejos), se leen de las listas "* Etiqueta: N" del Markdown. Las tendencias
+    salen del historial (utils/historial.py) hasta `fecha` (por defecto, ahora).
+    """
+    if metricas is None:
+        metricas = metricas_desde_markdown(contenido_markdown)
+    puntos = HistorialMetricas().ultimos(empresa, HISTORIAL_PERIODOS, fecha) if HISTORIAL_ACTIVADO else []
+    tendencia = series_tendencia(puntos) if len(puntos) >= 2 else None
+    redes = {red: {"value": n, "color": REDES_SOCIALES[red][1]} for red, n in metricas.volumen_social.items()
+             if red in REDES_SOCIALES}
     
+    recursos = recursos_reporte()
     html_content = markdown.markdown(contenido_markdown, extensions=['extra', 'nl2br'])
-    flag_img = '<img src="https://flagcdn.com/h24/ar.png" alt="AR" style="vertical-align:text-bottom; height:20px;">'
+    flag_img = f'<img src="{recursos["bandera"]}" alt="AR" style="vertical-align:text-bottom; height:20px;">'
     html_content = html_content.replace("🇦🇷", flag_img)
     html_content = re.sub(r'<a href="(http[^"]+)"', r'<a href="\1" target="_blank"', html_content)
 
@@ -68,6 +110,19 @@ def exportar_reporte(contenido_markdown: str, empresa: str):
         </div>
     </div>
     """
+    if tendencia:
+        charts_gen_html += f"""
+    <div class="dashboard-row">
+        <div class="chart-card">
+            <h4>Tendencia de Sentimiento ({len(puntos)} reportes)</h4>
+            <div class="chart-container"><canvas id="chartTendSent"></canvas></div>
+        </div>
+        <div class="chart-card">
+            <h4>Tendencia de Volumen</h4>
+            <div class="chart-container"><canvas id="chartTendVol"></canvas></div>
+        </div>
+    </div>
+    """
     html_content = html_content.replace('id="reporte-sentimiento">📊 Reporte de Sentimiento</h2>', 
                                       'id="reporte-sentimiento">📊 Reporte de Sentimiento</h2>' + charts_gen_html)
 
@@ -88,7 +143,7 @@ def exportar_reporte(contenido_markdown: str, empresa: str):
 
     # CSS REVERTIDO A ESTILO LIMPIO (SIN BORDES VERDES)
     css = f"""
-        @import url('https://fonts.googleapis.com/css2?family=Roboto:wght@400;500;700&display=swap');
+        {recursos["fuentes_css"]}
         body {{ font-family: 'Roboto', sans-serif; background: #f0f2f5; color: #333; margin: 0; padding: 20px; }}
         .container {{ max-width: 950px; margin: 0 auto; background: white; border-radius: 12px; box-shadow: 0 4px 15px rgba(0,0,0,0.05); padding: 40px; }}
         .header {{ text-align: center; margin-bottom: 25px; }}
@@ -124,9 +179,7 @@ def exportar_reporte(contenido_markdown: str, empresa: str):
     <head>
         <meta charset="UTF-8">
         <title>Reporte {empresa}</title>
-        <script src="https://cdn.jsdelivr.net/npm/chart.js@4.4.1/dist/chart.umd.min.js"></script>
-        <script src="https://cdn.jsdelivr.net/npm/chartjs-plugin-datalabels@2.2.0"></script>
-        <script src="https://cdn.jsdelivr.net/npm/chartjs-chart-treemap@2.3.0/dist/chartjs-chart-treemap.min.js"></script>
+        {recursos["scripts"]}
         <style>{css}</style>
     </head>
     <body>
@@ -151,11 +204,12 @@ def exportar_reporte(contenido_markdown: str, empresa: str):
             const labelConfig = {{ color: '#fff', font: {{ weight: 'bold' }}, formatter: (v) => v > 0 ? v : '' }};
             const colors = ['#2E7D32', '#FBC02D', '#D32F2F'];
 
-            const genSent = {metrics['gen']};
-            const brandRaw = {metrics['brands']}; 
-            const brandLabels = ['Adecoagro', 'Pilagá', 'Molinos Ala', 'La Lácteo'];
-            const socVol = {metrics['soc_vol']}; 
-            const socSent = {metrics['soc_sent']};
+            const genSent = {json.dumps(list(metricas.sentimiento.values()))};
+            const brandRaw = {json.dumps(list(metricas.volumen_marcas.values()))}; 
+            const brandLabels = {json.dumps(list(metricas.volumen_marcas), ensure_ascii=False)};
+            const socNets = {json.dumps(redes, ensure_ascii=False)};
+            const socSent = {json.dumps(list(metricas.sentimiento_social.values()))};
+            const tendencia = {json.dumps(tendencia, ensure_ascii=False)};
 
             new Chart(document.getElementById('chartGenSent'), {{
                 type: 'doughnut',
@@ -165,7 +219,8 @@ def exportar_reporte(contenido_markdown: str, empresa: str):
 
             const brandDataClean = [];
             const brandLabelsClean = [];
-            const brandColors = ['#1976D2', '#00796B', '#F57C00', '#7B1FA2'];
+            const brandPalette = ['#1976D2', '#00796B', '#F57C00', '#7B1FA2', '#C2185B', '#5D4037', '#0097A7', '#689F38'];
+            const brandColors = brandRaw.map((_, idx) => brandPalette[idx % brandPalette.length]);
             const brandColorsClean = [];
 
             brandRaw.forEach((val, idx) => {{
@@ -195,13 +250,9 @@ def exportar_reporte(contenido_markdown: str, empresa: str):
 
             const treeCtx = document.getElementById('chartSocTree');
             if (treeCtx) {{
-                const rawData = [
-                    {{ category: 'Facebook', value: socVol[0] }},
-                    {{ category: 'Instagram', value: socVol[1] }},
-                    {{ category: 'X (Twitter)', value: socVol[2] }},
-                    {{ category: 'TikTok', value: socVol[3] }},
-                    {{ category: 'YouTube', value: socVol[4] }}
-                ].filter(d => d.value > 0); 
+                const rawData = Object.entries(socNets)
+                    .map(([category, d]) => ({{ category: category, value: d.value }}))
+                    .filter(d => d.value > 0); 
 
                 if (rawData.length > 0) {{
                     new Chart(treeCtx, {{
@@ -213,8 +264,8 @@ def exportar_reporte(contenido_markdown: str, empresa: str):
                                 groups: ['category'],
                                 backgroundColor: (ctx) => {{
                                     if(ctx.type !== 'data') return 'transparent';
-                                    const map = {{ 'Facebook': '#1877F2', 'Instagram': '#C13584', 'X (Twitter)': '#000000', 'TikTok': '#00F2EA', 'YouTube': '#FF0000' }};
-                                    return map[ctx.raw._data.category] || '#999';
+                                    const red = socNets[ctx.raw._data.category];
+                                    return red ? red.color : '#999';
                                 }},
                                 labels: {{ display: true, color: 'white', font: {{ weight: 'bold', size: 12 }} }}
                             }}]
@@ -229,6 +280,22 @@ def exportar_reporte(contenido_markdown: str, empresa: str):
                 data: {{ labels: ['Pos', 'Neu', 'Neg'], datasets: [{{ data: socSent, backgroundColor: colors }}] }},
                 options: {{ maintainAspectRatio: false, plugins: {{ legend: {{ display: false }}, datalabels: {{ anchor: 'end', align: 'end', color: '#555' }} }}, scales: {{ y: {{ display: false, grace: '15%' }}, x: {{ grid: {{ display: false }} }} }} }}
             }});
+
+            if (tendencia) {{
+                const lineOptions = {{ maintainAspectRatio: false, elements: {{ line: {{ tension: 0.3 }}, point: {{ radius: 2 }} }}, plugins: {{ legend: {{ position: 'bottom', labels: {{ boxWidth: 10, font: {{ size: 10 }} }} }}, datalabels: {{ display: false }} }}, scales: {{ y: {{ beginAtZero: true, ticks: {{ precision: 0 }} }}, x: {{ grid: {{ display: false }} }} }} }};
+                new Chart(document.getElementById('chartTendSent'), {{
+                    type: 'line',
+                    data: {{ labels: tendencia.etiquetas, datasets: Object.entries(tendencia.sentimiento).map(([tono, serie], idx) => ({{ label: tono, data: serie, borderColor: colors[idx], backgroundColor: colors[idx] }})) }},
+                    options: lineOptions
+                }});
+                const volDatasets = Object.entries(tendencia.marcas).map(([marca, serie], idx) => ({{ label: marca, data: serie, borderColor: brandPalette[idx % brandPalette.length], backgroundColor: brandPalette[idx % brandPalette.length] }}));
+                volDatasets.push({{ label: 'Redes', data: tendencia.social, borderColor: '#999', backgroundColor: '#999', borderDash: [4, 4] }});
+                new Chart(document.getElementById('chartTendVol'), {{
+                    type: 'line',
+                    data: {{ labels: tendencia.etiquetas, datasets: volDatasets }},
+                    options: lineOptions
+                }});
+            }}
         </script>
     </body>
     </html>
@@ -237,6 +304,14 @@ def exportar_reporte(contenido_markdown: str, empresa: str):
     filename = f"reporte_{empresa}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html"
     with open(filename, "w", encoding="utf-8") as f:
         f.write(template)
+    # Fuente Markdown y sidecar con las métricas tipadas: permiten regenerar el HTML
+    # (python main.py export-only) o procesar las cifras sin tocar el HTML
+    with open(filename.replace(".html", ".md"), "w", encoding="utf-8") as f:
+        f.write(contenido_markdown)
+    with open(filename.replace(".html", "_metricas.json"), "w", encoding="utf-8") as f:
+        json.dump(metricas.a_dict(), f, ensure_ascii=False, indent=2)
     
     print(f"✅ Reporte generado: {filename}")
-    webbrowser.open(f"file://{os.path.abspath(filename)}")
\ No newline at end of file
+    if abrir_navegador:
+        webbrowser.open(f"file://{os.path.abspath(filename)}")
+    return filename
@@ -0,0 +1,72 @@
+# utils/historial.py
+import glob
+import json
+import os
+import re
+import sqlite3
+from datetime import datetime
+from config import ESTADO_DIR
+from utils.metricas import MetricasReporte
+
+class HistorialMetricas:
+    """
+    Métricas de cada reporte (SQLite), indexadas por (empresa, fecha). Alimenta los
+    gráficos de tendencia: traer los últimos N reportes de una empresa es un recorrido
+    corto de la clave primaria, aunque haya años de corridas de decenas de empresas.
+    """
+
+    def __init__(self, ruta: str = None):
+        os.makedirs(ESTADO_DIR, exist_ok=True)
+        self.ruta = ruta or os.path.join(ESTADO_DIR, "historial_metricas.sqlite")
+        self.con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None, check_same_thread=False)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        # Las cifras van en columnas (se pueden consultar con SQL); el detalle completo, en JSON
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS metricas (
+                empresa TEXT NOT NULL,
+                fecha TEXT NOT NULL,
+                positivo INTEGER NOT NULL,
+                neutro INTEGER NOT NULL,
+                negativo INTEGER NOT NULL,
+                menciones_marcas INTEGER NOT NULL,
+                menciones_social INTEGER NOT NULL,
+                datos TEXT NOT NULL,
+                PRIMARY KEY (empresa, fecha)
+            ) WITHOUT ROWID""")
+
+    def registrar(self, empresa: str, fecha: datetime, metricas: MetricasReporte):
+        """Guarda las métricas de un reporte (si ya había uno con la misma fecha, lo reemplaza)."""
+        self.con.execute(
+            "INSERT OR REPLACE INTO metricas VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (empresa, fecha.isoformat(timespec="seconds"),
+             metricas.sentimiento.get("Positivo", 0), metricas.sentimiento.get("Neutro", 0),
+             metricas.sentimiento.get("Negativo", 0), sum(metricas.volumen_marcas.values()),
+             sum(metricas.volumen_social.values()), json.dumps(metricas.a_dict(), ensure_ascii=False)))
+
+    def ultimos(self, empresa: str, cantidad: int, hasta: datetime = None) -> list:
+        """Los últimos `cantidad` reportes de la empresa (hasta `hasta`, inclusive), del más viejo al más nuevo."""
+        limite = (hasta or datetime.max).isoformat(timespec="seconds")
+        filas = self.con.execute(
+            "SELECT fecha, datos FROM metricas WHERE empresa = ? AND fecha <= ? ORDER BY fecha DESC LIMIT ?",
+            (empresa, limite, cantidad)).fetchall()
+        return [(datetime.fromisoformat(fecha), MetricasReporte.desde_dict(json.loads(datos)))
+                for fecha, datos in reversed(filas)]
+
+def importar_sidecars(carpeta: str = ".") -> int:
+    """Carga al historial los reporte_<empresa>_<fecha>_metricas.json ya generados (reportes anteriores)."""
+    historial = HistorialMetricas()
+    importados = 0
+    for ruta in sorted(glob.glob(os.path.join(carpeta, "reporte_*_metricas.json"))):
+        match = re.fullmatch(r"reporte_(.+)_(\d{8}_\d{6})_metricas\.json", os.path.basename(ruta))
+        if not match:
+            continue
+        with open(ruta, encoding="utf-8") as f:
+            metricas = MetricasReporte.desde_dict(json.load(f))
+        historial.registrar(match.group(1), datetime.strptime(match.group(2), "%Y%m%d_%H%M%S"), metricas)
+        importados += 1
+    return importados
+
+if __name__ == "__main__":
+    # python -m utils.historial [carpeta]: arma el historial con los reportes que ya existen
+    import sys
+    print(f"📚 {importar_sidecars(sys.argv[1] if len(sys.argv) > 1 else '.')} reportes importados al historial")
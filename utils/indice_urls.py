@@ -0,0 +1,53 @@
+# utils/indice_urls.py
+import os
+import sqlite3
+import time
+from config import ESTADO_DIR
+
+class IndiceUrls:
+    """
+    Registro persistente (SQLite) de las URLs canónicas ya publicadas por empresa,
+    con la fecha en que se vieron por primera vez. Permite armar newsletters
+    incrementales: lo que ya salió en un reporte anterior no vuelve al prompt.
+    """
+
+    def __init__(self, ruta: str = None):
+        os.makedirs(ESTADO_DIR, exist_ok=True)
+        self.ruta = ruta or os.path.join(ESTADO_DIR, "urls_publicadas.sqlite")
+        self.con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None, check_same_thread=False)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS publicadas (
+                empresa TEXT NOT NULL,
+                url TEXT NOT NULL,
+                primera_vez REAL NOT NULL,
+                PRIMARY KEY (empresa, url)
+            ) WITHOUT ROWID""")
+
+    def conocidas(self, empresa: str, urls) -> set:
+        """Subconjunto de `urls` que ya se publicó para `empresa`."""
+        urls = list(set(urls))
+        encontradas = set()
+        # SQLite limita la cantidad de parámetros por consulta: vamos en tandas
+        for i in range(0, len(urls), 500):
+            tanda = urls[i:i + 500]
+            marcas = ",".join("?" * len(tanda))
+            filas = self.con.execute(
+                f"SELECT url FROM publicadas WHERE empresa = ? AND url IN ({marcas})", [empresa, *tanda])
+            encontradas.update(fila[0] for fila in filas)
+        return encontradas
+
+    def registrar(self, empresa: str, urls) -> int:
+        """Marca las URLs como publicadas (las ya existentes conservan su primera fecha)."""
+        ahora = time.time()
+        antes = self.con.total_changes
+        self.con.execute("BEGIN IMMEDIATE")
+        self.con.executemany("INSERT OR IGNORE INTO publicadas VALUES (?, ?, ?)",
+                             [(empresa, url, ahora) for url in set(urls)])
+        self.con.execute("COMMIT")
+        return self.con.total_changes - antes
+
+    def primera_vez(self, empresa: str, url: str):
+        fila = self.con.execute("SELECT primera_vez FROM publicadas WHERE empresa = ? AND url = ?",
+                                (empresa, url)).fetchone()
+        return fila[0] if fila else None
@@ -0,0 +1,126 @@
+# utils/limitador.py
+import asyncio
+import threading
+import time
+from config import LIMITES_PROVEEDORES, LIMITE_MAX_ESPERA
+
+# Semáforos compartidos por todo el proceso (uno por nombre y por event loop):
+# así varias empresas corriendo a la vez respetan el mismo tope global.
+_semaforos = {}
+
+def semaforo_global(nombre: str, limite: int) -> asyncio.Semaphore:
+    clave = (nombre, asyncio.get_running_loop())
+    if clave not in _semaforos:
+        _semaforos[clave] = asyncio.Semaphore(limite)
+    return _semaforos[clave]
+
+class LimiteExcedido(Exception):
+    """La espera necesaria para respetar el rate limit supera el máximo tolerado."""
+
+class TokenBucket:
+    """
+    Balde de tokens con reserva: quien pide más de lo disponible deja el saldo en
+    negativo y espera a que se recargue. Así el orden de llegada se respeta sin colas.
+    """
+
+    def __init__(self, tasa_por_segundo: float, capacidad: float):
+        self.tasa = tasa_por_segundo
+        self.capacidad = capacidad
+        self.saldo = capacidad
+        self.ultimo = time.monotonic()
+
+    def _recargar(self, ahora: float):
+        self.saldo = min(self.capacidad, self.saldo + (ahora - self.ultimo) * self.tasa)
+        self.ultimo = ahora
+
+    def espera_para(self, cantidad: float, ahora: float) -> float:
+        self._recargar(ahora)
+        faltante = cantidad - self.saldo
+        return max(0.0, faltante / self.tasa)
+
+    def consumir(self, cantidad: float):
+        self.saldo -= cantidad
+
+class LimitadorProveedor:
+    """
+    Rate limiter de un proveedor: un balde de peticiones por segundo y, opcionalmente,
+    uno de tokens por minuto (para LLMs). Compartido por todo el proceso.
+    """
+
+    def __init__(self, nombre: str, rps: float, tpm: float = None, max_espera: float = LIMITE_MAX_ESPERA):
+        self.nombre = nombre
+        self.max_espera = max_espera
+        self.peticiones = TokenBucket(rps, max(1.0, rps))
+        self.tokens = TokenBucket(tpm / 60, tpm) if tpm else None
+        self._lock = threading.Lock()
+        self.stats = {"llamadas": 0, "esperas": 0, "segundos_espera": 0.0, "espera_max": 0.0, "rechazos": 0,
+                      "frenadas": 0}
+
+    def _reservar(self, tokens: int) -> float:
+        """Reserva capacidad y devuelve cuánto hay que esperar antes de llamar."""
+        with self._lock:
+            ahora = time.monotonic()
+            espera = self.peticiones.espera_para(1, ahora)
+            if self.tokens is not None and tokens:
+                # Un pedido más grande que el balde entero no podría pasar nunca: lo acotamos
+                espera = max(espera, self.tokens.espera_para(min(tokens, self.tokens.capacidad), ahora))
+            if espera > self.max_espera:
+                self.stats["rechazos"] += 1
+                raise LimiteExcedido(
+                    f"{self.nombre}: habría que esperar {espera:.1f}s por rate limit (máximo {self.max_espera}s)")
+            self.peticiones.consumir(1)
+            if self.tokens is not None and tokens:
+                self.tokens.consumir(min(tokens, self.tokens.capacidad))
+            self.stats["llamadas"] += 1
+            if espera > 0:
+                self.stats["esperas"] += 1
+                self.stats["segundos_espera"] += espera
+                self.stats["espera_max"] = max(self.stats["espera_max"], espera)
+            return espera
+
+    def frenar(self, segundos: float):
+        """
+        El proveedor pidió que esperemos (429 + Retry-After): nadie sale antes de
+        `segundos`. Se deja el balde en negativo, así las reservas siguientes se encolan detrás.
+        """
+        with self._lock:
+            self.peticiones._recargar(time.monotonic())
+            self.peticiones.saldo = min(self.peticiones.saldo, 1 - segundos * self.peticiones.tasa)
+            self.stats["frenadas"] += 1
+
+    async def adquirir(self, tokens: int = 0):
+        espera = self._reservar(tokens)
+        if espera > 0:
+            await asyncio.sleep(espera)
+
+    def adquirir_sync(self, tokens: int = 0):
+        espera = self._reservar(tokens)
+        if espera > 0:
+            time.sleep(espera)
+
+    def resumen(self) -> str:
+        s = self.stats
+        promedio = s["segundos_espera"] / s["esperas"] if s["esperas"] else 0
+        return (f"⏱️  Rate limit {self.nombre}: {s['llamadas']} llamadas, {s['esperas']} esperaron "
+                f"(total {s['segundos_espera']:.1f}s, prom {promedio:.2f}s, máx {s['espera_max']:.2f}s), "
+                f"{s['rechazos']} rechazadas, {s['frenadas']} frenadas por el proveedor")
+
+_limitadores = {}
+_lock_registro = threading.Lock()
+
+def obtener_limitador(nombre: str):
+    """Limitador compartido del proveedor, o None si no tiene límites configurados."""
+    with _lock_registro:
+        if nombre not in _limitadores:
+            limites = LIMITES_PROVEEDORES.get(nombre)
+            _limitadores[nombre] = LimitadorProveedor(nombre, **limites) if limites else None
+        return _limitadores[nombre]
+
+def estadisticas_limitadores() -> dict:
+    """Estadísticas de espera por proveedor (para dimensionar el plan contratado)."""
+    return {nombre: dict(lim.stats) for nombre, lim in _limitadores.items() if lim is not None}
+
+def imprimir_resumen_limitadores():
+    for limitador in _limitadores.values():
+        if limitador is not None and limitador.stats["llamadas"]:
+            print(limitador.resumen())
@@ -0,0 +1,113 @@
+# utils/llm.py
+import os
+from langchain_core.messages import HumanMessage
+from config import CACHE_LLM_ACTIVADO, CACHE_LLM_TTL_DIAS, MAX_LLM_CONCURRENTES, LLM_TOKENS_SALIDA_ESTIMADOS
+from utils.cache import obtener_cache, clave_hash
+from utils.limitador import semaforo_global, obtener_limitador
+from utils.presupuesto import contar_tokens
+from utils.trazas import span, anotar, registrar_uso_llm
+from utils.cassette import buscar_grabado, grabar
+
+def _cache_activada(usar_cache: bool) -> bool:
+    # NEWSLETTER_SIN_CACHE_LLM=1 fuerza la llamada real sin tocar la config
+    return usar_cache and CACHE_LLM_ACTIVADO and os.getenv("NEWSLETTER_SIN_CACHE_LLM") != "1"
+
+def clave_llm(llm, prompt: str, esquema: str = None) -> str:
+    """La respuesta depende del modelo, la temperatura, el prompt exacto (y el esquema de salida, si hay)."""
+    datos = {
+        "modelo": _modelo(llm),
+        "temperatura": getattr(llm, "temperature", None),
+        "prompt": prompt
+    }
+    if esquema is not None:
+        datos["esquema"] = esquema
+    return clave_hash(datos)
+
+def _modelo(llm) -> str:
+    return getattr(llm, "model_name", type(llm).__name__)
+
+async def _reservar_cupo(prompt: str):
+    limitador = obtener_limitador("openai")
+    if limitador is not None:
+        # Reservamos prompt + salida estimada contra el límite de tokens por minuto
+        await limitador.adquirir(contar_tokens(prompt) + LLM_TOKENS_SALIDA_ESTIMADOS)
+
+async def ainvocar_llm(llm, prompt: str, usar_cache: bool = True, al_recibir=None) -> str:
+    """
+    Llama al modelo con un único mensaje de usuario y devuelve el texto.
+    Si el mismo prompt ya se respondió (mismo modelo y temperatura), devuelve
+    la respuesta guardada sin ir a la red.
+    Con `al_recibir` se consume la respuesta en streaming y cada fragmento se
+    pasa a ese callback a medida que llega.
+    """
+    with span("llm", streaming=al_recibir is not None):
+        clave = clave_llm(llm, prompt)
+        grabado = buscar_grabado("llm", clave)
+        if grabado is not None:
+            anotar(cassette=True)
+            if al_recibir is not None:
+                al_recibir(grabado)
+            return grabado
+
+        if _cache_activada(usar_cache):
+            guardado = obtener_cache("llm").obtener(clave)
+            if guardado is not None:
+                print("   ⚡ Cache hit LLM (respuesta reutilizada)")
+                anotar(cache=True)
+                grabar("llm", clave, guardado)
+                return guardado
+
+        async with semaforo_global("llm", MAX_LLM_CONCURRENTES):
+            await _reservar_cupo(prompt)
+            if al_recibir is None:
+                respuesta = await llm.ainvoke([HumanMessage(content=prompt)])
+            else:
+                # Sumar los chunks arma el mensaje completo (incluido usage_metadata, que llega al final)
+                respuesta = None
+                async for chunk in llm.astream([HumanMessage(content=prompt)]):
+                    respuesta = chunk if respuesta is None else respuesta + chunk
+                    al_recibir(chunk.content)
+        texto = respuesta.content if respuesta is not None else ""
+        registrar_uso_llm(_modelo(llm), getattr(respuesta, "usage_metadata", None))
+
+        if _cache_activada(usar_cache):
+            obtener_cache("llm").guardar(clave, texto, CACHE_LLM_TTL_DIAS * 86400)
+        grabar("llm", clave, texto)
+        return texto
+
+async def ainvocar_estructurado(llm, prompt: str, esquema, usar_cache: bool = True):
+    """
+    Igual que ainvocar_llm pero pide salida estructurada (structured output) y
+    devuelve una instancia del modelo pydantic `esquema`.
+    """
+    with span("llm", esquema=esquema.__name__):
+        clave = clave_llm(llm, prompt, esquema.__name__)
+        grabado = buscar_grabado("llm", clave)
+        if grabado is not None:
+            anotar(cassette=True)
+            return esquema(**grabado)
+
+        if _cache_activada(usar_cache):
+            guardado = obtener_cache("llm").obtener(clave)
+            if guardado is not None:
+                print(f"   ⚡ Cache hit LLM ({esquema.__name__})")
+                anotar(cache=True)
+                grabar("llm", clave, guardado)
+                return esquema(**guardado)
+
+        async with semaforo_global("llm", MAX_LLM_CONCURRENTES):
+            await _reservar_cupo(prompt)
+            # include_raw conserva el AIMessage original, que es el que trae los tokens usados
+            salida = await llm.with_structured_output(esquema, include_raw=True).ainvoke([HumanMessage(content=prompt)])
+        if isinstance(salida, dict):
+            registrar_uso_llm(_modelo(llm), getattr(salida["raw"], "usage_metadata", None))
+            if salida.get("parsing_error") is not None:
+                raise salida["parsing_error"]
+            resultado = salida["parsed"]
+        else:
+            resultado = salida
+
+        if _cache_activada(usar_cache):
+            obtener_cache("llm").guardar(clave, resultado.model_dump(), CACHE_LLM_TTL_DIAS * 86400)
+        grabar("llm", clave, resultado.model_dump())
+        return resultado
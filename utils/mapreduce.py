@@ -0,0 +1,71 @@
+# utils/mapreduce.py
+import asyncio
+from config import MAPREDUCE_TOKENS_POR_CHUNK, MAPREDUCE_CONCURRENCIA
+from utils.noticias import BLOQUES, BLOQUE_SOCIAL, renderizar_items, items_de_bloque
+from utils.presupuesto import contar_tokens
+from utils.llm import ainvocar_llm
+
+def partir_en_chunks(items: list, max_tokens: int = MAPREDUCE_TOKENS_POR_CHUNK) -> list:
+    """Agrupa items consecutivos en partes de hasta `max_tokens` (un item nunca se parte)."""
+    chunks, actual, tokens_actual = [], [], 0
+    for item in items:
+        tokens = contar_tokens(renderizar_items([item]))
+        if actual and tokens_actual + tokens > max_tokens:
+            chunks.append(actual)
+            actual, tokens_actual = [], 0
+        actual.append(item)
+        tokens_actual += tokens
+    if actual:
+        chunks.append(actual)
+    return chunks
+
+def prompt_map(titulo_bloque: str, texto_items: str, empresa: str) -> str:
+    return f"""
+    Eres un analista de inteligencia corporativa. Resume estas noticias del {titulo_bloque}
+    para un reporte sobre {empresa}.
+
+    NOTICIAS:
+    {texto_items}
+
+    INSTRUCCIONES:
+    1. Agrupa las noticias que cubren el MISMO HECHO en un solo punto.
+    2. Para cada hecho escribe un bloque con este formato exacto:
+       HECHO: [título descriptivo]
+       SENTIMIENTO: [🙂, 😐 o 😠]
+       FUENTES: [FUENTE - FECHA_GOOGLE - URL_REAL, separadas por " | "]
+       RESUMEN: [1 o 2 oraciones]
+    3. Conserva TODAS las URL_REAL (y OTRAS_FUENTES) tal cual; no inventes links.
+    4. No agregues introducción ni conclusiones.
+    """
+
+async def resumir_bloques(llm, items: list, empresa: str) -> tuple:
+    """
+    Fase "map": resume cada bloque en partes acotadas, con llamadas en paralelo.
+    Devuelve (news_data, social_data) con el mismo armado por bloques que el
+    prompt single-shot, listo para la fase "reduce".
+    """
+    semaforo = asyncio.Semaphore(MAPREDUCE_CONCURRENCIA)
+    titulos = dict(BLOQUES)
+    titulos[BLOQUE_SOCIAL] = "BLOQUE REDES SOCIALES"
+
+    tareas = []  # (bloque, corrutina)
+    for bloque, titulo in titulos.items():
+        for chunk in partir_en_chunks(items_de_bloque(items, bloque)):
+            tareas.append((bloque, prompt_map(titulo, renderizar_items(chunk), empresa)))
+
+    async def resumir(prompt):
+        async with semaforo:
+            return await ainvocar_llm(llm, prompt)
+
+    print(f"   🗺️  Map-reduce: {len(tareas)} resúmenes parciales en paralelo...")
+    resumenes = await asyncio.gather(*(resumir(prompt) for _, prompt in tareas))
+
+    por_bloque = {bloque: [] for bloque in titulos}
+    for (bloque, _), resumen in zip(tareas, resumenes):
+        por_bloque[bloque].append(resumen.strip())
+
+    def unir(bloque):
+        return "\n\n".join(por_bloque[bloque]) or "Sin noticias en este bloque."
+
+    news_data = "\n\n".join(f"=== {titulo} (RESUMIDO) ===\n{unir(clave)}" for clave, titulo in BLOQUES)
+    return news_data, unir(BLOQUE_SOCIAL)
@@ -0,0 +1,84 @@
+# utils/menciones.py
+import re
+from collections import deque
+from functools import lru_cache
+from utils.deduplicador import normalizar_texto
+
+# Sufijos societarios que la prensa casi nunca escribe ("Pilagá S.A." -> "Pilagá")
+SUFIJO_SOCIETARIO = re.compile(r"( (s a u|s a|sau|sa|s r l|srl|s a s|sas|inc|ltd|llc|corp))+$")
+
+def alias_de(nombre: str) -> set:
+    """Formas normalizadas con las que se busca una marca: nombre completo y sin sufijo societario."""
+    completo = normalizar_texto(nombre)
+    corto = SUFIJO_SOCIETARIO.sub("", completo).strip()
+    return {a for a in (completo, corto) if a}
+
+class AhoCorasick:
+    """
+    Autómata de Aho-Corasick: encuentra todas las apariciones de muchos patrones
+    en una sola pasada sobre el texto, en tiempo lineal.
+    """
+
+    def __init__(self, patrones: dict):
+        # patrones: texto del patrón -> etiqueta que se reporta al encontrarlo
+        self.transiciones = [{}]
+        self.fallo = [0]
+        self.salidas = [set()]
+        for patron, etiqueta in patrones.items():
+            nodo = 0
+            for caracter in patron:
+                if caracter not in self.transiciones[nodo]:
+                    self.transiciones.append({})
+                    self.fallo.append(0)
+                    self.salidas.append(set())
+                    self.transiciones[nodo][caracter] = len(self.transiciones) - 1
+                nodo = self.transiciones[nodo][caracter]
+            self.salidas[nodo].add(etiqueta)
+
+        # Enlaces de fallo por BFS (cada nodo hereda las salidas de su sufijo más largo)
+        cola = deque(self.transiciones[0].values())
+        while cola:
+            nodo = cola.popleft()
+            for caracter, hijo in self.transiciones[nodo].items():
+                cola.append(hijo)
+                fallo = self.fallo[nodo]
+                while fallo and caracter not in self.transiciones[fallo]:
+                    fallo = self.fallo[fallo]
+                destino = self.transiciones[fallo].get(caracter, 0)
+                # Los hijos directos de la raíz fallan a la raíz
+                self.fallo[hijo] = destino if destino != hijo else 0
+                self.salidas[hijo] |= self.salidas[self.fallo[hijo]]
+
+    def buscar(self, texto: str) -> set:
+        """Etiquetas de todos los patrones que aparecen en `texto`."""
+        encontradas = set()
+        nodo = 0
+        for caracter in texto:
+            while nodo and caracter not in self.transiciones[nodo]:
+                nodo = self.fallo[nodo]
+            nodo = self.transiciones[nodo].get(caracter, 0)
+            if self.salidas[nodo]:
+                encontradas |= self.salidas[nodo]
+        return encontradas
+
+@lru_cache(maxsize=32)
+def _matcher(marcas: tuple) -> AhoCorasick:
+    # Los espacios en los bordes obligan a que la coincidencia sea de palabras completas
+    patrones = {}
+    for marca in marcas:
+        for alias in alias_de(marca):
+            patrones[f" {alias} "] = marca
+    return AhoCorasick(patrones)
+
+def contar_menciones(perfil, items: list) -> dict:
+    """
+    Cantidad de notas que mencionan a cada marca (empresa + relacionadas), sin
+    distinguir mayúsculas ni tildes. Cada nota cuenta una vez por marca.
+    """
+    marcas = (perfil.empresa, *perfil.relacionadas)
+    matcher = _matcher(marcas)
+    conteo = dict.fromkeys(marcas, 0)
+    for item in items:
+        for marca in matcher.buscar(f" {normalizar_texto(item.titulo + ' ' + item.resumen)} "):
+            conteo[marca] += 1
+    return conteo
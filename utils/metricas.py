@@ -0,0 +1,143 @@
+# utils/metricas.py
+import re
+from dataclasses import dataclass, field, asdict
+from urllib.parse import urlsplit
+from pydantic import BaseModel, Field
+from config import REDES_SOCIALES, SENTIMIENTO_MAX_TOKENS
+from utils.noticias import BLOQUE_SOCIAL
+from utils.presupuesto import contar_tokens
+
+class SentimientoEstructurado(BaseModel):
+    """Salida estructurada que se le pide al LLM: sólo lo que requiere juicio."""
+    positivo: int = Field(ge=0, description="Noticias con tono positivo para la empresa")
+    neutro: int = Field(ge=0, description="Noticias con tono neutro")
+    negativo: int = Field(ge=0, description="Noticias con tono negativo para la empresa")
+    social_positivo: int = Field(ge=0, description="Publicaciones en redes con tono positivo")
+    social_neutro: int = Field(ge=0, description="Publicaciones en redes con tono neutro")
+    social_negativo: int = Field(ge=0, description="Publicaciones en redes con tono negativo")
+
+@dataclass(slots=True)
+class MetricasReporte:
+    """Todas las cifras del reporte, tipadas. Es lo que lee el exportador para los gráficos."""
+    sentimiento: dict = field(default_factory=lambda: {"Positivo": 0, "Neutro": 0, "Negativo": 0})
+    volumen_marcas: dict = field(default_factory=dict)
+    volumen_social: dict = field(default_factory=lambda: dict.fromkeys(REDES_SOCIALES, 0))
+    sentimiento_social: dict = field(default_factory=lambda: {"Positivo": 0, "Neutro": 0, "Negativo": 0})
+
+    def a_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def desde_dict(cls, datos: dict) -> "MetricasReporte":
+        return cls(**datos)
+
+def red_de(url: str):
+    """Nombre de la red social (según config.REDES_SOCIALES) a la que pertenece una URL."""
+    host = (urlsplit(url).hostname or "").lower()
+    for red, (dominios, _) in REDES_SOCIALES.items():
+        if any(host == d or host.endswith("." + d) for d in dominios):
+            return red
+    return None
+
+def volumen_por_red(items: list) -> dict:
+    """Publicaciones del bloque social por red, contadas por dominio (sin LLM)."""
+    volumen = dict.fromkeys(REDES_SOCIALES, 0)
+    for item in items:
+        if item.bloque == BLOQUE_SOCIAL:
+            red = red_de(item.url)
+            if red is not None:
+                volumen[red] += 1
+    return volumen
+
+def _titulares(items: list, cupo: int) -> tuple:
+    """Una línea por nota ("n. [fuente] título") hasta `cupo` tokens. Devuelve (texto, notas incluidas)."""
+    lineas, usados = [], 0
+    for i, item in enumerate(items, 1):
+        linea = f"{i}. [{item.fuente}] {item.titulo}"
+        usados += contar_tokens(linea) + 1
+        if usados > cupo:
+            break
+        lineas.append(linea)
+    return ("\n    ".join(lineas) or "Sin notas."), len(lineas)
+
+def prompt_sentimiento(empresa: str, items: list, max_tokens: int = SENTIMIENTO_MAX_TOKENS) -> str:
+    """
+    Prompt del clasificador: sólo los titulares de las notas que ve el redactor (no el
+    texto completo, que ya paga la redacción). El tope se reparte entre noticias y
+    redes en proporción a cuántas hay de cada una.
+    """
+    noticias = [item for item in items if item.bloque != BLOQUE_SOCIAL]
+    social = [item for item in items if item.bloque == BLOQUE_SOCIAL]
+    total = max(1, len(items))
+    texto_noticias, n_noticias = _titulares(noticias, max_tokens * len(noticias) // total)
+    texto_social, n_social = _titulares(social, max_tokens * len(social) // total)
+    if n_noticias < len(noticias) or n_social < len(social):
+        print(f"   ✂️  Sentimiento: {n_noticias}/{len(noticias)} titulares de noticias y "
+              f"{n_social}/{len(social)} de redes (tope {max_tokens} tokens)")
+    return f"""
+    Clasifica el sentimiento hacia {empresa} de cada noticia (o hecho agrupado) y de cada
+    publicación en redes sociales, a partir de su título. Cuenta cuántas hay de cada tono.
+
+    NOTICIAS:
+    {texto_noticias}
+
+    REDES SOCIALES:
+    {texto_social}
+
+    Las noticias que cubren el MISMO HECHO cuentan una sola vez.
+    """
+
+def armar_metricas(sentimiento: SentimientoEstructurado, menciones: dict, items: list) -> MetricasReporte:
+    metricas = MetricasReporte(volumen_marcas=dict(menciones), volumen_social=volumen_por_red(items))
+    if sentimiento is not None:
+        metricas.sentimiento = {"Positivo": sentimiento.positivo, "Neutro": sentimiento.neutro,
+                                "Negativo": sentimiento.negativo}
+        metricas.sentimiento_social = {"Positivo": sentimiento.social_positivo, "Neutro": sentimiento.social_neutro,
+                                       "Negativo": sentimiento.social_negativo}
+    return metricas
+
+# --- Cifras dentro del Markdown ---
+ENCABEZADO_SENTIMIENTO = "## 📊 Reporte de Sentimiento"
+ENCABEZADO_SOCIAL = "## 💬 Resumen Conversación Digital"
+
+def _lista(datos: dict, prefijo: str = "") -> str:
+    return "\n".join(f"* {prefijo}{clave}: {valor}" for clave, valor in datos.items())
+
+def insertar_datos(markdown_texto: str, metricas: MetricasReporte) -> str:
+    """Agrega las secciones de cifras (generadas en Python) debajo de sus encabezados."""
+    datos_sentimiento = (
+        f"### Datos Sentimiento\n{_lista(metricas.sentimiento)}\n\n"
+        f"### Datos Volumen por Marca\n{_lista(metricas.volumen_marcas, 'Menciones ')}\n"
+    )
+    redes_activas = {red: n for red, n in metricas.volumen_social.items() if n > 0}
+    datos_social = (
+        f"### Data Social\n* Total Menciones: {sum(metricas.volumen_social.values())}\n"
+        + (_lista(redes_activas) + "\n" if redes_activas else "")
+        + _lista(metricas.sentimiento_social, "Social ") + "\n"
+    )
+    for encabezado, bloque in ((ENCABEZADO_SENTIMIENTO, datos_sentimiento), (ENCABEZADO_SOCIAL, datos_social)):
+        patron = re.compile(rf"^{re.escape(encabezado)}[^\n]*\n", re.MULTILINE)
+        if patron.search(markdown_texto):
+            markdown_texto = patron.sub(lambda m: f"{m.group(0)}\n{bloque}\n", markdown_texto, count=1)
+        else:
+            markdown_texto += f"\n\n{encabezado}\n\n{bloque}"
+    return markdown_texto
+
+# Ítems "* Etiqueta: N" del Markdown, en una sola pasada (para reportes viejos sin sidecar)
+PATRON_DATO = re.compile(r"^\s*\*\s*([^:\n]+?):\s*(\d+)\s*$", re.MULTILINE)
+
+def metricas_desde_markdown(md_text: str, marcas: list = None) -> MetricasReporte:
+    encontrados = [(etiqueta.strip(), int(n)) for etiqueta, n in PATRON_DATO.findall(md_text)]
+    datos = {etiqueta.casefold(): n for etiqueta, n in encontrados}
+
+    def valor(etiqueta):
+        return datos.get(etiqueta.casefold(), 0)
+
+    metricas = MetricasReporte()
+    metricas.sentimiento = {k: valor(k) for k in metricas.sentimiento}
+    metricas.sentimiento_social = {k: valor(f"Social {k}") for k in metricas.sentimiento_social}
+    metricas.volumen_social = {red: valor(red) for red in REDES_SOCIALES}
+    if marcas is None:
+        marcas = [e[len("Menciones "):] for e, _ in encontrados if e.casefold().startswith("menciones ")]
+    metricas.volumen_marcas = {marca: valor(f"Menciones {marca}") for marca in marcas}
+    return metricas
@@ -0,0 +1,63 @@
+# utils/noticias.py
+from dataclasses import dataclass, field
+from utils.urls import canonicalizar_url
+
+@dataclass(slots=True)
+class NoticiaItem:
+    """Una noticia tal como llega de Serper, más el bloque del reporte al que pertenece."""
+    titulo: str
+    url: str
+    resumen: str = ""
+    fuente: str = "Web"
+    fecha: str = "Fecha no provista por API"
+    bloque: str = ""
+    url_canonica: str = ""  # Se calcula sola; es la clave de deduplicación
+    enlaces_relacionados: list = field(default_factory=list)  # (fuente, url) de notas sindicadas
+    texto: str = ""  # Cuerpo de la nota, si se extrajo (tools/extractor.py)
+
+    def __post_init__(self):
+        if not self.url_canonica:
+            self.url_canonica = canonicalizar_url(self.url)
+
+# Bloques de noticias en orden de prioridad (el primero que trae una URL se la queda)
+BLOQUES = [
+    ("internacional", "BLOQUE INTERNACIONAL"),
+    ("nacional", "BLOQUE NACIONAL (MARCA PRINCIPAL)"),
+    ("subsidiarias", "BLOQUE NACIONAL (SUBSIDIARIAS)"),
+    ("sector", "BLOQUE SECTOR/COMPETENCIA"),
+]
+BLOQUE_SOCIAL = "social"
+
+def renderizar_items(items: list) -> str:
+    """Texto ITEM_n / URL_REAL / RESUMEN que espera el prompt del redactor."""
+    if not items:
+        return "Sin noticias en este bloque."
+    lineas = []
+    for i, item in enumerate(items, 1):
+        lineas += [
+            f"ITEM_{i}",
+            f"FECHA_GOOGLE: {item.fecha}",
+            f"FUENTE: {item.fuente}",
+            f"TITULO: {item.titulo}",
+            f"URL_REAL: {item.url}",
+            f"RESUMEN: {item.resumen}",
+        ]
+        if item.texto:
+            lineas.append(f"TEXTO: {item.texto}")
+        if item.enlaces_relacionados:
+            lineas.append("OTRAS_FUENTES: " + " | ".join(f"{fuente}: {url}" for fuente, url in item.enlaces_relacionados))
+        lineas.append("-" * 40)
+    return "\n".join(lineas) + "\n"
+
+def items_de_bloque(items: list, bloque: str) -> list:
+    return [item for item in items if item.bloque == bloque]
+
+def renderizar_noticias(items: list) -> str:
+    """Arma el INPUT NOTICIAS con los cuatro bloques, en orden."""
+    return "\n\n".join(
+        f"=== {titulo} ===\n{renderizar_items(items_de_bloque(items, clave))}"
+        for clave, titulo in BLOQUES
+    )
+
+def renderizar_social(items: list) -> str:
+    return renderizar_items(items_de_bloque(items, BLOQUE_SOCIAL))
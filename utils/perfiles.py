@@ -0,0 +1,27 @@
+# utils/perfiles.py
+import json
+from dataclasses import dataclass
+from config import EMPRESA, EMPRESAS_RELACIONADAS, TERMINOS_SECTOR
+
+@dataclass(frozen=True, slots=True)
+class PerfilEmpresa:
+    """Todo lo que cambia de una empresa a otra al armar su newsletter."""
+    empresa: str
+    relacionadas: tuple = ()
+    terminos_sector: tuple = ()
+
+def perfil_por_defecto() -> PerfilEmpresa:
+    """El perfil definido en config.py (o TARGET_COMPANY en el .env)."""
+    return PerfilEmpresa(EMPRESA, tuple(EMPRESAS_RELACIONADAS), tuple(TERMINOS_SECTOR))
+
+def cargar_perfiles(ruta: str) -> list:
+    """
+    Lee una cartera de empresas desde JSON:
+    [{"empresa": "...", "relacionadas": [...], "terminos_sector": [...]}, ...]
+    """
+    with open(ruta, encoding="utf-8") as f:
+        datos = json.load(f)
+    return [
+        PerfilEmpresa(d["empresa"], tuple(d.get("relacionadas", [])), tuple(d.get("terminos_sector", [])))
+        for d in datos
+    ]
@@ -0,0 +1,78 @@
+# utils/presupuesto.py
+from dataclasses import replace
+from config import PRESUPUESTO_PESOS_BLOQUES, PRESUPUESTO_MAX_CHARS_RESUMEN, MODELO_LLM
+from utils.noticias import renderizar_items, items_de_bloque
+from utils.trazas import anotar
+
+_codificador = None
+
+def contar_tokens(texto: str) -> int:
+    """Tokens según el tokenizer del modelo (tiktoken); si no está disponible, ~4 caracteres por token."""
+    global _codificador
+    if _codificador is None:
+        try:
+            import tiktoken
+            _codificador = tiktoken.encoding_for_model(MODELO_LLM)
+        except Exception:
+            # Sin tiktoken (o sin red para bajar el vocabulario) usamos la heurística
+            _codificador = False
+    if _codificador is False:
+        return len(texto) // 4 + 1
+    return len(_codificador.encode(texto, disallowed_special=()))
+
+def _tokens_item(item) -> int:
+    return contar_tokens(renderizar_items([item]))
+
+def _recortar_resumen(item):
+    # El texto completo de la nota (si se extrajo) es lo primero que se resigna
+    if item.texto:
+        item = replace(item, texto="")
+    if len(item.resumen) <= PRESUPUESTO_MAX_CHARS_RESUMEN:
+        return item
+    return replace(item, resumen=item.resumen[:PRESUPUESTO_MAX_CHARS_RESUMEN].rsplit(" ", 1)[0] + "…")
+
+def _ajustar_bloque(items: list, cupo: int) -> tuple:
+    """Primero quita textos y recorta resúmenes; si no alcanza, descarta desde el final (menor ranking de Google)."""
+    items = [_recortar_resumen(item) for item in items]
+    tokens = [_tokens_item(item) for item in items]
+    while items and sum(tokens) > cupo:
+        items.pop()
+        tokens.pop()
+    return items, sum(tokens)
+
+def ajustar_a_presupuesto(items: list, max_tokens: int) -> list:
+    """
+    Reparte `max_tokens` entre los bloques según PRESUPUESTO_PESOS_BLOQUES. Los
+    bloques que no usan su cupo lo ceden a los que se pasan (en proporción a su
+    peso); los que igual no entran se recortan. Respeta el orden de los items.
+    """
+    pesos = PRESUPUESTO_PESOS_BLOQUES
+    por_bloque = {b: items_de_bloque(items, b) for b in pesos}
+    usados = {b: sum(_tokens_item(item) for item in por_bloque[b]) for b in pesos}
+    finales = dict(usados)
+    cupos = {b: int(max_tokens * pesos[b] / sum(pesos.values())) for b in pesos}
+
+    excedidos = [b for b in pesos if usados[b] > cupos[b]]
+    sobrante = sum(cupos[b] - usados[b] for b in pesos if b not in excedidos)
+    peso_excedidos = sum(pesos[b] for b in excedidos)
+    recortados = []
+    for b in excedidos:
+        cupos[b] += int(sobrante * pesos[b] / peso_excedidos)
+        # Con lo cedido por los demás puede que ya entre: entonces no se toca
+        if usados[b] > cupos[b]:
+            por_bloque[b], finales[b] = _ajustar_bloque(por_bloque[b], cupos[b])
+            recortados.append(b)
+
+    print(f"   🧮 Presupuesto de entrada: {max_tokens} tokens para noticias ({sum(finales.values())} usados)")
+    for b in pesos:
+        detalle = ""
+        if b in recortados:
+            descartados = len(items_de_bloque(items, b)) - len(por_bloque[b])
+            detalle = f" (recortado de {usados[b]}, {descartados} descartados)"
+        print(f"      · {b}: {finales[b]}/{cupos[b]} tokens, {len(por_bloque[b])} items{detalle}")
+    # También en la traza: el uso por bloque sirve para ajustar los pesos aunque nada se recorte
+    anotar(presupuesto_tokens=max_tokens,
+           presupuesto_bloques={b: {"tokens": finales[b], "cupo": cupos[b], "items": len(por_bloque[b])}
+                                for b in pesos})
+
+    return [item for b in pesos for item in por_bloque[b]]
@@ -0,0 +1,64 @@
+# utils/progresivo.py
+import time
+from utils.exportador_html import renderizar_vista_previa
+
+class EscritorProgresivo:
+    """
+    Recibe el texto del LLM a medida que llega (streaming): lo va agregando a un
+    .md en disco y, cada vez que se completa una sección (## ...), regenera la
+    vista previa HTML. Registra el tiempo hasta el primer token y la primera sección.
+    """
+
+    def __init__(self, empresa: str):
+        self.empresa = empresa
+        self.ruta_md = f"reporte_{empresa}_parcial.md"
+        self.ruta_html = f"reporte_{empresa}_parcial.html"
+        self._fragmentos = []
+        self._cola = "\n"  # Últimos caracteres recibidos: un "\n## " puede venir partido entre fragmentos
+        self._encabezados = 0
+        self.secciones = 0
+        self.inicio = time.monotonic()
+        self.primer_token = None
+        self.primera_seccion = None
+        self._archivo = open(self.ruta_md, "w", encoding="utf-8")
+        renderizar_vista_previa("", empresa, self.ruta_html)
+        print(f"   📝 Vista previa en vivo: {self.ruta_html}")
+
+    @property
+    def texto(self) -> str:
+        return "".join(self._fragmentos)
+
+    def agregar(self, fragmento: str):
+        if not fragmento:
+            return
+        if self.primer_token is None:
+            self.primer_token = time.monotonic() - self.inicio
+        self._archivo.write(fragmento)
+        self._archivo.flush()
+        self._fragmentos.append(fragmento)
+        # Sólo se revisa lo nuevo (más la cola): el costo no crece con el largo del reporte.
+        # La cola arranca en "\n" para que un "## " al principio del texto también cuente
+        ventana = self._cola + fragmento
+        self._encabezados += ventana.count("\n## ")
+        self._cola = ventana[-3:]
+        # Una sección está completa cuando empieza la siguiente
+        completas = self._encabezados - 1
+        if completas > self.secciones:
+            self.secciones = completas
+            if self.primera_seccion is None:
+                self.primera_seccion = time.monotonic() - self.inicio
+            renderizar_vista_previa(self.texto, self.empresa, self.ruta_html)
+
+    def cerrar(self, texto_final: str = None):
+        if texto_final is not None and texto_final != self.texto:
+            # Caso cache hit: el texto llegó entero, sin streaming
+            self._archivo.seek(0)
+            self._archivo.truncate()
+            self._archivo.write(texto_final)
+            self._fragmentos = [texto_final]
+        self._archivo.close()
+        renderizar_vista_previa(self.texto, self.empresa, self.ruta_html, completo=True)
+        if self.primer_token is not None:
+            seccion = f"{self.primera_seccion:.1f}s" if self.primera_seccion is not None else "-"
+            print(f"   ⏱️  Streaming: primer token {self.primer_token:.1f}s | primera sección {seccion} | "
+                  f"total {time.monotonic() - self.inicio:.1f}s")
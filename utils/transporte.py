@@ -0,0 +1,280 @@
+# utils/transporte.py
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from email.utils import parsedate_to_datetime
+import httpx
+from utils.limitador import obtener_limitador
+from config import (
+    HTTP_TIMEOUT_CONEXION, HTTP_TIMEOUT_LECTURA, HTTP_MAX_CONEXIONES, HTTP_MAX_KEEPALIVE,
+    HTTP_MAX_REINTENTOS, HTTP_BACKOFF_BASE, HTTP_BACKOFF_MAX,
+    CIRCUITO_UMBRAL_FALLOS, CIRCUITO_SEGUNDOS_ABIERTO
+)
+
+# Códigos que vale la pena reintentar (rate limit y errores transitorios del servidor)
+ESTADOS_REINTENTABLES = {429, 500, 502, 503, 504}
+# 429 es contrapresión, no una falla: el servicio responde, sólo pide que bajemos el ritmo
+ESTADO_RATE_LIMIT = 429
+
+class CircuitoAbierto(Exception):
+    """Se lanza cuando el servicio acumuló demasiados fallos seguidos y cortamos antes de llamar."""
+
+class Circuito:
+    """
+    Circuit breaker simple: tras N fallos consecutivos se abre y rechaza llamadas
+    durante un tiempo; después deja pasar una sola de prueba (semiabierto) y el resto
+    sigue rechazado hasta que la prueba sale bien (cierra) o mal (vuelve a abrir).
+    """
+
+    def __init__(self, nombre: str, umbral_fallos: int = CIRCUITO_UMBRAL_FALLOS,
+                 segundos_abierto: float = CIRCUITO_SEGUNDOS_ABIERTO):
+        self.nombre = nombre
+        self.umbral_fallos = umbral_fallos
+        self.segundos_abierto = segundos_abierto
+        self.fallos_seguidos = 0
+        self.abierto_desde = None
+        self.prueba_desde = None  # Semiabierto: cuándo salió la llamada de prueba en curso
+        self._lock = threading.Lock()
+
+    def verificar(self):
+        with self._lock:
+            if self.abierto_desde is None:
+                return
+            ahora = time.monotonic()
+            if ahora - self.abierto_desde < self.segundos_abierto:
+                raise CircuitoAbierto(f"{self.nombre} no disponible (circuito abierto tras {self.fallos_seguidos} fallos)")
+            # Una prueba que nunca informó resultado (cancelada, por ejemplo) no bloquea para siempre
+            if self.prueba_desde is not None and ahora - self.prueba_desde < self.segundos_abierto:
+                raise CircuitoAbierto(f"{self.nombre} no disponible (circuito semiabierto, prueba en curso)")
+            # Semiabierto: esta llamada es la prueba; las demás esperan su resultado
+            self.prueba_desde = ahora
+
+    def registrar_exito(self):
+        with self._lock:
+            self.fallos_seguidos = 0
+            self.abierto_desde = None
+            self.prueba_desde = None
+
+    def registrar_neutro(self):
+        """Respuesta que no dice nada de la salud del servicio (429): sólo libera la prueba."""
+        with self._lock:
+            self.prueba_desde = None
+
+    def registrar_fallo(self):
+        with self._lock:
+            self.fallos_seguidos += 1
+            if self.prueba_desde is not None:
+                # Falló la prueba: otro período abierto completo
+                self.prueba_desde = None
+                self.abierto_desde = time.monotonic()
+                print(f"      ⛔ Circuito {self.nombre} sigue ABIERTO (falló la prueba)")
+            elif self.fallos_seguidos >= self.umbral_fallos and self.abierto_desde is None:
+                self.abierto_desde = time.monotonic()
+                print(f"      ⛔ Circuito {self.nombre} ABIERTO por {self.segundos_abierto:.0f}s")
+
+class Transporte:
+    """
+    Capa HTTP compartida: pool de conexiones keep-alive, timeouts, reintentos con
+    backoff exponencial + jitter en 429/5xx y circuit breaker (sólo 5xx y errores de
+    red lo abren; un 429 frena el limitador del servicio). Expone un cliente
+    síncrono y uno asíncrono (uno por event loop) con la misma política.
+    """
+
+    def __init__(self, nombre: str, limitador=None):
+        self.nombre = nombre
+        self.circuito = Circuito(nombre)
+        self.limitador = limitador
+        self._timeout = httpx.Timeout(HTTP_TIMEOUT_LECTURA, connect=HTTP_TIMEOUT_CONEXION)
+        self._limites = httpx.Limits(max_connections=HTTP_MAX_CONEXIONES,
+                                     max_keepalive_connections=HTTP_MAX_KEEPALIVE)
+        self._cliente = None
+        self._clientes_async = {}
+        self._lock = threading.Lock()
+        self.stats = {"peticiones": 0, "conexiones_nuevas": 0, "conexiones_reusadas": 0,
+                      "reintentos": 0, "fallos": 0, "rate_limits": 0, "bytes_recibidos": 0}
+
+    # --- Clientes ---
+    def _cliente_sync(self) -> httpx.Client:
+        with self._lock:
+            if self._cliente is None or self._cliente.is_closed:
+                self._cliente = httpx.Client(timeout=self._timeout, limits=self._limites)
+            return self._cliente
+
+    def _cliente_async(self) -> httpx.AsyncClient:
+        # Un AsyncClient queda atado al loop donde se creó
+        loop = asyncio.get_running_loop()
+        cliente = self._clientes_async.get(loop)
+        if cliente is None or cliente.is_closed:
+            cliente = httpx.AsyncClient(timeout=self._timeout, limits=self._limites)
+            self._clientes_async[loop] = cliente
+        return cliente
+
+    def cerrar(self):
+        with self._lock:
+            if self._cliente is not None:
+                self._cliente.close()
+                self._cliente = None
+
+    async def acerrar(self):
+        cliente = self._clientes_async.pop(asyncio.get_running_loop(), None)
+        if cliente is not None:
+            await cliente.aclose()
+
+    # --- Política de reintentos ---
+    def _espera(self, intento: int, respuesta: httpx.Response = None) -> float:
+        retry_after = _retry_after(respuesta) if respuesta is not None else None
+        if retry_after is not None:
+            return min(retry_after, HTTP_BACKOFF_MAX)
+        # Backoff exponencial con "full jitter"
+        return random.uniform(0, min(HTTP_BACKOFF_MAX, HTTP_BACKOFF_BASE * (2 ** intento)))
+
+    def _registrar(self, respuesta: httpx.Response, conexion_nueva: bool):
+        with self._lock:
+            self.stats["peticiones"] += 1
+            self.stats["conexiones_nuevas" if conexion_nueva else "conexiones_reusadas"] += 1
+            self.stats["bytes_recibidos"] += len(respuesta.content)
+
+    def _evaluar(self, intento: int, respuesta=None, error=None):
+        """Devuelve los segundos a esperar antes de reintentar, o None si no hay que reintentar."""
+        if error is None and respuesta.status_code not in ESTADOS_REINTENTABLES:
+            self.circuito.registrar_exito()
+            return None
+        rate_limit = error is None and respuesta.status_code == ESTADO_RATE_LIMIT
+        if rate_limit:
+            self.circuito.registrar_neutro()
+            with self._lock:
+                self.stats["rate_limits"] += 1
+        else:
+            self.circuito.registrar_fallo()
+            self.circuito.verificar()  # Si el fallo abrió el circuito, cortamos sin esperar
+        motivo = f"HTTP {respuesta.status_code}" if error is None else type(error).__name__
+        if intento >= HTTP_MAX_REINTENTOS:
+            with self._lock:
+                self.stats["fallos"] += 1
+            if error is not None:
+                raise error
+            return None
+        espera = self._espera(intento, respuesta)
+        if rate_limit and self.limitador is not None:
+            # La espera vale para todas las llamadas al servicio, no sólo para este reintento
+            self.limitador.frenar(espera)
+        with self._lock:
+            self.stats["reintentos"] += 1
+        print(f"      🔁 {self.nombre}: reintento {intento + 1}/{HTTP_MAX_REINTENTOS} ({motivo}) en {espera:.1f}s")
+        return espera
+
+    def request(self, metodo: str, url: str, **kwargs) -> httpx.Response:
+        intento = 0
+        while True:
+            self.circuito.verificar()
+            if self.limitador is not None:
+                self.limitador.adquirir_sync()
+            conexion = {"nueva": False}
+
+            def traza(evento, info):
+                if evento == "connection.connect_tcp.complete":
+                    conexion["nueva"] = True
+
+            respuesta, error = None, None
+            try:
+                respuesta = self._cliente_sync().request(metodo, url, extensions={"trace": traza}, **kwargs)
+                self._registrar(respuesta, conexion["nueva"])
+            except httpx.TransportError as e:
+                error = e
+            espera = self._evaluar(intento, respuesta, error)
+            if espera is None:
+                return respuesta
+            time.sleep(espera)
+            intento += 1
+
+    async def arequest(self, metodo: str, url: str, **kwargs) -> httpx.Response:
+        intento = 0
+        while True:
+            self.circuito.verificar()
+            if self.limitador is not None:
+                await self.limitador.adquirir()
+            conexion = {"nueva": False}
+
+            async def traza(evento, info):
+                if evento == "connection.connect_tcp.complete":
+                    conexion["nueva"] = True
+
+            respuesta, error = None, None
+            try:
+                respuesta = await self._cliente_async().request(metodo, url, extensions={"trace": traza}, **kwargs)
+                self._registrar(respuesta, conexion["nueva"])
+            except httpx.TransportError as e:
+                error = e
+            espera = self._evaluar(intento, respuesta, error)
+            if espera is None:
+                return respuesta
+            await asyncio.sleep(espera)
+            intento += 1
+
+    @asynccontextmanager
+    async def astream(self, metodo: str, url: str, **kwargs):
+        """
+        Como arequest pero sin leer el cuerpo: quien consume decide cuánto leer
+        (aiter_bytes/aiter_text). Sin reintentos ni registro en el circuito, porque
+        se usa contra muchos sitios distintos y un sitio caído no dice nada del resto.
+        """
+        self.circuito.verificar()
+        if self.limitador is not None:
+            await self.limitador.adquirir()
+        conexion = {"nueva": False}
+
+        async def traza(evento, info):
+            if evento == "connection.connect_tcp.complete":
+                conexion["nueva"] = True
+
+        async with self._cliente_async().stream(metodo, url, extensions={"trace": traza}, **kwargs) as respuesta:
+            try:
+                yield respuesta
+            finally:
+                with self._lock:
+                    self.stats["peticiones"] += 1
+                    self.stats["conexiones_nuevas" if conexion["nueva"] else "conexiones_reusadas"] += 1
+                    self.stats["bytes_recibidos"] += respuesta.num_bytes_downloaded
+
+    def resumen(self) -> str:
+        s = self.stats
+        return (f"📡 {self.nombre}: {s['peticiones']} peticiones | "
+                f"{s['conexiones_nuevas']} conexiones nuevas, {s['conexiones_reusadas']} reusadas | "
+                f"{s['reintentos']} reintentos ({s['rate_limits']} por 429), {s['fallos']} fallos | "
+                f"{s['bytes_recibidos'] / 1024:.1f} KB")
+
+def _retry_after(respuesta: httpx.Response):
+    """Segundos pedidos por el servidor en Retry-After (número o fecha HTTP), o None."""
+    valor = respuesta.headers.get("Retry-After", "").strip()
+    if valor.isdigit():
+        return float(valor)
+    try:
+        return max(0.0, parsedate_to_datetime(valor).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+_transportes = {}
+_lock_registro = threading.Lock()
+
+def obtener_transporte(nombre: str) -> Transporte:
+    """
+    Devuelve el transporte compartido del servicio `nombre` (se crea la primera vez).
+    Si el servicio tiene rate limit configurado, cada intento pasa por él.
+    """
+    with _lock_registro:
+        if nombre not in _transportes:
+            _transportes[nombre] = Transporte(nombre, obtener_limitador(nombre))
+        return _transportes[nombre]
+
+def imprimir_resumen_transportes():
+    for transporte in _transportes.values():
+        if transporte.stats["peticiones"] or transporte.stats["fallos"]:
+            print(transporte.resumen())
+
+async def cerrar_transportes():
+    """Cierra los clientes del loop actual y los síncronos de todos los servicios."""
+    for transporte in list(_transportes.values()):
+        await transporte.acerrar()
+        transporte.cerrar()
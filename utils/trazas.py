@@ -0,0 +1,181 @@
+# utils/trazas.py
+import contextvars
+import cProfile
+import functools
+import itertools
+import json
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from config import TRAZAS_ACTIVADO, TRAZAS_DIR, PRECIOS_LLM
+
+# Traza de la corrida y span abierto en el contexto actual. Con contextvars cada
+# tarea de asyncio (y cada asyncio.to_thread) hereda el span de quien la lanzó.
+_traza_actual = contextvars.ContextVar("traza_actual", default=None)
+_span_actual = contextvars.ContextVar("span_actual", default=None)
+
+class Span:
+    """Un tramo medido: nombre, padre, duración y atributos libres (bytes, conteos, tokens...)."""
+    __slots__ = ("id", "nombre", "padre", "atributos", "inicio", "_t0")
+
+    def __init__(self, id_: int, nombre: str, padre, atributos: dict):
+        self.id = id_
+        self.nombre = nombre
+        self.padre = padre
+        self.atributos = atributos
+        self.inicio = time.time()
+        self._t0 = time.perf_counter()
+
+    def anotar(self, **atributos):
+        self.atributos.update(atributos)
+
+    def sumar(self, **valores):
+        for clave, valor in valores.items():
+            self.atributos[clave] = self.atributos.get(clave, 0) + valor
+
+class Traza:
+    """Archivo JSONL de una corrida: una línea por span cerrado, más un resumen al final."""
+
+    def __init__(self, ruta: str):
+        self.ruta = ruta
+        self._archivo = open(ruta, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.totales = {"tokens_entrada": 0, "tokens_salida": 0, "costo_usd": 0.0, "llamadas_llm": 0}
+
+    def nuevo_id(self) -> int:
+        return next(self._ids)
+
+    def escribir(self, registro: dict):
+        linea = json.dumps(registro, ensure_ascii=False, default=str)
+        with self._lock:
+            self._archivo.write(linea + "\n")
+            self._archivo.flush()
+
+    def acumular(self, tokens_entrada: int, tokens_salida: int, costo: float):
+        with self._lock:
+            self.totales["tokens_entrada"] += tokens_entrada
+            self.totales["tokens_salida"] += tokens_salida
+            self.totales["costo_usd"] += costo
+            self.totales["llamadas_llm"] += 1
+
+    def cerrar(self):
+        self.escribir({"tipo": "resumen", **self.totales})
+        self._archivo.close()
+
+@contextmanager
+def span(nombre: str, **atributos):
+    """Mide el bloque y lo escribe en la traza de la corrida (no hace nada si no hay traza abierta)."""
+    traza = _traza_actual.get()
+    if traza is None:
+        yield None
+        return
+    padre = _span_actual.get()
+    actual = Span(traza.nuevo_id(), nombre, padre.id if padre else None, atributos)
+    token = _span_actual.set(actual)
+    error = None
+    try:
+        yield actual
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        _span_actual.reset(token)
+        registro = {"tipo": "span", "span": nombre, "id": actual.id, "padre": actual.padre,
+                    "inicio": datetime.fromtimestamp(actual.inicio).isoformat(timespec="milliseconds"),
+                    "duracion_s": round(time.perf_counter() - actual._t0, 4), **actual.atributos}
+        if error is not None:
+            registro["error"] = error
+        traza.escribir(registro)
+
+def trazado(nombre: str):
+    """Decorador: envuelve una función async (p. ej. un nodo del grafo) en un span."""
+    def decorador(funcion):
+        @functools.wraps(funcion)
+        async def envoltura(*args, **kwargs):
+            with span(nombre):
+                return await funcion(*args, **kwargs)
+        return envoltura
+    return decorador
+
+def anotar(**atributos):
+    """Agrega atributos al span abierto en el contexto actual."""
+    actual = _span_actual.get()
+    if actual is not None:
+        actual.anotar(**atributos)
+
+def sumar(**valores):
+    """Acumula contadores en el span actual (p. ej. bytes de varias páginas de una misma búsqueda)."""
+    actual = _span_actual.get()
+    if actual is not None:
+        actual.sumar(**valores)
+
+def costo_estimado(modelo: str, tokens_entrada: int, tokens_salida: int) -> float:
+    precios = PRECIOS_LLM.get(modelo)
+    if precios is None:
+        return 0.0
+    return (tokens_entrada * precios["entrada"] + tokens_salida * precios["salida"]) / 1_000_000
+
+def registrar_uso_llm(modelo: str, uso: dict):
+    """Anota tokens y costo de una llamada al LLM (usage_metadata de LangChain) en el span y en el total."""
+    traza = _traza_actual.get()
+    if traza is None or not uso:
+        return
+    entrada, salida = uso.get("input_tokens", 0), uso.get("output_tokens", 0)
+    costo = costo_estimado(modelo, entrada, salida)
+    anotar(modelo=modelo, tokens_entrada=entrada, tokens_salida=salida, costo_usd=round(costo, 6))
+    traza.acumular(entrada, salida, costo)
+
+def _escribir_perfil(traza: Traza, perfilador: cProfile.Profile):
+    base = os.path.splitext(traza.ruta)[0]
+    perfilador.dump_stats(f"{base}.prof")
+    actual, pico = tracemalloc.get_traced_memory()
+    top = tracemalloc.take_snapshot().statistics("lineno")[:10]
+    tracemalloc.stop()
+    funciones = pstats.Stats(perfilador)
+    traza.escribir({
+        "tipo": "perfil",
+        "memoria_pico_mb": round(pico / 1024 / 1024, 2),
+        "memoria_actual_mb": round(actual / 1024 / 1024, 2),
+        "top_asignaciones": [{"linea": str(e.traceback), "kb": round(e.size / 1024, 1)} for e in top],
+        "funciones_mas_costosas": [
+            {"funcion": f"{archivo}:{linea}({nombre})", "acumulado_s": round(datos[3], 4)}
+            for (archivo, linea, nombre), datos in
+            sorted(funciones.stats.items(), key=lambda kv: kv[1][3], reverse=True)[:15]
+        ],
+        "archivo_cprofile": f"{base}.prof",
+    })
+
+@contextmanager
+def iniciar_traza(perfilar: bool = False):
+    """
+    Abre la traza de una corrida (.estado/trazas/traza_<fecha>.jsonl). Con `perfilar`
+    también corre cProfile (se guarda el .prof al lado) y tracemalloc.
+    """
+    if not TRAZAS_ACTIVADO:
+        yield None
+        return
+    os.makedirs(TRAZAS_DIR, exist_ok=True)
+    traza = Traza(os.path.join(TRAZAS_DIR, f"traza_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jsonl"))
+    token = _traza_actual.set(traza)
+    perfilador = None
+    if perfilar:
+        tracemalloc.start()
+        perfilador = cProfile.Profile()
+        perfilador.enable()
+    try:
+        with span("corrida"):
+            yield traza
+    finally:
+        if perfilador is not None:
+            perfilador.disable()
+            _escribir_perfil(traza, perfilador)
+        _traza_actual.reset(token)
+        traza.cerrar()
+        t = traza.totales
+        print(f"🧾 Traza: {traza.ruta} | LLM: {t['llamadas_llm']} llamadas, "
+              f"{t['tokens_entrada']}+{t['tokens_salida']} tokens, ~US$ {t['costo_usd']:.4f}")
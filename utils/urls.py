@@ -0,0 +1,34 @@
+# utils/urls.py
+import re
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Parámetros que sólo sirven para tracking y no cambian el contenido
+PARAMETROS_TRACKING = {
+    "fbclid", "gclid", "dclid", "msclkid", "igshid", "mc_cid", "mc_eid", "_ga",
+    "ref", "ref_src", "ref_url", "cmpid", "amp", "outputtype", "share", "smid", "spm"
+}
+PREFIJOS_TRACKING = ("utm_", "at_", "pk_", "hsa_")
+SUBDOMINIOS_IGNORADOS = ("www.", "m.", "amp.", "mobile.")
+PATRON_AMP = re.compile(r"(/amp/?$|\.amp$|/amp(?=/))")
+
+def canonicalizar_url(url: str) -> str:
+    """
+    Forma canónica de una URL de noticia para deduplicar: https, sin www./m./amp.,
+    sin variantes /amp, sin parámetros de tracking, sin fragmento ni barra final.
+    """
+    partes = urlsplit(url.strip())
+    host = (partes.hostname or "").lower()
+    for prefijo in SUBDOMINIOS_IGNORADOS:
+        if host.startswith(prefijo) and host.count(".") > 1:
+            host = host[len(prefijo):]
+            break
+
+    path = PATRON_AMP.sub("", partes.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = [
+        (k, v) for k, v in parse_qsl(partes.query, keep_blank_values=True)
+        if k.lower() not in PARAMETROS_TRACKING and not k.lower().startswith(PREFIJOS_TRACKING)
+    ]
+    return urlunsplit(("https", host, path, urlencode(sorted(query)), ""))
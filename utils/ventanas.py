@@ -0,0 +1,49 @@
+# utils/ventanas.py
+import math
+import os
+import sqlite3
+from datetime import datetime
+from config import (
+    ESTADO_DIR, DIAS_BUSQUEDA, VENTANA_MIN_HORAS, VENTANA_MAX_HORAS, VENTANA_SOLAPAMIENTO_HORAS
+)
+
+HORAS_POR_DEFECTO = DIAS_BUSQUEDA * 24  # Ventana de una corrida suelta (o de la primera del daemon)
+
+class MarcasAgua:
+    """
+    Marca de agua por empresa (SQLite): hasta qué instante cubrió el último reporte
+    exitoso. El modo daemon busca sólo desde ahí, así cada corrida trae lo nuevo y,
+    si se perdió alguna, la siguiente ventana se estira sola para ponerse al día.
+    """
+
+    def __init__(self, ruta: str = None):
+        os.makedirs(ESTADO_DIR, exist_ok=True)
+        self.ruta = ruta or os.path.join(ESTADO_DIR, "marcas_agua.sqlite")
+        self.con = sqlite3.connect(self.ruta, timeout=30, isolation_level=None, check_same_thread=False)
+        self.con.execute("PRAGMA journal_mode=WAL")
+        self.con.execute("""
+            CREATE TABLE IF NOT EXISTS marcas (
+                empresa TEXT PRIMARY KEY,
+                hasta REAL NOT NULL
+            ) WITHOUT ROWID""")
+
+    def ultima(self, empresa: str):
+        fila = self.con.execute("SELECT hasta FROM marcas WHERE empresa = ?", (empresa,)).fetchone()
+        return datetime.fromtimestamp(fila[0]) if fila else None
+
+    def registrar(self, empresa: str, hasta: datetime):
+        """Avanza la marca (nunca la retrocede: dos corridas superpuestas pueden terminar en otro orden)."""
+        self.con.execute(
+            "INSERT INTO marcas VALUES (?, ?) ON CONFLICT(empresa) DO UPDATE SET hasta = max(hasta, excluded.hasta)",
+            (empresa, hasta.timestamp()))
+
+def horas_a_buscar(marca, hasta: datetime) -> int:
+    """
+    Horas de búsqueda para cubrir desde `marca` hasta `hasta`, con un margen por la
+    demora de indexación de Google (lo repetido lo descarta el índice de URLs publicadas).
+    Sin marca, la ventana de siempre. El tope evita traer meses tras una pausa larga.
+    """
+    if marca is None:
+        return HORAS_POR_DEFECTO
+    horas = math.ceil((hasta - marca).total_seconds() / 3600) + VENTANA_SOLAPAMIENTO_HORAS
+    return max(VENTANA_MIN_HORAS, min(VENTANA_MAX_HORAS, horas))